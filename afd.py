@@ -1,30 +1,197 @@
+import hashlib
 import random
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=None)
+def build_symbol_table(alphabet):
+    """Construye una sola vez el alfabeto ordenado y su tabla símbolo→índice."""
+    alphabet = tuple(alphabet)
+    return alphabet, {symbol: i for i, symbol in enumerate(alphabet)}
+
+class CompactAFD:
+    """
+    AFD con tabla de transiciones densa.
+    
+    - transitions: matriz de enteros (estados × índice de símbolo), -1 = sin transición
+    - final_mask: vector booleano con los estados finales
+    - alphabet / symbol_index: compartidos por todos los AFDs del mismo alfabeto
+    
+    La máscara de estados finales nunca se modifica in situ (se reemplaza), así
+    que puede compartirse entre un AFD y sus copias. lineage guarda la huella del
+    AFD del que se derivó por mutación o cruce (o None), para la evaluación incremental.
+    """
+    
+    __slots__ = ("transitions", "final_mask", "initial_state", "alphabet", "symbol_index", "lineage")
+
+    def __init__(self, transitions, final_mask, initial_state, alphabet):
+        self.transitions = transitions
+        self.final_mask = final_mask
+        self.initial_state = initial_state
+        self.alphabet, self.symbol_index = build_symbol_table(tuple(alphabet))
+        self.lineage = None
+
+    @property
+    def num_states(self):
+        return self.transitions.shape[0]
+
+    @property
+    def states(self):
+        return set(range(self.num_states))
+
+    @property
+    def final_states(self):
+        return set(np.flatnonzero(self.final_mask).tolist())
+
+    def copy(self):
+        """Copia barata: duplica solo la tabla de transiciones y comparte el resto."""
+        clone = CompactAFD.__new__(CompactAFD)
+        clone.transitions = self.transitions.copy()
+        clone.final_mask = self.final_mask
+        clone.initial_state = self.initial_state
+        clone.alphabet = self.alphabet
+        clone.symbol_index = self.symbol_index
+        clone.lineage = None
+        return clone
+
+    def fingerprint(self):
+        """Huella compacta de la tabla de transiciones, el estado inicial y los estados finales."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array([self.initial_state, *self.transitions.shape], dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(self.transitions, dtype=np.int32).tobytes())
+        digest.update(np.ascontiguousarray(self.final_mask, dtype=bool).tobytes())
+        return digest.digest()
+
+    def canonical_order(self):
+        """
+        Estados alcanzables en orden canónico: anchura desde el inicial, símbolos en orden alfabético.
+        
+        Los inalcanzables se descartan (no influyen en el lenguaje y su numeración
+        no se puede fijar sin comparar grafos). Dos AFDs con la misma parte
+        alcanzable, salvo la numeración de sus estados, tienen la misma forma canónica.
+        """
+        rows = self.transitions.tolist()
+        symbol_order = sorted(range(len(self.alphabet)), key=lambda i: self.alphabet[i])
+        order = [self.initial_state]
+        seen = [False] * self.num_states
+        seen[self.initial_state] = True
+        for state in order:
+            row = rows[state]
+            for symbol_idx in symbol_order:
+                target = row[symbol_idx]
+                if target != -1 and not seen[target]:
+                    seen[target] = True
+                    order.append(target)
+        return order
+
+    def canonical(self):
+        """AFD equivalente con solo los estados alcanzables, renumerados en orden canónico (inicial = 0)."""
+        order = np.array(self.canonical_order(), dtype=np.int64)
+        new_index = np.full(self.num_states + 1, -1, dtype=np.int32)  # -1 (sin transición) se conserva
+        new_index[order] = np.arange(len(order), dtype=np.int32)
+        clone = CompactAFD.__new__(CompactAFD)
+        clone.transitions = new_index[self.transitions[order]]
+        clone.final_mask = self.final_mask[order]
+        clone.initial_state = 0
+        clone.alphabet = self.alphabet
+        clone.symbol_index = self.symbol_index
+        clone.lineage = None
+        return clone
+
+    def canonical_hash(self):
+        """Huella de la forma canónica: igual para AFDs isomorfos."""
+        return self.canonical().fingerprint()
+
+    def encode(self, word):
+        """Traduce una palabra a índices de símbolo (-1 si el símbolo no está en el alfabeto)."""
+        index = self.symbol_index
+        return [index.get(symbol, -1) for symbol in word]
+
+    def to_dict(self):
+        """Convierte el AFD al formato de diccionario original (usado por visualizacion.py)."""
+        transitions = {}
+        for state, row in enumerate(self.transitions.tolist()):
+            for symbol, next_state in zip(self.alphabet, row):
+                if next_state != -1:
+                    transitions[(state, symbol)] = next_state
+        
+        return {
+            "states": self.states,
+            "initial_state": self.initial_state,
+            "final_states": self.final_states,
+            "transitions": transitions,
+        }
+
+    @classmethod
+    def from_dict(cls, afd, alphabet=None):
+        """Construye un AFD compacto a partir del formato de diccionario original."""
+        if alphabet is None:
+            alphabet = sorted(set(symbol for _, symbol in afd["transitions"].keys()))
+        alphabet, symbol_index = build_symbol_table(tuple(alphabet))
+        
+        num_states = max(afd["states"]) + 1 if afd["states"] else 0
+        transitions = np.full((num_states, len(alphabet)), -1, dtype=np.int32)
+        for (state, symbol), next_state in afd["transitions"].items():
+            if symbol in symbol_index and 0 <= next_state < num_states:
+                transitions[state, symbol_index[symbol]] = next_state
+        
+        final_mask = np.zeros(num_states, dtype=bool)
+        final_mask[[s for s in afd["final_states"] if 0 <= s < num_states]] = True
+        
+        return cls(transitions, final_mask, afd["initial_state"], alphabet)
+
+    def to_json(self):
+        """Representación serializable en JSON (listas en lugar de arreglos y conjuntos)."""
+        return {
+            "alphabet": list(self.alphabet),
+            "initial_state": int(self.initial_state),
+            "final_states": sorted(self.final_states),
+            "transitions": self.transitions.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Reconstruye un AFD a partir de to_json()."""
+        transitions = np.array(data["transitions"], dtype=np.int32).reshape(-1, len(data["alphabet"]))
+        final_mask = np.zeros(len(transitions), dtype=bool)
+        final_mask[data["final_states"]] = True
+        return cls(transitions, final_mask, data["initial_state"], data["alphabet"])
 
 def create_random_afd(num_states, alphabet):
     """Crea un AFD aleatorio."""
-    states = set(range(num_states))
-    initial_state = 0
-    final_states = set(random.sample(list(states), max(1, num_states // 3)))  
-    transitions = {}
-
-    for state in states:
-        for symbol in alphabet:
-            transitions[(state, symbol)] = random.choice(list(states))
-
-    return {
-        "states": states,
-        "initial_state": initial_state,
-        "final_states": final_states,
-        "transitions": transitions,
-    }
+    states = list(range(num_states))
+    final_states = random.sample(states, max(1, num_states // 3))
+    
+    # Mismo orden de sorteo que la versión con diccionario: estado por estado, símbolo por símbolo
+    transitions = np.array(
+        [[random.choice(states) for _ in alphabet] for _ in states], dtype=np.int32
+    ).reshape(num_states, len(alphabet))
+    
+    final_mask = np.zeros(num_states, dtype=bool)
+    final_mask[final_states] = True
+    
+    return CompactAFD(transitions, final_mask, 0, alphabet)
 
 def accepts_input(afd, input_string):
     """Evalúa si el AFD acepta una cadena."""
-    current_state = afd["initial_state"]
+    if isinstance(afd, dict):
+        current_state = afd["initial_state"]
+        
+        for symbol in input_string:
+            current_state = afd["transitions"].get((current_state, symbol), -1)  # Estado de rechazo si no hay transición
+            if current_state == -1:
+                return False
+        
+        return current_state in afd["final_states"]
+    
+    transitions = afd.transitions
+    current_state = afd.initial_state
     
-    for symbol in input_string:
-        current_state = afd["transitions"].get((current_state, symbol), -1)  # Estado de rechazo si no hay transición
+    for symbol_idx in afd.encode(input_string):
+        if symbol_idx == -1:
+            return False  # Símbolo fuera del alfabeto: rechazo
+        current_state = transitions.item(current_state, symbol_idx)
         if current_state == -1:
             return False
     
-    return current_state in afd["final_states"]
\ No newline at end of file
+    return bool(afd.final_mask[current_state])
\ No newline at end of file
@@ -0,0 +1,128 @@
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+# Ubicación por defecto de la caché (se puede cambiar con la variable de entorno)
+DEFAULT_CACHE_PATH = os.environ.get(
+    "AG_AUTOMATA_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ag-automata", "conjugaciones.sqlite3"),
+)
+
+class ConjugationCache:
+    """
+    Caché local en SQLite de las conjugaciones ya obtenidas de la RAE.
+    
+    Guarda por verbo la lista limpia de conjugaciones y la fecha de descarga.
+    Con ttl (segundos) las entradas más antiguas se consideran caducadas.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=None):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conjugations ("
+                " verb TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # Una conexión por operación: la interfaz consulta la caché desde otro hilo
+        return sqlite3.connect(self.path)
+
+    def get(self, verb):
+        """Conjugaciones guardadas para el verbo, o None si no están o han caducado."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data, fetched_at FROM conjugations WHERE verb = ?", (verb,)).fetchone()
+        if row is None:
+            return None
+        data, fetched_at = row
+        if self.ttl is not None and time.time() - fetched_at > self.ttl:
+            return None
+        return json.loads(data)
+
+    def put(self, verb, conjugations, fetched_at=None):
+        """Guarda (o reemplaza) las conjugaciones de un verbo."""
+        self.put_many({verb: conjugations}, fetched_at)
+
+    def put_many(self, corpus, fetched_at=None):
+        """Guarda varios verbos en una sola transacción ({verbo: conjugaciones})."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(verb, json.dumps(list(conjugations), ensure_ascii=False), fetched_at)
+                for verb, conjugations in corpus.items()]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO conjugations (verb, data, fetched_at) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def delete(self, verb):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM conjugations WHERE verb = ?", (verb,))
+
+    def verbs(self):
+        """Verbos guardados, en orden alfabético."""
+        with closing(self._connect()) as conn:
+            return [verb for (verb,) in conn.execute("SELECT verb FROM conjugations ORDER BY verb")]
+
+    def export_corpus(self):
+        """Todas las entradas como {verbo: conjugaciones}."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT verb, data FROM conjugations ORDER BY verb").fetchall()
+        return {verb: json.loads(data) for verb, data in rows}
+
+def _open_text(path, mode, compressed=None):
+    # Los archivos terminados en .gz se comprimen/descomprimen al vuelo
+    if compressed if compressed is not None else path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def load_corpus_file(path):
+    """Lee un archivo JSON {verbo: [conjugaciones]} (opcionalmente comprimido con gzip)."""
+    with _open_text(path, "r") as f:
+        corpus = json.load(f)
+    if not isinstance(corpus, dict):
+        raise ValueError(f"{path}: se esperaba un objeto JSON {{verbo: [conjugaciones]}}")
+    return corpus
+
+def write_corpus_file(path, corpus):
+    """Escribe {verbo: [conjugaciones]} como JSON compacto (con gzip si la ruta termina en .gz)."""
+    tmp_path = f"{path}.tmp"
+    with _open_text(tmp_path, "w", compressed=path.endswith(".gz")) as f:
+        json.dump(corpus, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gestiona la caché local de conjugaciones.")
+    parser.add_argument("--db", default=DEFAULT_CACHE_PATH, help="Ruta del archivo SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = subparsers.add_parser("import", help="Precarga la caché desde un archivo JSON {verbo: [conjugaciones]}")
+    import_parser.add_argument("path")
+    export_parser = subparsers.add_parser("export", help="Exporta la caché a un archivo JSON")
+    export_parser.add_argument("path")
+    subparsers.add_parser("list", help="Lista los verbos guardados")
+    
+    args = parser.parse_args(argv)
+    cache = ConjugationCache(args.db)
+    
+    if args.command == "import":
+        count = cache.put_many(load_corpus_file(args.path))
+        print(f"Importados {count} verbos en {args.db}")
+    elif args.command == "export":
+        corpus = cache.export_corpus()
+        write_corpus_file(args.path, corpus)
+        print(f"Exportados {len(corpus)} verbos a {args.path}")
+    else:
+        for verb in cache.verbs():
+            print(verb)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,307 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from afd import CompactAFD
+from compilacion import compile_matcher
+from parser_rae import verb_from_filename
+from producto import LazyUnion, union_automaton
+
+# Bloque que se decodifica de una vez (los cortes caen siempre en un espacio en blanco)
+CHUNK_SIZE = 8 * 1024 * 1024
+# Bytes que se leen tras el final de un rango para completar los grupos de palabras
+LOOKAHEAD_BYTES = 4096
+# Palabras distintas recordadas con su clasificación; al llenarse se vacía (memoria acotada)
+TOKEN_CACHE_SIZE = 200_000
+# Rangos de bytes por trabajador (varios, para repartir mejor la carga)
+SHARDS_PER_WORKER = 4
+
+# Palabras: secuencias de letras (sin dígitos ni guiones bajos)
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+")
+_WHITESPACE = b" \t\n\r\f\v"
+
+def load_automata(specs):
+    """
+    AFDs guardados, con el verbo que reconoce cada uno: {verbo: CompactAFD}.
+    
+    Cada especificación es "verbo=archivo.json" o solo "archivo.json" (el verbo
+    es entonces el nombre del archivo). Se aceptan tanto el JSON de resultado de
+    motor.py como el de CompactAFD.to_json.
+    """
+    automata = {}
+    for spec in specs:
+        verb, separator, path = spec.partition("=")
+        if not separator:
+            path, verb = spec, verb_from_filename(spec)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        automata[verb] = CompactAFD.from_json(data["afd"] if "afd" in data else data)
+    return automata
+
+def _next_boundary(buffer, position):
+    """Primera posición >= position con un espacio en blanco ASCII (o el final)."""
+    size = len(buffer)
+    while position < size and buffer[position] not in _WHITESPACE:
+        position += 1
+    return position
+
+def shard_bounds(buffer, num_shards):
+    """
+    Divide el texto en num_shards rangos de bytes [inicio, fin) que no cortan palabras.
+    
+    Los límites se mueven al siguiente espacio en blanco ASCII; en UTF-8 ese byte
+    nunca forma parte de un carácter multibyte, así que cada rango se decodifica
+    por separado sin errores.
+    """
+    size = len(buffer)
+    bounds = [0] + [_next_boundary(buffer, size * i // num_shards) for i in range(1, num_shards)] + [size]
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+def _read_chunks(buffer, start, end, chunk_size):
+    """Texto de [start, end) en bloques decodificados, cortados en espacios en blanco."""
+    position = start
+    while position < end:
+        stop = min(position + chunk_size, end)
+        if stop < end:
+            stop = _next_boundary(buffer, stop)
+        yield buffer[position:stop].decode("utf-8", errors="replace")
+        position = stop
+
+def _tokens(buffer, start, end, chunk_size, state):
+    """
+    Palabras en minúsculas de [start, end) con un indicador de continuidad.
+    
+    Genera (palabra, unida): unida es True si entre la palabra y la anterior solo
+    hay espacios en blanco. state["clean"] indica si el texto desde la última
+    palabra es solo espacio (se lee al empezar y se actualiza al terminar).
+    """
+    clean = state["clean"]
+    for text in _read_chunks(buffer, start, end, chunk_size):
+        position = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            gap = text[position:match.start()]
+            yield match.group().lower(), clean and (not gap or gap.isspace())
+            clean = True
+            position = match.end()
+        tail = text[position:]
+        clean = clean and (not tail or tail.isspace())
+    state["clean"] = clean
+
+def iter_candidates(buffer, start, end, max_words=1, chunk_size=CHUNK_SIZE):
+    """
+    Palabras y grupos de hasta max_words palabras ("he cantado") que empiezan en [start, end).
+    
+    Se aplica la misma normalización que el scraper (minúsculas). Los grupos
+    unen palabras separadas solo por espacios en blanco; para completar los que
+    empiezan al final del rango se leen unas pocas palabras más allá de end.
+    """
+    window = []  # Últimas palabras contiguas
+    state = {"clean": False}
+    for token, joined in _tokens(buffer, start, end, chunk_size, state):
+        if not joined:
+            window.clear()
+        window.append(token)
+        if len(window) > max_words:
+            del window[0]
+        for first in range(len(window)):
+            yield " ".join(window[first:])
+    
+    if max_words <= 1 or end >= len(buffer) or not window:
+        return
+    # Palabras siguientes al rango: solo completan grupos que empiezan dentro
+    owned = len(window)
+    stop = _next_boundary(buffer, min(end + LOOKAHEAD_BYTES, len(buffer)))
+    for count, (token, joined) in enumerate(_tokens(buffer, end, stop, chunk_size, state)):
+        if not joined or count >= max_words - 1:
+            break
+        window.append(token)
+        if len(window) > max_words:
+            del window[0]
+            owned -= 1
+        for first in range(owned):
+            yield " ".join(window[first:])
+
+def _matcher(afd):
+    """Reconocedor compilado: tabla por punto de código o, con alfabetos altos, translate."""
+    try:
+        return compile_matcher(afd, "table")
+    except ValueError:
+        return compile_matcher(afd, "translate")
+
+class TokenClassifier:
+    """
+    Clasifica palabras con varios AFDs: qué verbos aceptan cada una.
+    
+    Cada AFD se compila con compilacion.compile_matcher (misma semántica que
+    accepts_input: una transición inexistente o un símbolo fuera del alfabeto
+    rechazan). Con union=True se usa en su lugar un único autómata producto
+    (producto.union_automaton) que responde con un solo recorrido por palabra;
+    si el producto completo es demasiado grande, se construye bajo demanda. Las
+    palabras repetidas se resuelven con una caché acotada.
+    """
+
+    def __init__(self, automata, cache_size=TOKEN_CACHE_SIZE, union=False):
+        self.matchers = []
+        self._union = None
+        if union:
+            try:
+                self._union = union_automaton(automata)
+            except ValueError:
+                self._union = LazyUnion.from_automata(automata)
+        else:
+            self.matchers = [(verb, _matcher(afd).accepts) for verb, afd in automata.items()]
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def classify(self, token):
+        """Tupla de verbos cuyos AFDs aceptan la palabra (vacía si ninguno)."""
+        verbs = self._cache.get(token)
+        if verbs is None:
+            if self._union is not None:
+                verbs = tuple(sorted(self._union.classify(token)))
+            else:
+                verbs = tuple(verb for verb, accepts in self.matchers if accepts(token))
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[token] = verbs
+        return verbs
+
+def classify_range(buffer, start, end, classifier, max_words=1, chunk_size=CHUNK_SIZE):
+    """
+    Cuenta las formas reconocidas en [start, end).
+    
+    Retorna ({verbo: Counter(forma)}, candidatos examinados). La memoria no crece
+    con el texto: solo con el número de formas distintas reconocidas.
+    """
+    matched = Counter()  # Formas aceptadas por algún AFD; se reparten por verbo al final
+    candidates = 0
+    classify = classifier.classify
+    for candidate in iter_candidates(buffer, start, end, max_words, chunk_size):
+        candidates += 1
+        if classify(candidate):
+            matched[candidate] += 1
+    
+    counts = {}
+    for form, count in matched.items():
+        for verb in classify(form):
+            counts.setdefault(verb, Counter())[form] = count
+    return counts, candidates
+
+# Estado de cada proceso trabajador: se fija una sola vez en el inicializador
+_WORKER_CLASSIFIER = None
+
+def _init_worker(automata_json, union):
+    global _WORKER_CLASSIFIER
+    _WORKER_CLASSIFIER = TokenClassifier({verb: CompactAFD.from_json(data) for verb, data in automata_json.items()},
+                                         union=union)
+
+def _classify_shard(path, start, end, max_words, chunk_size):
+    """Tarea del trabajador: abre su propio mapa del archivo y clasifica un rango."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return classify_range(buffer, start, end, _WORKER_CLASSIFIER, max_words, chunk_size)
+
+def _merge(total, counts):
+    for verb, forms in counts.items():
+        total.setdefault(verb, Counter()).update(forms)
+
+def _default_max_words(automata):
+    """Grupos de dos palabras si algún AFD tiene el espacio en su alfabeto (formas compuestas)."""
+    return 2 if any(" " in afd.alphabet for afd in automata.values()) else 1
+
+def classify_file(path, automata, max_workers=1, max_words=None, chunk_size=CHUNK_SIZE, on_progress=None,
+                  union=False):
+    """
+    Recorre un archivo de texto (UTF-8) y cuenta las conjugaciones de cada verbo.
+    
+    El archivo se mapea en memoria y se lee por bloques; con max_workers > 1 se
+    reparte en rangos de bytes entre procesos. on_progress(bytes procesados,
+    bytes totales) informa del avance; union=True clasifica con un único
+    autómata producto (ver TokenClassifier). Retorna un diccionario con, por
+    verbo, el total de apariciones y las apariciones de cada forma.
+    """
+    if max_words is None:
+        max_words = _default_max_words(automata)
+    size = os.path.getsize(path)
+    counts = {}
+    candidates = 0
+    
+    if size > 0:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if max_workers <= 1:
+                shards = shard_bounds(buffer, max(1, size // chunk_size))
+            else:
+                shards = shard_bounds(buffer, max_workers * SHARDS_PER_WORKER)
+            
+            if max_workers <= 1:
+                classifier = TokenClassifier(automata, union=union)
+                for start, end in shards:
+                    shard_counts, shard_candidates = classify_range(buffer, start, end, classifier, max_words,
+                                                                    chunk_size)
+                    _merge(counts, shard_counts)
+                    candidates += shard_candidates
+                    if on_progress is not None:
+                        on_progress(end, size)
+            else:
+                automata_json = {verb: afd.to_json() for verb, afd in automata.items()}
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                         initargs=(automata_json, union)) as executor:
+                    futures = [(end, executor.submit(_classify_shard, path, start, end, max_words, chunk_size))
+                               for start, end in shards]
+                    done = 0
+                    for end, future in futures:
+                        shard_counts, shard_candidates = future.result()
+                        _merge(counts, shard_counts)
+                        candidates += shard_candidates
+                        done = max(done, end)
+                        if on_progress is not None:
+                            on_progress(done, size)
+    
+    return {
+        "bytes": size,
+        "candidates": candidates,
+        "max_words": max_words,
+        "verbs": {
+            verb: {"matches": sum(counts.get(verb, Counter()).values()),
+                   "forms": dict(counts.get(verb, Counter()).most_common())}
+            for verb in automata
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca las conjugaciones reconocidas por AFDs aprendidos en un texto grande.")
+    parser.add_argument("text", help="Archivo de texto UTF-8")
+    parser.add_argument("-a", "--afd", action="append", required=True,
+                        help="AFD guardado (JSON de motor.py), como verbo=archivo.json o archivo.json; repetible")
+    parser.add_argument("-o", "--output", help="Archivo JSON de salida (por defecto, salida estándar)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos (el archivo se reparte por rangos de bytes)")
+    parser.add_argument("--max-words", type=int, default=None,
+                        help="Palabras por forma (2 para compuestas; por defecto según los alfabetos)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Bytes por bloque de lectura")
+    parser.add_argument("--union", action="store_true",
+                        help="Clasificar con un único autómata producto (un recorrido por palabra para todos los verbos)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar el progreso en stderr")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"\r{done / total:.1%}", end="", file=sys.stderr, flush=True)
+    
+    automata = load_automata(args.afd)
+    result = classify_file(args.text, automata, args.workers, args.max_words, args.chunk_size,
+                           on_progress=report if args.verbose else None, union=args.union)
+    if args.verbose:
+        print(file=sys.stderr)
+    
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import argparse
+import json
+import re
+import sys
+import types
+from afd import CompactAFD
+from minimizacion import minimize_afd
+
+MODES = ("table", "translate", "regex")
+# Ancho máximo de la tabla indexada por punto de código (alfabetos con símbolos más altos: "translate")
+MAX_TABLE_WIDTH = 1 << 12
+# Por encima de este tamaño la expresión regular deja de ser práctica (la eliminación de estados puede explotar)
+MAX_PATTERN_LENGTH = 200_000
+
+_ATOM = re.compile(r"\\?.|\[(?:\\.|[^\]\\])*\]", re.DOTALL)
+
+def _symbol_class(symbols):
+    """Clase de caracteres para un conjunto de símbolos: "a" o "[ae]"."""
+    symbols = sorted(symbols)
+    if len(symbols) == 1:
+        return re.escape(symbols[0])
+    return "[" + "".join(re.escape(symbol) for symbol in symbols) + "]"
+
+def _union(a, b):
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    if a == "":
+        return f"(?:{b})?"
+    if b == "":
+        return f"(?:{a})?"
+    return f"(?:{a}|{b})"
+
+def _star(r):
+    if r is None or r == "":
+        return ""
+    if _ATOM.fullmatch(r):
+        return r + "*"
+    return f"(?:{r})*"
+
+def state_elimination_pattern(afd, max_length=MAX_PATTERN_LENGTH):
+    """
+    Expresión regular equivalente al AFD, por eliminación de estados.
+    
+    Se parte del AFD mínimo (sin estados inútiles) y se añaden un inicio y un
+    final nuevos unidos con transiciones vacías; se eliminan los estados de uno
+    en uno empezando por el de menos caminos entrada × salida, sustituyendo
+    cada camino p → k → q por R(p,k) R(k,k)* R(k,q). Retorna el patrón (para
+    re.fullmatch), "" si solo acepta la palabra vacía, o None si el lenguaje es
+    vacío. Lanza ValueError si el patrón supera max_length caracteres.
+    """
+    afd = minimize_afd(afd)
+    start, end = afd.num_states, afd.num_states + 1
+    # edges[p][q] = expresión de p a q (sin entrada: no hay transición)
+    edges = {state: {} for state in range(afd.num_states + 2)}
+    for state, row in enumerate(afd.transitions.tolist()):
+        by_target = {}
+        for symbol, target in zip(afd.alphabet, row):
+            if target != -1:
+                by_target.setdefault(target, []).append(symbol)
+        for target, symbols in by_target.items():
+            edges[state][target] = _symbol_class(symbols)
+        if afd.final_mask[state]:
+            edges[state][end] = ""
+    edges[start][afd.initial_state] = ""
+    
+    remaining = set(range(afd.num_states))
+    while remaining:
+        incoming = {state: [p for p in edges if p != state and state in edges[p]] for state in remaining}
+        state = min(remaining, key=lambda s: (len(incoming[s]) * len([q for q in edges[s] if q != s]), s))
+        remaining.discard(state)
+        loop = _star(edges[state].pop(state, None))
+        outgoing = edges.pop(state)
+        for p in incoming[state]:
+            head = edges[p].pop(state) + loop
+            for q, tail in outgoing.items():
+                edges[p][q] = _union(edges[p].get(q), head + tail)
+                if len(edges[p][q]) > max_length:
+                    raise ValueError(f"La expresión regular supera {max_length} caracteres")
+    return edges[start].get(end)
+
+# Plantillas del módulo generado: solo biblioteca estándar, sin NumPy ni este proyecto
+
+_HEADER = '''"""
+Reconocedor generado a partir de un AFD (modo "{mode}"); no editar a mano.
+
+accepts(palabra) indica si el AFD acepta la palabra y match_many(palabras)
+hace lo mismo para una secuencia. Un símbolo fuera del alfabeto o una
+transición inexistente rechazan la palabra.
+"""
+ALPHABET = {alphabet!r}
+'''
+
+_TABLE_MODULE = '''
+# Tabla plana indexada por punto de código: TABLE[estado + ord(c)], con los estados
+# ya multiplicados por WIDTH; DEAD es el estado de rechazo
+WIDTH = {width}
+INITIAL = {initial}
+DEAD = {dead}
+FINAL = frozenset({final!r})
+TABLE = {table!r}
+
+def accepts(word):
+    state = INITIAL
+    for char in word:
+        code = ord(char)
+        if code >= WIDTH:
+            return False
+        state = TABLE[state + code]
+        if state == DEAD:
+            return False
+    return state in FINAL
+'''
+
+_TRANSLATE_MODULE = '''
+# str.translate lleva cada carácter a su índice de símbolo (un byte); los que no
+# están en el alfabeto van a la columna de rechazo. Los estados ya están
+# multiplicados por WIDTH (número de símbolos + 1)
+class _SymbolMap(dict):
+    def __missing__(self, code):
+        return {reject!r}
+
+SYMBOLS = _SymbolMap({symbols!r})
+WIDTH = {width}
+INITIAL = {initial}
+FINAL = frozenset({final!r})
+TABLE = {table!r}
+
+def accepts(word):
+    state = INITIAL
+    for code in word.translate(SYMBOLS).encode("latin-1"):
+        state = TABLE[state + code]
+    return state in FINAL
+'''
+
+_REGEX_MODULE = '''
+import re
+
+# Expresión regular equivalente (eliminación de estados); None = lenguaje vacío
+PATTERN = {pattern!r}
+_FULLMATCH = re.compile(PATTERN).fullmatch if PATTERN is not None else None
+
+def accepts(word):
+    return _FULLMATCH is not None and _FULLMATCH(word) is not None
+'''
+
+_MATCH_MANY = '''
+def match_many(words):
+    """Lista de resultados de accepts; cada palabra distinta se evalúa una sola vez."""
+    words = list(words)
+    seen = {}
+    for word in words:
+        if word not in seen:
+            seen[word] = accepts(word)
+    return [seen[word] for word in words]
+'''
+
+def _flat_table(afd, columns):
+    """
+    Tabla plana con los estados multiplicados por el ancho de fila.
+    
+    columns da, para cada columna, el índice de símbolo o -1 (rechazo). Se añade
+    un estado muerto (absorbente) al final para -1.
+    """
+    width = len(columns)
+    dead = afd.num_states
+    rows = afd.transitions.tolist()
+    table = []
+    for state in range(afd.num_states + 1):
+        for symbol_idx in columns:
+            target = rows[state][symbol_idx] if state < dead and symbol_idx != -1 else -1
+            table.append((target if target != -1 else dead) * width)
+    return table, width, dead * width
+
+def generate_module(afd, mode="table", max_pattern_length=MAX_PATTERN_LENGTH):
+    """
+    Código fuente de un módulo Python independiente que reconoce el lenguaje del AFD.
+    
+    - "table": tabla plana indexada por punto de código (sin diccionarios ni
+      codificación previa); requiere que el mayor punto de código del alfabeto
+      sea menor que MAX_TABLE_WIDTH.
+    - "translate": str.translate + encode traducen la palabra a índices de
+      símbolo en C y el bucle solo indexa la tabla; hasta 255 símbolos.
+    - "regex": expresión regular equivalente (ver state_elimination_pattern),
+      evaluada por el motor de re. Es la forma más portable (sirve fuera de
+      Python), pero con AFDs aprendidos el patrón es largo y no es la más rápida.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode} (opciones: {', '.join(MODES)})")
+    source = _HEADER.format(mode=mode, alphabet="".join(afd.alphabet))
+    
+    if mode == "table":
+        width = max((ord(symbol) for symbol in afd.alphabet), default=-1) + 1
+        if width > MAX_TABLE_WIDTH:
+            raise ValueError(f"Alfabeto con puntos de código hasta {width - 1}: use el modo translate")
+        columns = [afd.symbol_index.get(chr(code), -1) for code in range(width)]
+        table, width, dead = _flat_table(afd, columns)
+        final = sorted(state * width for state in afd.final_states)
+        return source + _TABLE_MODULE.format(width=width, initial=afd.initial_state * width, dead=dead,
+                                             final=final, table=tuple(table)) + _MATCH_MANY
+    
+    if mode == "translate":
+        if len(afd.alphabet) > 255:
+            raise ValueError("El modo translate admite como máximo 255 símbolos")
+        columns = list(range(len(afd.alphabet))) + [-1]
+        table, width, _ = _flat_table(afd, columns)
+        symbols = {ord(symbol): chr(i) for i, symbol in enumerate(afd.alphabet)}
+        final = sorted(state * width for state in afd.final_states)
+        return source + _TRANSLATE_MODULE.format(reject=chr(len(afd.alphabet)), symbols=symbols, width=width,
+                                                 initial=afd.initial_state * width, final=final,
+                                                 table=tuple(table)) + _MATCH_MANY
+    
+    pattern = state_elimination_pattern(afd, max_pattern_length)
+    return source + _REGEX_MODULE.format(pattern=pattern) + _MATCH_MANY
+
+def compile_matcher(afd, mode="table"):
+    """Carga en memoria el módulo de generate_module (mismo código que el exportado)."""
+    module = types.ModuleType(f"afd_matcher_{mode}")
+    exec(compile(generate_module(afd, mode), module.__name__, "exec"), module.__dict__)
+    return module
+
+def write_module(afd, path, mode="table"):
+    """Escribe el reconocedor en un archivo .py importable sin este proyecto."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generate_module(afd, mode))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila un AFD (JSON de motor.py) en un módulo Python independiente.")
+    parser.add_argument("afd", help="Archivo JSON del AFD (resultado de motor.py o CompactAFD.to_json)")
+    parser.add_argument("-o", "--output", required=True, help="Módulo .py de salida")
+    parser.add_argument("--mode", choices=MODES, default="table")
+    args = parser.parse_args(argv)
+    
+    with open(args.afd, encoding="utf-8") as f:
+        data = json.load(f)
+    afd = CompactAFD.from_json(data["afd"] if "afd" in data else data)
+    write_module(afd, args.output, args.mode)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import json
+import sys
+from parser_rae import split_forms
+
+# Terminaciones regulares por conjugación (yo, tú, él, nosotros, vosotros, ellos)
+SIMPLE_ENDINGS = {
+    "ar": {
+        "presente_indicativo": ("o", "as", "a", "amos", "áis", "an"),
+        "preterito_imperfecto_indicativo": ("aba", "abas", "aba", "ábamos", "abais", "aban"),
+        "preterito_perfecto_simple": ("é", "aste", "ó", "amos", "asteis", "aron"),
+        "presente_subjuntivo": ("e", "es", "e", "emos", "éis", "en"),
+        "preterito_imperfecto_subjuntivo_ra": ("ara", "aras", "ara", "áramos", "arais", "aran"),
+        "preterito_imperfecto_subjuntivo_se": ("ase", "ases", "ase", "ásemos", "aseis", "asen"),
+        "futuro_subjuntivo": ("are", "ares", "are", "áremos", "areis", "aren"),
+    },
+    "er": {
+        "presente_indicativo": ("o", "es", "e", "emos", "éis", "en"),
+        "preterito_imperfecto_indicativo": ("ía", "ías", "ía", "íamos", "íais", "ían"),
+        "preterito_perfecto_simple": ("í", "iste", "ió", "imos", "isteis", "ieron"),
+        "presente_subjuntivo": ("a", "as", "a", "amos", "áis", "an"),
+        "preterito_imperfecto_subjuntivo_ra": ("iera", "ieras", "iera", "iéramos", "ierais", "ieran"),
+        "preterito_imperfecto_subjuntivo_se": ("iese", "ieses", "iese", "iésemos", "ieseis", "iesen"),
+        "futuro_subjuntivo": ("iere", "ieres", "iere", "iéremos", "iereis", "ieren"),
+    },
+}
+SIMPLE_ENDINGS["ir"] = dict(SIMPLE_ENDINGS["er"], presente_indicativo=("o", "es", "e", "imos", "ís", "en"))
+
+# Futuro y condicional se forman sobre el infinitivo
+FUTURE_ENDINGS = ("é", "ás", "á", "emos", "éis", "án")
+CONDITIONAL_ENDINGS = ("ía", "ías", "ía", "íamos", "íais", "ían")
+
+# Voseo (tú / vos): presente de indicativo, presente de subjuntivo e imperativo
+VOS_ENDINGS = {
+    "ar": {"presente_indicativo": "ás", "presente_subjuntivo": "és", "imperativo": "á"},
+    "er": {"presente_indicativo": "és", "presente_subjuntivo": "ás", "imperativo": "é"},
+    "ir": {"presente_indicativo": "ís", "presente_subjuntivo": "ás", "imperativo": "í"},
+}
+# Imperativo: tú, usted, vosotros, ustedes
+IMPERATIVE_ENDINGS = {
+    "ar": ("a", "e", "ad", "en"),
+    "er": ("e", "a", "ed", "an"),
+    "ir": ("e", "a", "id", "an"),
+}
+GERUND_ENDINGS = {"ar": "ando", "er": "iendo", "ir": "iendo"}
+PARTICIPLE_ENDINGS = {"ar": "ado", "er": "ido", "ir": "ido"}
+
+# Tiempos compuestos: auxiliar "haber" + participio
+HABER = {
+    "preterito_perfecto_compuesto": ("he", "has", "ha", "hemos", "habéis", "han"),
+    "preterito_pluscuamperfecto": ("había", "habías", "había", "habíamos", "habíais", "habían"),
+    "preterito_anterior": ("hube", "hubiste", "hubo", "hubimos", "hubisteis", "hubieron"),
+    "futuro_compuesto": ("habré", "habrás", "habrá", "habremos", "habréis", "habrán"),
+    "condicional_compuesto": ("habría", "habrías", "habría", "habríamos", "habríais", "habrían"),
+    "preterito_perfecto_compuesto_subjuntivo": ("haya", "hayas", "haya", "hayamos", "hayáis", "hayan"),
+    "preterito_pluscuamperfecto_subjuntivo_ra": ("hubiera", "hubieras", "hubiera", "hubiéramos", "hubierais", "hubieran"),
+    "preterito_pluscuamperfecto_subjuntivo_se": ("hubiese", "hubieses", "hubiese", "hubiésemos", "hubieseis", "hubiesen"),
+    "futuro_compuesto_subjuntivo": ("hubiere", "hubieres", "hubiere", "hubiéremos", "hubiereis", "hubieren"),
+}
+
+# Cambios ortográficos que conservan el sonido de la raíz (buscar → busqué, coger → cojo)
+SOFT_STEM_CHANGES = (("guar", "gü"), ("car", "qu"), ("gar", "gu"), ("zar", "c"))  # -ar ante e
+HARD_STEM_CHANGES = (("guir", "g"), ("quir", "c"), ("cer", "z"), ("cir", "z"), ("ger", "j"), ("gir", "j"))  # -er/-ir ante a/o
+
+def _stem_for(verb, ending):
+    """Raíz del verbo para una terminación, aplicando los cambios ortográficos regulares."""
+    stem = verb[:-2]
+    if not ending:
+        return stem
+    if verb.endswith("ar") and ending[0] in "eé":
+        changes = SOFT_STEM_CHANGES
+    elif not verb.endswith("ar") and ending[0] in "aáo":
+        changes = HARD_STEM_CHANGES
+    else:
+        return stem
+    for suffix, replacement in changes:
+        if verb.endswith(suffix):
+            return verb[:-len(suffix)] + replacement
+    return stem
+
+def _forms(verb, endings):
+    return [_stem_for(verb, ending) + ending for ending in endings]
+
+def conjugate_regular(verb):
+    """
+    Tabla de conjugación de un verbo regular en -ar, -er o -ir.
+    
+    Retorna {tiempo: [celdas]} con el mismo texto que las celdas de la RAE:
+    "cantas / cantás" para tú / vos y "cantara o cantase" para el imperfecto
+    de subjuntivo. Incluye formas no personales y tiempos compuestos.
+    """
+    verb = verb.strip().lower()
+    conjugation = verb[-2:]
+    if len(verb) < 3 or conjugation not in SIMPLE_ENDINGS:
+        raise ValueError(f"'{verb}' no es un infinitivo en -ar, -er o -ir")
+    
+    endings = SIMPLE_ENDINGS[conjugation]
+    vos = VOS_ENDINGS[conjugation]
+    participle = _stem_for(verb, PARTICIPLE_ENDINGS[conjugation]) + PARTICIPLE_ENDINGS[conjugation]
+    gerund = _stem_for(verb, GERUND_ENDINGS[conjugation]) + GERUND_ENDINGS[conjugation]
+    
+    table = {
+        "formas_no_personales": [verb, gerund, participle, f"haber {participle}", f"habiendo {participle}"],
+        "presente_indicativo": _forms(verb, endings["presente_indicativo"]),
+        "preterito_imperfecto_indicativo": _forms(verb, endings["preterito_imperfecto_indicativo"]),
+        "preterito_perfecto_simple": _forms(verb, endings["preterito_perfecto_simple"]),
+        "futuro_simple": [verb + ending for ending in FUTURE_ENDINGS],
+        "condicional_simple": [verb + ending for ending in CONDITIONAL_ENDINGS],
+        "presente_subjuntivo": _forms(verb, endings["presente_subjuntivo"]),
+        "preterito_imperfecto_subjuntivo": [
+            f"{ra} o {se}" for ra, se in zip(_forms(verb, endings["preterito_imperfecto_subjuntivo_ra"]),
+                                            _forms(verb, endings["preterito_imperfecto_subjuntivo_se"]))
+        ],
+        "futuro_subjuntivo": _forms(verb, endings["futuro_subjuntivo"]),
+        "imperativo": _forms(verb, IMPERATIVE_ENDINGS[conjugation]),
+    }
+    
+    # tú / vos comparten celda
+    for tense in ("presente_indicativo", "presente_subjuntivo"):
+        table[tense][1] += f" / {_stem_for(verb, vos[tense])}{vos[tense]}"
+    table["imperativo"][0] += f" / {_stem_for(verb, vos['imperativo'])}{vos['imperativo']}"
+    
+    for tense, auxiliaries in HABER.items():
+        if tense.endswith("_se"):
+            continue
+        if tense.endswith("_ra"):
+            se_auxiliaries = HABER[tense[:-3] + "_se"]
+            table[tense[:-3]] = [f"{ra} {participle} o {se} {participle}"
+                                 for ra, se in zip(auxiliaries, se_auxiliaries)]
+        else:
+            table[tense] = [f"{auxiliary} {participle}" for auxiliary in auxiliaries]
+    
+    return table
+
+def generate_conjugations(verb, overrides=None):
+    """
+    Conjugaciones de un verbo sin conexión, con el mismo formato que get_all_conjugations.
+    
+    overrides permite corregir irregulares: {verbo: [conjugaciones]} reemplaza la
+    lista completa y {verbo: {tiempo: [celdas]}} solo los tiempos indicados.
+    Las celdas pasan por la misma limpieza y filtrado que las páginas de la RAE.
+    """
+    verb = verb.strip().lower()
+    override = (overrides or {}).get(verb)
+    if isinstance(override, (list, tuple)):
+        return sorted(set(override))
+    
+    table = conjugate_regular(verb)
+    if override:
+        table.update(override)
+    
+    all_conjugations = set()
+    for cells in table.values():
+        for cell in cells:
+            all_conjugations.update(split_forms(cell))
+    
+    # Mismo filtro que el scraper
+    excluded = {verb, f'{verb}do', f'{verb}ndo'}
+    return [conj for conj in sorted(all_conjugations) if conj not in excluded]
+
+def load_overrides(path):
+    """Lee un archivo JSON de irregulares ({verbo: [conjugaciones]} o {verbo: {tiempo: [celdas]}})."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    # Uso: python conjugador.py verbo [irregulares.json]
+    overrides = load_overrides(sys.argv[2]) if len(sys.argv) > 2 else None
+    for conj in generate_conjugations(sys.argv[1], overrides):
+        print(conj)
@@ -0,0 +1,205 @@
+import numpy as np
+from afd import CompactAFD, build_symbol_table
+from evaluacion import word_weight
+
+def _common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+def build_minimal_dfa(conjugations, alphabet):
+    """
+    AFD acíclico mínimo que acepta exactamente las conjugaciones.
+    
+    Construcción incremental sobre las palabras ordenadas: se añade cada palabra
+    como rama de un trie y los estados de la rama anterior que ya no cambiarán
+    se fusionan con un estado equivalente registrado (mismo carácter final y
+    mismas transiciones). Las palabras con símbolos fuera del alfabeto se omiten.
+    Los estados se numeran en anchura desde el inicial (estado 0).
+    """
+    alphabet, symbol_index = build_symbol_table(tuple(alphabet))
+    words = sorted(set(word for word in conjugations if all(symbol in symbol_index for symbol in word)))
+    
+    children = [{}]   # transiciones de cada estado: índice de símbolo → estado
+    final = [False]
+    register = {}     # firma (final, transiciones) → estado representante
+    unchecked = []    # (padre, símbolo, hijo) de la última rama aún sin fusionar
+
+    def minimize_down_to(depth):
+        while len(unchecked) > depth:
+            parent, symbol_idx, child = unchecked.pop()
+            signature = (final[child], tuple(sorted(children[child].items())))
+            existing = register.get(signature)
+            if existing is not None:
+                children[parent][symbol_idx] = existing
+            else:
+                register[signature] = child
+    
+    previous = ""
+    for word in words:
+        prefix = _common_prefix_length(word, previous)
+        minimize_down_to(prefix)
+        node = unchecked[-1][2] if unchecked else 0
+        for symbol in word[prefix:]:
+            symbol_idx = symbol_index[symbol]
+            children.append({})
+            final.append(False)
+            child = len(children) - 1
+            children[node][symbol_idx] = child
+            unchecked.append((node, symbol_idx, child))
+            node = child
+        final[node] = True
+        previous = word
+    minimize_down_to(0)
+    
+    # Renumerar los estados alcanzables en anchura (el inicial queda como 0)
+    order = [0]
+    new_index = {0: 0}
+    for state in order:
+        for _, child in sorted(children[state].items()):
+            if child not in new_index:
+                new_index[child] = len(order)
+                order.append(child)
+    
+    transitions = np.full((len(order), len(alphabet)), -1, dtype=np.int32)
+    final_mask = np.zeros(len(order), dtype=bool)
+    for state in order:
+        row = new_index[state]
+        for symbol_idx, child in children[state].items():
+            transitions[row, symbol_idx] = new_index[child]
+        final_mask[row] = final[state]
+    
+    return CompactAFD(transitions, final_mask, 0, alphabet)
+
+def _state_traffic(afd, conjugations):
+    """Peso de las palabras que pasan por cada estado y por cada transición (estado, símbolo)."""
+    state_weight = np.zeros(afd.num_states)
+    transition_weight = np.zeros(afd.transitions.shape)
+    for word in conjugations:
+        encoded = afd.encode(word)
+        if -1 in encoded:
+            continue
+        weight = word_weight(word)
+        state = afd.initial_state
+        state_weight[state] += weight
+        for symbol_idx in encoded:
+            transition_weight[state, symbol_idx] += weight
+            state = afd.transitions[state, symbol_idx]
+            if state == -1:
+                break
+            state_weight[state] += weight
+    return state_weight, transition_weight
+
+def _state_heights(afd):
+    """Longitud del camino más largo hasta un estado sin salidas (el AFD es acíclico)."""
+    heights = np.full(afd.num_states, -1, dtype=np.int64)
+    stack = [(afd.initial_state, False)]
+    while stack:
+        state, expanded = stack.pop()
+        targets = afd.transitions[state][afd.transitions[state] != -1]
+        if expanded:
+            heights[state] = heights[targets].max() + 1 if targets.size else 0
+        elif heights[state] == -1:
+            # Postorden: la altura de un estado se calcula después de la de sus sucesores
+            stack.append((state, True))
+            stack.extend((int(target), False) for target in targets if heights[target] == -1)
+    return np.maximum(heights, 0)
+
+def _partition_states(heights, state_weight, num_blocks):
+    """
+    Agrupa los estados en num_blocks bloques.
+    
+    Los estados se separan primero por altura (bandas de alturas contiguas si
+    hay menos bloques que alturas). Los bloques sobrantes se reparten entre las
+    alturas más pobladas y se dan a sus estados de más tráfico, que así
+    conservan exactamente sus transiciones.
+    """
+    num_states = len(heights)
+    distinct = sorted(set(heights.tolist()), reverse=True)
+    
+    if num_blocks < len(distinct):
+        # Bandas de alturas contiguas con un número parecido de estados
+        counts = [int((heights == h).sum()) for h in distinct]
+        bounds = np.linspace(0, num_states, num_blocks + 1)[1:]
+        band_of_height, band, accumulated = {}, 0, 0
+        for h, count in zip(distinct, counts):
+            band_of_height[h] = band
+            accumulated += count
+            while band < num_blocks - 1 and accumulated >= bounds[band]:
+                band += 1
+        return np.array([band_of_height[h] for h in heights.tolist()], dtype=np.int64)
+    
+    # Un bloque por altura y los sobrantes para los estados de más tráfico
+    groups = {h: sorted(np.flatnonzero(heights == h).tolist(), key=lambda s: -state_weight[s]) for h in distinct}
+    extra = {h: 0 for h in distinct}
+    for _ in range(num_blocks - len(distinct)):
+        candidates = [h for h in distinct if extra[h] + 1 < len(groups[h])]
+        if not candidates:
+            break
+        h = max(candidates, key=lambda h: len(groups[h]) - extra[h])
+        extra[h] += 1
+    
+    blocks = np.zeros(num_states, dtype=np.int64)
+    next_block = 0
+    for h in distinct:
+        states = groups[h]
+        for state in states[:extra[h]]:
+            blocks[state] = next_block
+            next_block += 1
+        for state in states[extra[h]:]:
+            blocks[state] = next_block
+        next_block += 1
+    return blocks
+
+def approximate_dfa(conjugations, alphabet, num_states, minimal=None):
+    """
+    Aproximación del AFD mínimo con exactamente num_states estados (formato del AG).
+    
+    Si el AFD mínimo cabe, se rellena con estados sin transiciones. Si no, sus
+    estados se agrupan por altura (ver _partition_states) y cada bloque toma,
+    símbolo por símbolo, el destino con más peso de palabras; un bloque es final
+    si contiene algún estado final. El estado inicial es siempre el 0.
+    """
+    minimal = minimal if minimal is not None else build_minimal_dfa(conjugations, alphabet)
+    if minimal.num_states <= num_states:
+        padding = num_states - minimal.num_states
+        transitions = np.vstack([minimal.transitions, np.full((padding, len(minimal.alphabet)), -1, dtype=np.int32)])
+        final_mask = np.concatenate([minimal.final_mask, np.zeros(padding, dtype=bool)])
+        return CompactAFD(transitions, final_mask, 0, minimal.alphabet)
+    
+    state_weight, transition_weight = _state_traffic(minimal, conjugations)
+    blocks = _partition_states(_state_heights(minimal), state_weight, num_states)
+    # El bloque del estado inicial pasa a ser el 0 (intercambio de etiquetas)
+    root_block = blocks[minimal.initial_state]
+    blocks = np.where(blocks == root_block, 0, np.where(blocks == 0, root_block, blocks))
+    
+    # Peso acumulado de cada transición entre bloques: (bloque, símbolo) → bloque destino
+    num_symbols = len(minimal.alphabet)
+    votes = np.zeros((num_states, num_symbols, num_states))
+    sources, symbols = np.nonzero(minimal.transitions != -1)
+    targets = minimal.transitions[sources, symbols]
+    # El mínimo peso positivo evita que las transiciones sin tráfico queden descartadas
+    np.add.at(votes, (blocks[sources], symbols, blocks[targets]), transition_weight[sources, symbols] + 1e-9)
+    
+    transitions = np.where(votes.max(axis=2) > 0, votes.argmax(axis=2), -1).astype(np.int32)
+    final_mask = np.zeros(num_states, dtype=bool)
+    final_mask[np.unique(blocks[minimal.final_mask])] = True
+    return CompactAFD(transitions, final_mask, 0, minimal.alphabet)
+
+def seed_population(conjugations, alphabet, num_states, count, mutate=None):
+    """
+    `count` individuos iniciales construidos a partir de las conjugaciones.
+    
+    El primero es la aproximación de approximate_dfa y el resto son variantes
+    suyas obtenidas con mutate (por defecto genetico.mutate) para no sembrar
+    copias idénticas.
+    """
+    if count <= 0:
+        return []
+    if mutate is None:
+        from genetico import mutate
+    base = approximate_dfa(conjugations, alphabet, num_states)
+    return [base] + [mutate(base) for _ in range(count - 1)]
@@ -1,12 +1,191 @@
-from afd import accepts_input
+import hashlib
+import math
+from collections import OrderedDict
+from fractions import Fraction
+import numpy as np
+from afd import build_symbol_table
+
+class ConjugationTrie:
+    """
+    Conjugaciones compiladas en un trie, con los pesos de cada palabra precalculados.
+    
+    Los nodos están en preorden (DFS): el padre de un nodo siempre tiene un índice
+    menor, así que recorrer los nodos en orden es un DFS sobre el trie.
+    """
+
+    def __init__(self, conjugations, alphabet):
+        self.words = list(conjugations)
+        self.alphabet, self.symbol_index = build_symbol_table(tuple(alphabet))
+        
+        # Construcción con hijos en diccionarios; las palabras con símbolos fuera
+        # del alfabeto nunca pueden ser aceptadas y no generan nodos
+        children = [{}]
+        word_nodes = []
+        for word in self.words:
+            node = 0
+            for symbol in word:
+                symbol_idx = self.symbol_index.get(symbol)
+                if symbol_idx is None:
+                    node = -1
+                    break
+                if symbol_idx not in children[node]:
+                    children[node][symbol_idx] = len(children)
+                    children.append({})
+                node = children[node][symbol_idx]
+            word_nodes.append(node)
+        
+        # Renumerar en preorden
+        preorder = []
+        stack = [(0, -1, -1, 0)]  # (nodo, padre en preorden, símbolo, profundidad)
+        new_index = [0] * len(children)
+        self.parents, self.symbols, self.depths = [], [], []
+        while stack:
+            node, parent, symbol_idx, depth = stack.pop()
+            new_index[node] = len(preorder)
+            preorder.append(node)
+            self.parents.append(parent)
+            self.symbols.append(symbol_idx)
+            self.depths.append(depth)
+            for child_symbol, child in sorted(children[node].items(), reverse=True):
+                stack.append((child, new_index[node], child_symbol, depth + 1))
+        
+        self.terminal_nodes = [new_index[node] if node != -1 else -1 for node in word_nodes]
+        self.weights = [word_weight(word) for word in self.words]
+        self.total_weight = math.fsum(self.weights)
+        self.num_nodes = len(self.parents)
+        self.fingerprint = hashlib.blake2b(repr((self.alphabet, self.words)).encode(), digest_size=16).digest()
+        self._levels = None
+        self._subtree_ends = None
+        self._node_arrays = None
+        self._terminal_arrays = None
+        self._words_by_node = None
+
+    def __len__(self):
+        return len(self.words)
+
+    def levels(self):
+        """Nodos agrupados por profundidad (para el recorrido vectorizado por niveles)."""
+        if self._levels is None:
+            depths = np.array(self.depths, dtype=np.int64)
+            parents = np.array(self.parents, dtype=np.int64)
+            symbols = np.array(self.symbols, dtype=np.int64)
+            self._levels = []
+            for depth in range(1, max(self.depths) + 1):
+                nodes = np.flatnonzero(depths == depth)
+                self._levels.append((nodes, parents[nodes], symbols[nodes]))
+        return self._levels
+
+    def node_arrays(self):
+        """(profundidades, padres, símbolos) de todos los nodos como arreglos de NumPy."""
+        if self._node_arrays is None:
+            self._node_arrays = (np.array(self.depths, dtype=np.int64), np.array(self.parents, dtype=np.int64),
+                                 np.array(self.symbols, dtype=np.int64))
+        return self._node_arrays
+
+    def terminal_arrays(self):
+        """
+        (nodo terminal, clase de peso, pesos exactos por clase, no vacía) de cada palabra.
+        
+        Las palabras fuera del alfabeto apuntan a la columna muerta (num_nodes).
+        Los pesos se guardan como fracciones exactas para sumar por clases.
+        """
+        if self._terminal_arrays is None:
+            terminals = np.array([node if node != -1 else self.num_nodes for node in self.terminal_nodes],
+                                 dtype=np.int64)
+            values = sorted(set(self.weights))
+            class_of = {weight: i for i, weight in enumerate(values)}
+            classes = np.array([class_of[weight] for weight in self.weights], dtype=np.int64)
+            nonempty = np.array([0 < node for node in self.terminal_nodes], dtype=bool)
+            self._terminal_arrays = (terminals, classes, [Fraction(weight) for weight in values], nonempty)
+        return self._terminal_arrays
+
+    def words_by_node(self):
+        """Palabras ordenadas por nodo terminal: order[starts[a]:starts[b]] terminan en los nodos a..b-1."""
+        if self._words_by_node is None:
+            terminals = self.terminal_arrays()[0]
+            order = np.argsort(terminals, kind="stable")
+            starts = np.searchsorted(terminals[order], np.arange(self.num_nodes + 2))
+            self._words_by_node = (order, starts)
+        return self._words_by_node
+
+    def subtree_ends(self):
+        """Fin (exclusivo) del subárbol de cada nodo: en preorden, node..end-1 son sus descendientes."""
+        if self._subtree_ends is None:
+            sizes = [1] * self.num_nodes
+            for node in range(self.num_nodes - 1, 0, -1):
+                sizes[self.parents[node]] += sizes[node]
+            self._subtree_ends = np.arange(self.num_nodes, dtype=np.int64) + np.array(sizes, dtype=np.int64)
+        return self._subtree_ends
+
+def compile_conjugations(conjugations, alphabet):
+    """Compila la lista de conjugaciones en un trie (una vez por ejecución)."""
+    return ConjugationTrie(conjugations, alphabet)
+
+def _as_trie(conjugations, afd):
+    """Acepta una lista de conjugaciones o un trie ya compilado."""
+    if isinstance(conjugations, ConjugationTrie):
+        return conjugations
+    return compile_conjugations(conjugations, afd.alphabet)
+
+def walk_trie(afd, trie):
+    """Recorre el trie una vez con el AFD y devuelve el estado alcanzado en cada nodo (-1 = rechazo)."""
+    rows = afd.transitions.tolist()
+    parents, symbols = trie.parents, trie.symbols
+    
+    node_states = [-1] * trie.num_nodes
+    node_states[0] = afd.initial_state
+    for node in range(1, trie.num_nodes):
+        parent_state = node_states[parents[node]]
+        if parent_state != -1:
+            node_states[node] = rows[parent_state][symbols[node]]
+    
+    return node_states
+
+def _trie_results(afd, trie):
+    """Recall ponderado y estados finales alcanzados por conjugaciones completas."""
+    node_states = walk_trie(afd, trie)
+    final_mask = afd.final_mask.tolist()
+    
+    accepted_weights = []
+    valid_final_states = set()
+    for node, weight in zip(trie.terminal_nodes, trie.weights):
+        if node == -1:
+            continue
+        state = node_states[node]
+        if state != -1 and final_mask[state]:
+            accepted_weights.append(weight)
+            if node != 0:  # La palabra vacía no valida ningún estado final
+                valid_final_states.add(state)
+    
+    # fsum: redondeo exacto e independiente del orden, igual en todos los caminos
+    weighted_correct = math.fsum(accepted_weights)
+    weighted_recall = weighted_correct / trie.total_weight if trie.total_weight > 0 else 0
+    return weighted_recall, valid_final_states, len(accepted_weights)
+
+def count_accepted(afd, conjugations):
+    """Número de conjugaciones aceptadas por el AFD."""
+    return _trie_results(afd, _as_trie(conjugations, afd))[2]
+
+def _final_states_penalty(num_final_states, num_valid_final_states):
+    """Penalización entre 0 y 1 según la proporción de estados finales inválidos."""
+    # Penalización basada en estados finales inválidos
+    if num_final_states == 0:
+        return 1.0  # Si no hay estados finales, máxima penalización
+    
+    # Calcular la penalización
+    invalid_ratio = (num_final_states - num_valid_final_states) / num_final_states
+    
+    # Convertir la penalización a un valor entre 0 y 1
+    # Cuantos más estados finales inválidos, mayor la penalización
+    return min(1.0, invalid_ratio * 1.5)  # Máximo 1.0
 
 def validate_final_states(afd, conjugations):
     """
     Verifica si los estados finales del AFD son realmente estados de conjugaciones completas.
     
     Parámetros:
-    - afd: Diccionario que representa el Autómata Finito Determinista
-    - conjugations: Lista de conjugaciones correctas
+    - afd: CompactAFD que representa el Autómata Finito Determinista
+    - conjugations: Lista de conjugaciones correctas (o trie compilado)
     
     Retorna:
     - penalty: Un valor de penalización entre 0 y 1
@@ -16,82 +195,459 @@ def validate_final_states(afd, conjugations):
         return 1.0  # Sin conjugaciones, máxima penalización
     
     # Rastrear estados que realmente llevan a conjugaciones completas
-    valid_final_states = set()
+    _, valid_final_states, _ = _trie_results(afd, _as_trie(conjugations, afd))
     
-    # Verificar cada conjugación
-    for word in conjugations:
-        current_state = afd["initial_state"]
-        for i, symbol in enumerate(word):
-            # Transición al siguiente estado
-            current_state = afd["transitions"].get((current_state, symbol), -1)
-            
-            # Si no hay transición, la palabra no es válida
-            if current_state == -1:
-                break
-            
-            # Si es el último símbolo y es un estado final, marcarlo como válido
-            if i == len(word) - 1 and current_state in afd["final_states"]:
-                valid_final_states.add(current_state)
-    
-    # Calcular porcentaje de estados finales inválidos
-    invalid_final_states = afd["final_states"] - valid_final_states
+    return _final_states_penalty(int(afd.final_mask.sum()), len(valid_final_states))
+
+def word_weight(word):
+    """Peso de una conjugación: las palabras largas y las compuestas valen más."""
+    # Peso basado en longitud: palabras más largas valen más
+    weight = 1.0 + min(0.5, len(word) / 20)  # Máximo 50% extra de peso
     
-    # Penalización basada en estados finales inválidos
-    if len(afd["final_states"]) == 0:
-        return 1.0  # Si no hay estados finales, máxima penalización
+    # Peso adicional para conjugaciones con espacio (más complejas)
+    if " " in word:
+        weight *= 1.2  # 20% extra para conjugaciones compuestas
     
-    # Calcular la penalización
-    invalid_ratio = len(invalid_final_states) / len(afd["final_states"])
+    return weight
+
+class FitnessCache:
+    """
+    Caché LRU acotada del puntaje base del fitness.
     
-    # Convertir la penalización a un valor entre 0 y 1
-    # Cuantos más estados finales inválidos, mayor la penalización
-    return min(1.0, invalid_ratio * 1.5)  # Máximo 1.0
+    Solo guarda la parte que depende del AFD y de las conjugaciones; el bonus de
+    diversidad depende de la población de cada generación y se suma aparte.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Devuelve el puntaje guardado (o None) y actualiza los contadores."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Aciertos, fallos y tasa de aciertos (evaluaciones ahorradas)."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def _base_score(afd, weighted_recall, final_states_penalty, total_correct):
+    """Puntaje sin bonus de diversidad ni recorte a [0,1] (lo que se guarda en caché)."""
+    # Peso incrementado para la precisión
+    precision_weight = 0.95  # Ligero ajuste
+    
+    # Reducir la penalización por complejidad
+    complexity_penalty = min(0.15, afd.num_states / (4 * total_correct))
+    
+    # Calcular puntaje base
+    return (precision_weight * weighted_recall) - complexity_penalty - final_states_penalty
+
+def _final_score(afd, base_score, current_population, distance_row=None):
+    """Suma el bonus por diversidad al puntaje base y lo recorta a [0,1]."""
+    score = base_score
+    
+    # Bonus por diversidad si tenemos la población actual
+    if current_population and len(current_population) > 0:
+        if distance_row is not None:
+            # Fila ya calculada de la matriz de distancias de la generación
+            avg_diversity = sum(distance_row) / len(current_population)
+        else:
+            from genetico import diversity_measure
+            avg_diversity = sum(diversity_measure(afd, other) for other in current_population) / len(current_population)
+        diversity_bonus = 0.05 * avg_diversity  # Bonus por diversidad
+        score += diversity_bonus
+    
+    # Asegurar que el score esté en el rango [0,1]
+    return max(0.0, min(1.0, score))
 
-def evaluate_afd(afd, correct_conjugations, current_population=None):
-    """Evalúa el AFD con bonus por diversidad si se proporciona la población actual."""
+def evaluate_afd(afd, correct_conjugations, current_population=None, cache=None):
+    """
+    Evalúa el AFD con bonus por diversidad si se proporciona la población actual.
+    
+    correct_conjugations puede ser una lista o un trie de compile_conjugations;
+    con el trie el recall ponderado y los estados finales válidos salen de un solo DFS.
+    Si se pasa una FitnessCache, el puntaje base se reutiliza entre llamadas.
+    """
     if not correct_conjugations:
         return 0
     
-    # Peso incrementado para la precisión
-    precision_weight = 0.95  # Ligero ajuste
+    trie = _as_trie(correct_conjugations, afd)
+    
+    key = (trie.fingerprint, afd.fingerprint()) if cache is not None else None
+    base_score = cache.get(key) if cache is not None else None
+    
+    if base_score is None:
+        weighted_recall, valid_final_states, _ = _trie_results(afd, trie)
+        
+        # Penalización por estados finales inválidos
+        final_states_penalty = _final_states_penalty(int(afd.final_mask.sum()), len(valid_final_states))
+        
+        base_score = _base_score(afd, weighted_recall, final_states_penalty, len(trie))
+        if cache is not None:
+            cache.put(key, base_score)
+    
+    return _final_score(afd, base_score, current_population)
+
+def _stack_population(population, num_symbols):
+    """
+    Apila todas las tablas en una sola con desplazamientos por individuo.
+    
+    El último estado es un sumidero común que representa el rechazo. Retorna
+    (tabla, finales, desplazamientos, sumidero).
+    """
+    num_states = np.array([afd.num_states for afd in population], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(num_states)[:-1]))
+    sink = int(num_states.sum())
+    
+    table = np.full((sink + 1, num_symbols), sink, dtype=np.int64)
+    finals = np.zeros(sink + 1, dtype=bool)
+    for afd, offset in zip(population, offsets):
+        block = afd.transitions.astype(np.int64)
+        table[offset:offset + afd.num_states] = np.where(block >= 0, block + offset, sink)
+        finals[offset:offset + afd.num_states] = afd.final_mask
+    return table, finals, offsets, sink
+
+def _scores_from_node_states(population, trie, node_states, finals, offsets, sink):
+    """Puntajes base a partir del estado (apilado) de cada individuo en cada nodo del trie."""
+    terminal_nodes = np.array(trie.terminal_nodes, dtype=np.int64)
+    word_states = node_states[:, terminal_nodes]  # -1 toma la columna muerta
+    accepted = finals[word_states]
+    
+    weights = np.array(trie.weights, dtype=np.float64)
+    weighted_correct = [math.fsum(weights[row]) for row in accepted]
     
-    # Calcular precisión básica
-    total_correct = len(correct_conjugations)
+    # Estados finales alcanzados por alguna conjugación aceptada (no vacía)
+    nonempty = terminal_nodes > 0
+    reached = np.zeros(sink + 1, dtype=bool)
+    reached[word_states[accepted & nonempty]] = True
+    valid_counts = np.add.reduceat(reached[:sink], offsets).tolist()
+    final_counts = np.add.reduceat(finals[:sink], offsets).tolist()
     
-    # Introducir peso por longitud para favorecer palabras largas y complejas
-    weighted_correct = 0
-    total_weights = 0
+    base_scores = []
+    for i, afd in enumerate(population):
+        weighted_recall = weighted_correct[i] / trie.total_weight if trie.total_weight > 0 else 0
+        final_states_penalty = _final_states_penalty(final_counts[i], valid_counts[i])
+        base_scores.append(_base_score(afd, weighted_recall, final_states_penalty, len(trie)))
     
-    for word in correct_conjugations:
-        # Peso basado en longitud: palabras más largas valen más
-        weight = 1.0 + min(0.5, len(word) / 20)  # Máximo 50% extra de peso
+    return base_scores
+
+def walk_population(population, trie):
+    """
+    Recorre el trie con todos los AFDs a la vez, un nivel por paso.
+    
+    Retorna (estados por nodo, finales, desplazamientos, sumidero) con los
+    estados apilados de _stack_population; la columna extra es un nodo siempre
+    muerto para las palabras con símbolos fuera del alfabeto.
+    """
+    table, finals, offsets, sink = _stack_population(population, len(trie.alphabet))
+    node_states = np.full((len(population), trie.num_nodes + 1), sink, dtype=np.int64)
+    node_states[:, 0] = offsets + np.array([afd.initial_state for afd in population], dtype=np.int64)
+    for nodes, parents, symbols in trie.levels():
+        node_states[:, nodes] = table[node_states[:, parents], symbols]
+    return node_states, finals, offsets, sink
+
+def population_base_scores(population, trie):
+    """Puntajes base de todos los AFDs recorriendo el trie a la vez con NumPy."""
+    return _scores_from_node_states(population, trie, *walk_population(population, trie))
+
+class PathRecord:
+    """Recorrido de un AFD evaluado: estado en cada nodo y conteos de palabras aceptadas."""
+    
+    __slots__ = ("transitions", "initial_state", "final_mask", "states", "keys", "class_counts", "reach_counts")
+
+    def __init__(self, afd, states, class_counts, reach_counts):
+        self.transitions = afd.transitions.copy()
+        self.initial_state = afd.initial_state
+        self.final_mask = afd.final_mask
+        self.states = states                # estado en cada nodo del trie (-1 = rechazo; última columna muerta)
+        self.keys = None                    # transición usada por cada nodo (se calcula al usarlo como padre)
+        self.class_counts = class_counts    # palabras aceptadas por clase de peso
+        self.reach_counts = reach_counts    # palabras aceptadas (no vacías) que terminan en cada estado
+
+    def path_keys(self, trie):
+        """
+        Índice de caminos: transición (estado × símbolo en plano) que usa cada nodo.
         
-        # Peso adicional para conjugaciones con espacio (más complejas)
-        if " " in word:
-            weight *= 1.2  # 20% extra para conjugaciones compuestas
+        La raíz, los nodos en rechazo y la columna muerta apuntan a una posición
+        extra que nunca cambia.
+        """
+        if self.keys is None:
+            _, parents, symbols = trie.node_arrays()
+            num_transitions = self.transitions.size
+            parent_states = self.states[parents[1:]]
+            keys = np.full(self.states.size, num_transitions, dtype=np.int64)
+            keys[1:trie.num_nodes] = np.where(parent_states >= 0,
+                                              parent_states * self.transitions.shape[1] + symbols[1:],
+                                              num_transitions)
+            self.keys = keys
+        return self.keys
+
+class PathRecords:
+    """
+    Recorridos ya calculados, para reevaluar de forma incremental a los hijos.
+    
+    Por cada AFD evaluado (clave: su huella) guarda un PathRecord. Cada nodo del
+    trie usa exactamente una transición (estado del padre, símbolo), así que el
+    estado por nodo es también el índice de transiciones usadas por cada palabra.
+    Un hijo que recuerda a su padre (afd.lineage) solo vuelve a recorrer los
+    subárboles del trie que pasan por una transición modificada, y solo
+    actualiza los conteos de las palabras que terminan en ellos.
+    """
+
+    def __init__(self, trie, maxsize=256):
+        self.trie = trie
+        self.maxsize = maxsize
+        self.incremental = 0     # Hijos evaluados a partir del recorrido del padre
+        self.full = 0            # AFDs recorridos desde cero
+        self.nodes_walked = 0    # Nodos recalculados (frente a num_nodes por AFD en un recorrido completo)
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        record = self._entries.get(key)
+        if record is not None:
+            self._entries.move_to_end(key)
+        return record
+
+    def put(self, key, record):
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def parent_of(self, afd):
+        """Registro del padre si sirve de base para el hijo (misma forma y estado inicial); si no, None."""
+        if afd.lineage is None:
+            return None
+        record = self.get(afd.lineage)
+        if record is None:
+            return None
+        if record.transitions.shape != afd.transitions.shape or record.initial_state != afd.initial_state:
+            return None
+        return record
+
+    def stats(self):
+        evaluated = self.incremental + self.full
+        return {
+            "incremental": self.incremental,
+            "full": self.full,
+            "nodes_walked": self.nodes_walked,
+            "walk_fraction": self.nodes_walked / (evaluated * self.trie.num_nodes) if evaluated else 0.0,
+        }
+
+def _merge_subtrees(starts, ends):
+    """Rangos [start, end) de subárboles en preorden, sin los anidados dentro de otro."""
+    keep_starts, keep_ends = [], []
+    current_end = -1
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if start >= current_end:
+            keep_starts.append(start)
+            keep_ends.append(end)
+            current_end = end
+    return np.array(keep_starts, dtype=np.int64), np.array(keep_ends, dtype=np.int64)
+
+def _concat_ranges(order, starts, ends):
+    """order[starts[0]:ends[0]] + order[starts[1]:ends[1]] + ... sin bucles."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    positions = np.arange(total, dtype=np.int64) + shifts
+    return positions if order is None else order[positions]
+
+def _exact_weight(trie, class_counts):
+    """Suma exacta de los pesos aceptados: mismo redondeo que math.fsum sobre la lista de pesos."""
+    class_weights = trie.terminal_arrays()[2]
+    return float(sum(count * weight for count, weight in zip(class_counts.tolist(), class_weights) if count))
+
+def _score_from_counts(afd, trie, class_counts, reach_counts):
+    weighted_correct = _exact_weight(trie, class_counts)
+    weighted_recall = weighted_correct / trie.total_weight if trie.total_weight > 0 else 0
+    final_states_penalty = _final_states_penalty(int(np.count_nonzero(afd.final_mask)),
+                                                 int(np.count_nonzero(reach_counts)))
+    return _base_score(afd, weighted_recall, final_states_penalty, len(trie))
+
+def _word_counts(afd, trie, word_states):
+    """Palabras aceptadas por clase de peso y por estado final (sin la palabra vacía)."""
+    _, weight_classes, class_weights, nonempty = trie.terminal_arrays()
+    accepted = word_states >= 0
+    accepted[accepted] = afd.final_mask[word_states[accepted]]
+    class_counts = np.bincount(weight_classes[accepted], minlength=len(class_weights))
+    reach_counts = np.bincount(word_states[accepted & nonempty], minlength=afd.num_states)
+    return class_counts, reach_counts
+
+def _recompute_nodes(afd, trie, states, nodes):
+    """Recalcula in situ el estado de los nodos indicados (en preorden), nivel por nivel."""
+    depths, parents, symbols = trie.node_arrays()
+    # Fila extra de -1: un nodo cuyo padre está en rechazo (-1) sigue en rechazo
+    table = np.vstack([afd.transitions, np.full((1, afd.transitions.shape[1]), -1, dtype=afd.transitions.dtype)])
+    order = np.argsort(depths[nodes], kind="stable")
+    nodes = nodes[order]
+    bounds = np.flatnonzero(np.diff(depths[nodes])) + 1
+    for level in np.split(nodes, bounds):
+        states[level] = table[states[parents[level]], symbols[level]]
+
+def _incremental_record(afd, trie, parent):
+    """Registro del hijo a partir del de su padre, recorriendo solo los subárboles afectados."""
+    terminal_nodes, weight_classes, class_weights, nonempty = trie.terminal_arrays()
+    word_order, word_starts = trie.words_by_node()
+    
+    # Nodos cuya transición cambió y subárboles que cuelgan de ellos
+    changed = np.append(parent.transitions.reshape(-1) != afd.transitions.reshape(-1), False)
+    starts = np.flatnonzero(changed[parent.path_keys(trie)])
+    starts, ends = _merge_subtrees(starts, trie.subtree_ends()[starts])
+    nodes = _concat_ranges(None, starts, ends)
+    
+    states = parent.states.copy()
+    if nodes.size:
+        _recompute_nodes(afd, trie, states, nodes)
+    
+    if parent.final_mask is not afd.final_mask and not np.array_equal(parent.final_mask, afd.final_mask):
+        # Cambiaron los estados finales: la aceptación de todas las palabras puede cambiar
+        class_counts, reach_counts = _word_counts(afd, trie, states[terminal_nodes])
+    else:
+        # Solo cambian las palabras que terminan dentro de los subárboles recorridos
+        words = _concat_ranges(word_order, word_starts[starts], word_starts[ends])
+        class_counts = parent.class_counts.copy()
+        reach_counts = parent.reach_counts.copy()
+        for sign, word_states in ((-1, parent.states[terminal_nodes[words]]), (1, states[terminal_nodes[words]])):
+            accepted = word_states >= 0
+            accepted[accepted] = afd.final_mask[word_states[accepted]]
+            np.add.at(class_counts, weight_classes[words[accepted]], sign)
+            np.add.at(reach_counts, word_states[accepted & nonempty[words]], sign)
+    
+    return PathRecord(afd, states, class_counts, reach_counts), int(nodes.size)
+
+def incremental_base_scores(population, trie, records):
+    """
+    Mismos puntajes que population_base_scores, reutilizando los recorridos de los padres.
+    
+    Los AFDs cuyo padre está en records parten de una copia del recorrido del
+    padre y solo recalculan los subárboles que empiezan en un nodo cuya
+    transición (estado del padre, símbolo) cambió; los demás se recorren
+    completos y a la vez como en population_base_scores. Al terminar, records
+    guarda el recorrido de todos los AFDs evaluados.
+    """
+    base_scores = [None] * len(population)
+    full_rows = []
+    
+    for i, afd in enumerate(population):
+        parent = records.parent_of(afd)
+        if parent is None:
+            full_rows.append(i)
+            continue
+        record, nodes_walked = _incremental_record(afd, trie, parent)
+        base_scores[i] = _score_from_counts(afd, trie, record.class_counts, record.reach_counts)
+        records.put(afd.fingerprint(), record)
+        records.incremental += 1
+        records.nodes_walked += nodes_walked
+    
+    if full_rows:
+        # Recorrido completo (vectorizado) de los AFDs sin padre conocido
+        subset = [population[i] for i in full_rows]
+        node_states, finals, offsets, sink = walk_population(subset, trie)
+        for i, score in zip(full_rows, _scores_from_node_states(subset, trie, node_states, finals, offsets, sink)):
+            base_scores[i] = score
         
-        total_weights += weight
-        if accepts_input(afd, word):
-            weighted_correct += weight
+        local_states = (node_states - offsets[:, None]).astype(np.int32)
+        local_states[node_states == sink] = -1
+        terminal_nodes = trie.terminal_arrays()[0]
+        for afd, states in zip(subset, local_states):
+            class_counts, reach_counts = _word_counts(afd, trie, states[terminal_nodes])
+            records.put(afd.fingerprint(), PathRecord(afd, states, class_counts, reach_counts))
+        records.full += len(full_rows)
+        records.nodes_walked += len(full_rows) * (trie.num_nodes - 1)
     
-    # Precisión ponderada
-    weighted_recall = weighted_correct / total_weights if total_weights > 0 else 0
+    return base_scores
+
+def _split_exact(result):
+    """(puntajes, exactos) de un scorer; exactos es None si todos los puntajes son exactos."""
+    if isinstance(result, tuple):
+        return result
+    return result, None
+
+def evaluate_population(population, correct_conjugations, current_population=None, cache=None, distances=None,
+                        scorer=None):
+    """
+    Evalúa toda la población en una sola llamada.
     
-    # Penalización por estados finales inválidos
-    final_states_penalty = validate_final_states(afd, correct_conjugations)
+    Todos los AFDs recorren el trie a la vez como arreglos de NumPy, un nivel
+    (una posición de carácter) por paso; las palabras que ya terminaron no tienen
+    nodos en los niveles siguientes. Devuelve exactamente los mismos valores que
+    [evaluate_afd(afd, correct_conjugations, current_population) for afd in population].
+    Con una FitnessCache solo se recorren los AFDs que no estaban en caché, y con
+    distances (matriz población × current_population de genetico.population_distance_matrix)
+    el bonus de diversidad se lee de la matriz en vez de recalcularse.
+    scorer permite sustituir el cálculo de los puntajes base (por ejemplo, por
+    el evaluador paralelo); recibe (población, trie) y devuelve una lista, o una
+    tupla (puntajes, exactos) si algunos puntajes son solo estimaciones (como
+    los descartados por evaluacion_carreras): esos no se guardan en la caché.
+    """
+    if not correct_conjugations:
+        return [0] * len(population)
+    if not population:
+        return []
     
-    # Reducir la penalización por complejidad
-    complexity_penalty = min(0.15, len(afd["states"]) / (4 * total_correct))
+    trie = _as_trie(correct_conjugations, population[0])
+    if scorer is None:
+        scorer = population_base_scores
     
-    # Calcular puntaje base
-    score = (precision_weight * weighted_recall) - complexity_penalty - final_states_penalty
+    if cache is None:
+        base_scores, _ = _split_exact(scorer(population, trie))
+    else:
+        base_scores = [None] * len(population)
+        pending = OrderedDict()  # huella -> índices de los AFDs que la comparten
+        for i, afd in enumerate(population):
+            key = (trie.fingerprint, afd.fingerprint())
+            if key in pending:
+                cache.hits += 1  # Repetido dentro de la misma población: se evalúa una vez
+                pending[key].append(i)
+                continue
+            base_scores[i] = cache.get(key)
+            if base_scores[i] is None:
+                pending[key] = [i]
+        
+        if pending:
+            computed, exact = _split_exact(scorer([population[indices[0]] for indices in pending.values()], trie))
+            for j, ((key, indices), base_score) in enumerate(zip(pending.items(), computed)):
+                if exact is None or exact[j]:
+                    # Solo los puntajes exactos: una estimación en caché la heredarían las copias del AFD
+                    cache.put(key, base_score)
+                for i in indices:
+                    base_scores[i] = base_score
     
-    # Bonus por diversidad si tenemos la población actual
-    if current_population and len(current_population) > 0:
-        from genetico import diversity_measure
-        avg_diversity = sum(diversity_measure(afd, other) for other in current_population) / len(current_population)
-        diversity_bonus = 0.05 * avg_diversity  # Bonus por diversidad
-        score += diversity_bonus
+    if distances is None or not current_population:
+        return [_final_score(afd, base_score, current_population)
+                for afd, base_score in zip(population, base_scores)]
     
-    # Asegurar que el score esté en el rango [0,1]
-    return max(0.0, min(1.0, score))
\ No newline at end of file
+    return [_final_score(afd, base_score, current_population, distance_row)
+            for afd, base_score, distance_row in zip(population, base_scores, distances.tolist())]
\ No newline at end of file
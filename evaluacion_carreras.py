@@ -0,0 +1,289 @@
+import math
+import random
+import numpy as np
+from minimizacion import reachable_states
+from evaluacion import (ConjugationTrie, walk_population, population_base_scores, _final_states_penalty,
+                        _base_score)
+
+# Calendario de muestras: la primera ronda usa MIN_SAMPLE palabras y cada ronda multiplica por ETA,
+# mientras no se supere MAX_SAMPLE_FRACTION del corpus (después, evaluación completa)
+MIN_SAMPLE = 32
+ETA = 4
+MAX_SAMPLE_FRACTION = 0.5
+DELTA = 0.05              # Probabilidad (total) de descartar por error un candidato por azar del muestreo
+CUTOFF_QUANTILE = 0.5     # Umbral de selección: este cuantil del fitness de la población actual
+DIVERSITY_MARGIN = 0.05   # Máximo bonus de diversidad que aún podría sumar el candidato
+# Las carreras solo se activan con al menos MIN_CORPUS_FACTOR × MIN_SAMPLE palabras: la primera
+# ronda cuesta entonces como mucho 1/8 de un recorrido completo. En el AG se descarta entre un 5 % y
+# un 17 % de los hijos por lote, así que con corpus menores (p. ej. los ~100 de un verbo) la
+# muestra cuesta más de lo que ahorran los descartes
+MIN_CORPUS_FACTOR = 8
+# Cada cuántos lotes se usan todas las rondas aunque el modelo de coste no lo aconseje,
+# para seguir midiendo la tasa de supervivencia de cada ronda
+PROBE_EVERY = 10
+
+def stratum_of(word):
+    """Estrato de una conjugación: longitud y si es compuesta (con espacio)."""
+    return len(word), " " in word
+
+def stratified_order(words, seed=0):
+    """
+    Orden de las palabras en el que cualquier prefijo es una muestra estratificada.
+    
+    Dentro de cada estrato (ver stratum_of) el orden es aleatorio, y los estratos
+    se intercalan en proporción a su tamaño: las primeras m palabras contienen
+    aproximadamente m·(tamaño del estrato / total) de cada estrato. Así las
+    muestras de rondas sucesivas están anidadas.
+    """
+    rng = random.Random(seed)  # Generador propio: no altera la secuencia del AG
+    strata = {}
+    for i, word in enumerate(words):
+        strata.setdefault(stratum_of(word), []).append(i)
+    
+    keyed = []
+    for key in sorted(strata):
+        members = strata[key]
+        rng.shuffle(members)
+        offset = rng.random()
+        keyed.extend(((j + offset) / len(members), i) for j, i in enumerate(members))
+    keyed.sort()
+    return [i for _, i in keyed]
+
+def _spearman(a, b):
+    """Correlación de rangos de Spearman (1 = mismo orden)."""
+    if len(a) < 2:
+        return 1.0
+    ranks_a = np.argsort(np.argsort(a, kind="stable"), kind="stable").astype(np.float64)
+    ranks_b = np.argsort(np.argsort(b, kind="stable"), kind="stable").astype(np.float64)
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return 1.0
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+class RacingEvaluator:
+    """
+    Evaluación por carreras (successive halving) para descartar pronto a los hijos sin opciones.
+    
+    Cada candidato se evalúa primero sobre una muestra estratificada pequeña de
+    las conjugaciones; la muestra crece por rondas (×eta) y en cada ronda se
+    descartan los candidatos cuya cota superior de Hoeffding del recall
+    ponderado no alcanza el umbral de selección actual (ver observe), ni
+    siquiera con el máximo bonus de diversidad. Solo los supervivientes pasan a
+    la evaluación completa (full_scorer). Los descartados reciben su puntaje
+    estimado en la muestra, que queda por debajo del umbral, marcado como no
+    exacto para que evaluate_population no lo guarde en la caché de fitness.
+    
+    En la cota, la penalización por estados finales es la mínima posible (todos
+    los finales alcanzables válidos); en la estimación de los descartados se
+    usa la de la muestra, que es pesimista. audit_every > 0 evalúa además por completo a todos los
+    candidatos cada cierto número de lotes para medir la concordancia de
+    rangos y los descartes erróneos, y así ajustar delta.
+    
+    Cada lote usa solo las rondas que minimizan el coste esperado (palabras
+    recorridas por candidato) según la supervivencia observada en cada ronda;
+    si ninguna compensa, el lote se evalúa completo. Con corpus de menos de
+    MIN_CORPUS_FACTOR × min_sample palabras no hay rondas.
+    
+    base_scores tiene la interfaz de los scorer de evaluate_population: retorna
+    (puntajes, exactos).
+    """
+    
+    _STATE_ATTRIBUTES = ("cutoff", "round_entered", "round_survived", "batches", "raced_batches", "positive_cutoffs",
+                         "candidates", "dropped", "full_evaluations", "words_evaluated", "audits", "false_drops",
+                         "rank_agreement")
+
+    def __init__(self, trie, full_scorer=None, min_sample=MIN_SAMPLE, eta=ETA,
+                 max_sample_fraction=MAX_SAMPLE_FRACTION, delta=DELTA, quantile=CUTOFF_QUANTILE,
+                 margin=DIVERSITY_MARGIN, audit_every=0, seed=0, min_corpus_factor=MIN_CORPUS_FACTOR,
+                 probe_every=PROBE_EVERY):
+        self.trie = trie
+        self.full_scorer = full_scorer if full_scorer is not None else population_base_scores
+        self.quantile = quantile
+        self.margin = margin
+        self.audit_every = audit_every
+        self.probe_every = probe_every
+        
+        # Muestras anidadas (una sub-trie por ronda)
+        order = stratified_order(trie.words, seed)
+        num_words = len(trie.words)
+        sizes = []
+        size = min_sample
+        while num_words >= min_corpus_factor * min_sample and size <= max_sample_fraction * num_words:
+            sizes.append(size)
+            size *= eta
+        self.rounds = []
+        for size in sizes:
+            sample = [trie.words[i] for i in order[:size]]
+            self.rounds.append((size, ConjugationTrie(sample, trie.alphabet)))
+        
+        # Cota de Hoeffding con corrección por población finita (muestreo sin reemplazo)
+        mean_weight = trie.total_weight / num_words if num_words else 1.0
+        max_weight = max(trie.weights, default=1.0)
+        round_delta = delta / max(1, len(self.rounds))
+        self._radii = [max_weight / mean_weight * math.sqrt(math.log(1 / round_delta) / (2 * size))
+                       * math.sqrt(max(0.0, 1 - (size - 1) / num_words))
+                       for size, _ in self.rounds]
+        self._mean_weight = mean_weight
+        self.restore(None)
+
+    def state(self):
+        """Umbral, supervivencia por ronda y contadores (para puntos de control y para las islas)."""
+        return {name: list(value) if isinstance(value, list) else value
+                for name, value in ((name, getattr(self, name)) for name in self._STATE_ATTRIBUTES)}
+
+    def restore(self, state):
+        """Recupera un estado de state(); None vuelve al estado inicial."""
+        if state is None:
+            state = {
+                "cutoff": None,
+                # Candidatos que entraron en cada ronda y los que la superaron (modelo de coste)
+                "round_entered": [0] * len(self.rounds),
+                "round_survived": [0] * len(self.rounds),
+                "rank_agreement": [],
+            }
+        for name in self._STATE_ATTRIBUTES:
+            value = state.get(name, 0)
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+    def observe(self, fitnesses):
+        """
+        Fija el umbral de selección a partir del fitness de la población actual.
+        
+        Si el cuantil es 0 (más de la mitad de la población sin fitness, algo
+        habitual al principio) ningún candidato quedaría por debajo; se usa
+        entonces el mismo cuantil entre los fitness positivos, y sin ninguno no
+        hay umbral (evaluación completa).
+        """
+        if not fitnesses:
+            return
+        values = np.asarray(fitnesses, dtype=np.float64)
+        cutoff = float(np.quantile(values, self.quantile))
+        if cutoff <= 0:
+            positive = values[values > 0]
+            cutoff = float(np.quantile(positive, self.quantile)) if positive.size else None
+            self.positive_cutoffs += 1
+        self.cutoff = cutoff
+
+    def expected_costs(self):
+        """
+        Palabras recorridas por candidato usando las k primeras rondas, para k = 0..rondas.
+        
+        k = 0 es la evaluación completa; las rondas aún no observadas cuentan con
+        supervivencia 1 (sin descartes).
+        """
+        num_words = len(self.trie)
+        costs = [float(num_words)]
+        sampled, alive = 0.0, 1.0
+        for (size, _), entered, survived in zip(self.rounds, self.round_entered, self.round_survived):
+            sampled += alive * size
+            alive *= survived / entered if entered else 1.0
+            costs.append(sampled + alive * num_words)
+        return costs
+
+    def _num_rounds(self):
+        """Rondas a usar en este lote: todas al sondear, si no las de menor coste esperado."""
+        if self.round_entered[0] == 0 or (self.probe_every and self.batches % self.probe_every == 0):
+            return len(self.rounds)
+        costs = self.expected_costs()
+        return min(range(len(costs)), key=costs.__getitem__)
+
+    def _sample_scores(self, population, sample_trie):
+        """Puntajes base estimados y recall ponderado de cada AFD en la muestra."""
+        node_states, finals, offsets, sink = walk_population(population, sample_trie)
+        terminal_nodes = np.array(sample_trie.terminal_nodes, dtype=np.int64)
+        word_states = node_states[:, terminal_nodes]
+        accepted = finals[word_states]
+        
+        # Media muestral de peso·aceptada, escalada por el peso medio del corpus completo
+        weights = np.array(sample_trie.weights, dtype=np.float64)
+        recall = (accepted @ weights) / len(sample_trie) / self._mean_weight
+        
+        nonempty = terminal_nodes > 0
+        reached = np.zeros(sink + 1, dtype=bool)
+        reached[word_states[accepted & nonempty]] = True
+        valid_counts = np.add.reduceat(reached[:sink], offsets).tolist()
+        final_counts = np.add.reduceat(finals[:sink], offsets).tolist()
+        
+        estimates = [_base_score(afd, min(1.0, recall[i]), _final_states_penalty(final_counts[i], valid_counts[i]),
+                                 len(self.trie))
+                     for i, afd in enumerate(population)]
+        return estimates, recall
+
+    def base_scores(self, population, trie=None):
+        """
+        Puntajes base: completos para los supervivientes y estimados para los descartados.
+        
+        Retorna (puntajes, exactos): exactos[i] es False si el puntaje i es una estimación.
+        """
+        self.batches += 1
+        self.candidates += len(population)
+        num_rounds = self._num_rounds() if self.cutoff is not None and self.rounds and population else 0
+        if num_rounds == 0:
+            # Sin umbral (población inicial), corpus demasiado pequeño o carreras sin ahorro esperado
+            self.full_evaluations += len(population)
+            self.words_evaluated += len(population) * len(self.trie)
+            return self.full_scorer(population, self.trie), [True] * len(population)
+        
+        scores = [None] * len(population)
+        alive = list(range(len(population)))
+        # Penalización mínima posible: solo los finales alcanzables pueden llegar a ser válidos
+        penalty_floor = [_final_states_penalty(int(afd.final_mask.sum()),
+                                               int((afd.final_mask & reachable_states(afd)).sum()))
+                         for afd in population]
+        self.raced_batches += 1
+        for r, ((size, sample_trie), radius) in enumerate(zip(self.rounds[:num_rounds], self._radii)):
+            estimates, recall = self._sample_scores([population[i] for i in alive], sample_trie)
+            self.words_evaluated += len(alive) * size
+            self.round_entered[r] += len(alive)
+            survivors = []
+            for j, i in enumerate(alive):
+                afd = population[i]
+                upper = _base_score(afd, min(1.0, recall[j] + radius), penalty_floor[i], len(self.trie))
+                if upper + self.margin < self.cutoff:
+                    scores[i] = estimates[j]
+                else:
+                    survivors.append(i)
+            self.round_survived[r] += len(survivors)
+            alive = survivors
+            if not alive:
+                break
+        
+        self.dropped += len(population) - len(alive)
+        self.full_evaluations += len(alive)
+        self.words_evaluated += len(alive) * len(self.trie)
+        if alive:
+            for i, score in zip(alive, self.full_scorer([population[i] for i in alive], self.trie)):
+                scores[i] = score
+        
+        if self.audit_every and self.batches % self.audit_every == 0:
+            self._audit(population, scores, set(alive))
+        survivors = set(alive)
+        return scores, [i in survivors for i in range(len(population))]
+
+    def _audit(self, population, scores, survivors):
+        """Compara con la evaluación completa de todos los candidatos del lote."""
+        exact = population_base_scores(population, self.trie)
+        self.audits += 1
+        self.rank_agreement.append(_spearman(scores, exact))
+        self.false_drops += sum(1 for i, score in enumerate(exact)
+                                if i not in survivors and score + self.margin >= self.cutoff)
+
+    def stats(self):
+        """Descartes, evaluaciones ahorradas y concordancia con la evaluación completa."""
+        full_cost = self.candidates * len(self.trie)
+        return {
+            "sample_sizes": [size for size, _ in self.rounds],
+            "cutoff": self.cutoff,
+            "positive_cutoffs": self.positive_cutoffs,
+            "batches": self.batches,
+            "raced_batches": self.raced_batches,
+            "round_survival": [survived / entered if entered else None
+                               for entered, survived in zip(self.round_entered, self.round_survived)],
+            "candidates": self.candidates,
+            "dropped": self.dropped,
+            "full_evaluations": self.full_evaluations,
+            "evaluations_saved": self.candidates - self.full_evaluations,
+            "word_evaluations_saved": 1 - self.words_evaluated / full_cost if full_cost else 0.0,
+            "audits": self.audits,
+            "rank_agreement": sum(self.rank_agreement) / len(self.rank_agreement) if self.rank_agreement else None,
+            "false_drops": self.false_drops,
+        }
@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from afd import CompactAFD
+from evaluacion import (compile_conjugations, evaluate_population, population_base_scores, incremental_base_scores,
+                        ConjugationTrie)
+
+# Trabajo mínimo (AFDs × nodos del trie de conjugaciones) para repartir la evaluación.
+# Recorrer el trie cuesta unos 30 ns por AFD y nodo, y cada reparto unos 4 ms fijos
+# (empaquetar, enviar, recoger), así que con 2 procesos compensa a partir de unos
+# 8 ms de trabajo en serie: ~250 000. Por ejemplo 40 AFDs con las 103 conjugaciones
+# de un verbo (601 nodos) son 24 000 y se evalúan en el mismo proceso; hace falta
+# un corpus de unos 20 verbos (7900 nodos) y 40 AFDs para llegar.
+MIN_PARALLEL_WORK = 250_000
+# A partir de este tamaño (en bytes) los AFDs viajan por memoria compartida en vez de por pickle
+SHARED_MEMORY_THRESHOLD = 256 * 1024
+
+# Estado de cada proceso trabajador: se fija una sola vez en el inicializador
+_WORKER_TRIE = None
+
+def _init_worker(trie):
+    """Recibe el corpus compilado (conjugaciones y pesos) una única vez por trabajador."""
+    global _WORKER_TRIE
+    _WORKER_TRIE = trie
+
+def pack_population(population):
+    """
+    Empaqueta la población en arreglos planos.
+    
+    Retorna (layout, arrays): layout guarda el número de estados y el estado
+    inicial de cada AFD; arrays = (tablas apiladas, máscaras finales concatenadas).
+    """
+    num_states = np.array([afd.num_states for afd in population], dtype=np.int64)
+    initial_states = np.array([afd.initial_state for afd in population], dtype=np.int64)
+    transitions = np.concatenate([afd.transitions.astype(np.int32, copy=False) for afd in population])
+    final_masks = np.concatenate([afd.final_mask for afd in population])
+    return (num_states, initial_states), (transitions, final_masks)
+
+def unpack_population(layout, transitions, final_masks, alphabet, start, stop):
+    """Reconstruye los AFDs start..stop a partir de los arreglos planos (copiando sus filas)."""
+    num_states, initial_states = layout
+    offsets = np.concatenate(([0], np.cumsum(num_states)))
+    population = []
+    for i in range(start, stop):
+        rows = slice(offsets[i], offsets[i + 1])
+        population.append(CompactAFD(np.array(transitions[rows]), np.array(final_masks[rows]),
+                                     int(initial_states[i]), alphabet))
+    return population
+
+def _score_chunk(layout, payload, start, stop):
+    """Tarea del trabajador: puntajes base de los AFDs start..stop."""
+    trie = _WORKER_TRIE
+    num_symbols = len(trie.alphabet)
+    
+    if isinstance(payload, str):
+        # Nombre de un bloque de memoria compartida con (tablas, máscaras) contiguas
+        total_states = int(layout[0].sum())
+        block = shared_memory.SharedMemory(name=payload)
+        try:
+            transitions = np.ndarray((total_states, num_symbols), dtype=np.int32, buffer=block.buf)
+            final_masks = np.ndarray((total_states,), dtype=bool, buffer=block.buf,
+                                     offset=transitions.nbytes)
+            population = unpack_population(layout, transitions, final_masks, trie.alphabet, start, stop)
+            del transitions, final_masks  # Liberar las vistas antes de cerrar el bloque
+        finally:
+            block.close()
+    else:
+        population = unpack_population(layout, *payload, trie.alphabet, start, stop)
+    
+    return population_base_scores(population, trie)
+
+class ParallelEvaluator:
+    """
+    Evaluador de poblaciones repartido entre procesos con concurrent.futures.
+    
+    El trie de conjugaciones (con los pesos ya calculados) se envía a cada
+    trabajador una vez al arrancar el pool; en cada generación solo viajan las
+    tablas de los AFDs, empaquetadas en arreglos y, si son grandes, por memoria
+    compartida. Si el trabajo (AFDs × nodos del trie) no llega a
+    min_parallel_work (o max_workers <= 1) evalúa en el mismo proceso (y lo
+    avisa una vez por on_status). Devuelve los mismos valores que evaluacion.evaluate_population.
+    Con path_records (evaluacion.PathRecords) la evaluación en el mismo proceso
+    es incremental: los hijos reutilizan el recorrido de su padre.
+    """
+
+    def __init__(self, conjugations, alphabet=None, max_workers=None,
+                 min_parallel_work=MIN_PARALLEL_WORK,
+                 shared_memory_threshold=SHARED_MEMORY_THRESHOLD, path_records=None, on_status=None):
+        if isinstance(conjugations, ConjugationTrie):
+            self.trie = conjugations
+        else:
+            if alphabet is None:
+                alphabet = sorted(set("".join(conjugations)))
+            self.trie = compile_conjugations(conjugations, alphabet)
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.min_parallel_work = min_parallel_work
+        self.shared_memory_threshold = shared_memory_threshold
+        self.path_records = path_records
+        self.on_status = on_status
+        self._executor = None
+        self._warned_serial = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Detiene los procesos trabajadores (si se llegaron a crear)."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self):
+        # El pool se crea al primer uso: las ejecuciones pequeñas nunca lo arrancan
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 initializer=_init_worker, initargs=(self.trie,))
+        return self._executor
+
+    def base_scores(self, population, trie=None):
+        """Puntajes base de la población (sin bonus de diversidad)."""
+        work = len(population) * self.trie.num_nodes
+        if self.max_workers <= 1 or work < self.min_parallel_work:
+            if self.max_workers > 1 and not self._warned_serial and self.on_status is not None:
+                self._warned_serial = True
+                self.on_status(f"{len(population)} AFDs × {self.trie.num_nodes} nodos (< {self.min_parallel_work}): "
+                               "se evalúa en el mismo proceso")
+            if self.path_records is not None:
+                return incremental_base_scores(population, self.trie, self.path_records)
+            return population_base_scores(population, self.trie)
+        
+        layout, (transitions, final_masks) = pack_population(population)
+        num_states, initial_states = layout
+        offsets = np.concatenate(([0], np.cumsum(num_states)))
+        
+        # Trozos contiguos, unos pocos por trabajador para equilibrar la carga
+        num_chunks = min(len(population), self.max_workers * 2)
+        bounds = np.linspace(0, len(population), num_chunks + 1).astype(int).tolist()
+        chunks = [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        
+        block = None
+        try:
+            executor = self._pool()
+            if transitions.nbytes + final_masks.nbytes >= self.shared_memory_threshold:
+                # Un solo bloque compartido; cada tarea solo lleva el nombre y su rango
+                block = shared_memory.SharedMemory(create=True, size=transitions.nbytes + final_masks.nbytes)
+                shared_transitions = np.ndarray(transitions.shape, dtype=np.int32, buffer=block.buf)
+                shared_finals = np.ndarray(final_masks.shape, dtype=bool, buffer=block.buf,
+                                           offset=transitions.nbytes)
+                shared_transitions[:] = transitions
+                shared_finals[:] = final_masks
+                del shared_transitions, shared_finals
+                futures = [executor.submit(_score_chunk, layout, block.name, start, stop)
+                           for start, stop in chunks]
+            else:
+                # Poblaciones medianas: cada tarea lleva por pickle solo sus propias filas
+                futures = []
+                for start, stop in chunks:
+                    rows = slice(offsets[start], offsets[stop])
+                    chunk_layout = (num_states[start:stop], initial_states[start:stop])
+                    futures.append(executor.submit(_score_chunk, chunk_layout,
+                                                   (transitions[rows], final_masks[rows]), 0, stop - start))
+            
+            scores = []
+            for future in futures:
+                scores.extend(future.result())
+            return scores
+        finally:
+            if block is not None:
+                block.close()
+                block.unlink()
+
+    def evaluate(self, population, current_population=None, cache=None, distances=None, scorer=None):
+        """
+        Misma interfaz y resultados que evaluate_population, con el corpus ya fijado.
+        
+        scorer sustituye a base_scores (p. ej. un evaluacion_carreras.RacingEvaluator
+        construido sobre él).
+        """
+        return evaluate_population(population, self.trie, current_population, cache=cache,
+                                   distances=distances, scorer=scorer if scorer is not None else self.base_scores)
\ No newline at end of file
@@ -1,5 +1,5 @@
 import random
-import copy
+import numpy as np
 from afd import create_random_afd
 from evaluacion import evaluate_afd
 
@@ -11,123 +11,191 @@ ELITE_RATIO = 0.10   # Incrementado el elitismo al 10%
 DIVERSITY_THRESHOLD = 0.15  # Incrementado el umbral de diversidad
 
 # Función para medir la diversidad entre dos AFDs
-def diversity_measure(afd1, afd2):
-    """Calcula qué tan diferentes son dos AFDs basado en sus transiciones."""
-    if not afd1["transitions"] or not afd2["transitions"]:
+def diversity_measure(afd1, afd2, canonical=False):
+    """
+    Calcula qué tan diferentes son dos AFDs basado en sus transiciones.
+    
+    Con canonical=True se comparan sus formas canónicas, así dos AFDs que solo
+    difieren en la numeración de los estados tienen distancia 0.
+    """
+    if canonical:
+        afd1, afd2 = afd1.canonical(), afd2.canonical()
+    transitions1, transitions2 = afd1.transitions, afd2.transitions
+    if transitions1.size == 0 or transitions2.size == 0:
         return 1.0  # Máxima diversidad si no hay transiciones
-        
-    # Contar diferencias en las transiciones
-    total_keys = set(afd1["transitions"].keys()).union(set(afd2["transitions"].keys()))
-    differences = 0
     
-    for key in total_keys:
-        val1 = afd1["transitions"].get(key, None)
-        val2 = afd2["transitions"].get(key, None)
-        if val1 != val2:
-            differences += 1
+    # Comparar las filas de los estados comunes; las filas sobrantes del AFD
+    # más grande cuentan todas como diferencias
+    common_states = min(len(transitions1), len(transitions2))
+    num_symbols = transitions1.shape[1]
+    differences = int(np.count_nonzero(transitions1[:common_states] != transitions2[:common_states]))
+    differences += abs(len(transitions1) - len(transitions2)) * num_symbols
     
     # Normalizar por el número total de transiciones
-    return differences / max(1, len(total_keys))
+    total_keys = max(len(transitions1), len(transitions2)) * num_symbols
+    return differences / max(1, total_keys)
+
+# Matriz de distancias de toda la población (una vez por generación)
+def population_distance_matrix(population, max_block_elements=8_000_000, canonical=False):
+    """
+    Calcula diversity_measure entre todos los pares de la población de una vez.
+    
+    Las tablas se apilan rellenando con -2 los estados que un AFD no tiene, así las
+    filas sobrantes del AFD más grande cuentan como diferencias igual que en
+    diversity_measure. Retorna una matriz P×P con los mismos valores.
+    """
+    size = len(population)
+    if size == 0:
+        return np.zeros((0, 0))
+    if canonical:
+        population = [afd.canonical() for afd in population]
+    
+    num_states = np.array([afd.num_states for afd in population], dtype=np.int64)
+    num_symbols = population[0].transitions.shape[1]
+    max_states = int(num_states.max())
+    
+    stacked = np.full((size, max_states, num_symbols), -2, dtype=np.int32)
+    for i, afd in enumerate(population):
+        stacked[i, :afd.num_states] = afd.transitions
+    stacked = stacked.reshape(size, -1)
+    
+    # Comparar por bloques de filas para acotar la memoria intermedia
+    differences = np.empty((size, size), dtype=np.int64)
+    block = max(1, max_block_elements // max(1, size * stacked.shape[1]))
+    for start in range(0, size, block):
+        chunk = stacked[start:start + block]
+        differences[start:start + block] = np.count_nonzero(chunk[:, None, :] != stacked[None, :, :], axis=2)
+    
+    # Normalizar por el número total de transiciones de cada par
+    total_keys = np.maximum(num_states[:, None], num_states[None, :]) * num_symbols
+    distances = differences / np.maximum(1, total_keys)
+    
+    # Máxima diversidad si alguno no tiene transiciones
+    empty = num_states * num_symbols == 0
+    distances[empty, :] = 1.0
+    distances[:, empty] = 1.0
+    return distances
+
+def elite_count(population_size):
+    """Número de élites que generate_new_population coloca al principio de la nueva población."""
+    return max(1, int(ELITE_RATIO * population_size))
+
+def replace_duplicates(population, protected=0, max_attempts=3):
+    """
+    Sustituye los AFDs isomorfos a otro anterior de la población por mutaciones suyas.
+    
+    Compara las huellas de las formas canónicas; los primeros `protected`
+    individuos (la élite) nunca se sustituyen. Retorna (población, duplicados).
+    """
+    seen = set()
+    new_population = list(population)
+    duplicates = 0
+    for i, afd in enumerate(population):
+        key = afd.canonical_hash()
+        if key in seen and i >= protected:
+            duplicates += 1
+            for _ in range(max_attempts):
+                afd = mutate(afd)
+                key = afd.canonical_hash()
+                if key not in seen:
+                    break
+            new_population[i] = afd
+        seen.add(key)
+    return new_population, duplicates
 
 # Mutación más agresiva para explorar más el espacio de soluciones
-def mutate(afd, mutation_rate=0.3):  # Incrementada la tasa base de mutación
-    """Realiza mutación con intensidad variable según el contexto."""
-    # Copia profunda para evitar modificar el original
-    mutated_afd = copy.deepcopy(afd)
+def mutate(afd, mutation_rate=0.3, in_place=False):  # Incrementada la tasa base de mutación
+    """
+    Realiza mutación con intensidad variable según el contexto.
+    
+    Solo se copia la tabla de transiciones (en plano); alfabeto e índice de
+    símbolos se comparten y la máscara de estados finales se copia únicamente si
+    cambia. Con in_place=True se reutiliza la tabla de un hijo recién creado.
+    """
+    mutated_afd = afd if in_place else afd.copy()
+    if not in_place:
+        mutated_afd.lineage = afd.fingerprint()  # Base para la evaluación incremental
+    flat = mutated_afd.transitions.reshape(-1)
+    num_states = mutated_afd.num_states
     
     # Número de mutaciones basado en el tamaño del AFD y la tasa de mutación
-    transitions = list(mutated_afd["transitions"].keys())
-    num_mutations = max(2, int(len(transitions) * mutation_rate))  # Mínimo 2 mutaciones
+    num_transitions = flat.size
+    num_mutations = max(2, int(num_transitions * mutation_rate))  # Mínimo 2 mutaciones
     
-    # Seleccionar transiciones a mutar
-    selected_keys = random.sample(transitions, min(num_mutations, len(transitions)))
+    # Seleccionar transiciones a mutar (índices planos estado × símbolo)
+    selected_keys = random.sample(range(num_transitions), min(num_mutations, num_transitions))
     
+    # randrange(n) consume el generador igual que choice() sobre una lista de n estados,
+    # así los hijos son idénticos a los de la versión que construía esas listas
     for key in selected_keys:
         # 40% del tiempo: mutación completamente aleatoria
         if random.random() < 0.4:  # Incrementado de 30% a 40%
-            mutated_afd["transitions"][key] = random.choice(list(mutated_afd["states"]))
+            flat[key] = random.randrange(num_states)
         else:
             # 60% del tiempo: cambio inteligente que evita el estado actual
-            current = mutated_afd["transitions"][key]
-            available_states = [s for s in mutated_afd["states"] if s != current]
-            if available_states:  # Si hay otros estados disponibles
-                mutated_afd["transitions"][key] = random.choice(available_states)
+            current = int(flat[key])
+            if 0 <= current < num_states:
+                if num_states > 1:  # Si hay otros estados disponibles
+                    new_state = random.randrange(num_states - 1)
+                    flat[key] = new_state if new_state < current else new_state + 1
+            else:
+                flat[key] = random.randrange(num_states)
     
     # Probabilidad incrementada de mutar el estado inicial
     if random.random() < 0.10:  # Incrementado de 5% a 10%
-        mutated_afd["initial_state"] = random.choice(list(mutated_afd["states"]))
+        mutated_afd.initial_state = random.randrange(num_states)
     
     # Probabilidad incrementada de cambiar estados de aceptación/finales
-    if "final_states" in mutated_afd and random.random() < 0.15:  # Incrementado de 10% a 15%
-        # Convertir a lista si es un conjunto para poder modificarlo
-        final_states = list(mutated_afd["final_states"]) if isinstance(mutated_afd["final_states"], set) else mutated_afd["final_states"]
+    if random.random() < 0.15:  # Incrementado de 10% a 15%
+        # La máscara puede estar compartida con el padre: se copia antes de cambiarla
+        final_mask = mutated_afd.final_mask.copy()
         
-        for state in mutated_afd["states"]:
+        for state in range(num_states):
             if random.random() < 0.25:  # Incrementado de 20% a 25%
-                if state in final_states:
-                    final_states.remove(state)
-                else:
-                    final_states.append(state)
+                final_mask[state] = not final_mask[state]
         
         # Asegurarnos de que haya al menos un estado final
-        if not final_states:
-            final_states.append(random.choice(list(mutated_afd["states"])))
-            
-        # Volver a guardar el conjunto actualizado
-        mutated_afd["final_states"] = set(final_states) if isinstance(mutated_afd["final_states"], set) else final_states
-    
-    # Lo mismo para accepting_states si existe
-    if "accepting_states" in mutated_afd and random.random() < 0.15:  # Incrementado de 10% a 15%
-        accepting_states = list(mutated_afd["accepting_states"]) if isinstance(mutated_afd["accepting_states"], set) else mutated_afd["accepting_states"]
+        if not final_mask.any():
+            final_mask[random.randrange(num_states)] = True
         
-        for state in mutated_afd["states"]:
-            if random.random() < 0.25:  # Incrementado de 20% a 25%
-                if state in accepting_states:
-                    accepting_states.remove(state)
-                else:
-                    accepting_states.append(state)
-        
-        # Asegurarnos de que haya al menos un estado de aceptación
-        if not accepting_states:
-            accepting_states.append(random.choice(list(mutated_afd["states"])))
-            
-        mutated_afd["accepting_states"] = set(accepting_states) if isinstance(mutated_afd["accepting_states"], set) else accepting_states
+        mutated_afd.final_mask = final_mask
     
     return mutated_afd
 
 # Mejorar selección de padres con diversidad
-def select_parents(population, fitnesses, conjugations):
+def select_parents(population, fitnesses, conjugations, distances=None, population_size=None):
     """Selecciona padres priorizando fitness pero manteniendo diversidad."""
+    if population_size is None:
+        population_size = POPULATION_SIZE
+    
+    # Distancias entre individuos (se reutiliza la matriz de la generación si se pasa)
+    if distances is None:
+        distances = population_distance_matrix(population)
+    
     # Primero seleccionamos la élite por fitness
     elite_size = max(1, int(ELITE_RATIO * len(population)))
     elite_indices = sorted(range(len(fitnesses)), key=lambda i: fitnesses[i], reverse=True)[:elite_size]
-    elite = [population[i] for i in elite_indices]
     
     # Seleccionamos el resto mediante torneo con presión por diversidad
-    selected = elite.copy()
+    selected_indices = list(elite_indices)
     
     # Aseguramos que elegimos suficientes padres
-    while len(selected) < POPULATION_SIZE:
+    while len(selected_indices) < population_size:
         # Selección por torneo
         tournament_size = min(5, len(population))  # Incrementado de 4 a 5
         candidates = random.sample(range(len(population)), tournament_size)
         
         # Elegimos el mejor de los candidatos
         tournament_winner = max(candidates, key=lambda i: fitnesses[i])
-        candidate = population[tournament_winner]
         
         # Verificar diversidad con respecto a los ya seleccionados
-        is_diverse = True
-        for existing in selected:
-            if diversity_measure(candidate, existing) < DIVERSITY_THRESHOLD:
-                is_diverse = False
-                break
+        is_diverse = bool(distances[tournament_winner, selected_indices].min() >= DIVERSITY_THRESHOLD)
         
         # Aceptar si es diverso o con probabilidad decreciente
         if is_diverse or random.random() < 0.4:  # Incrementado de 30% a 40% para aceptar más variedad
-            selected.append(candidate)
+            selected_indices.append(tournament_winner)
     
-    return selected
+    return [population[i] for i in selected_indices]
 
 # Mejorar el cruce con más variedad
 def improved_crossover(afd1, afd2):
@@ -140,92 +208,132 @@ def improved_crossover(afd1, afd2):
     # Selección ponderada de estrategia
     strategy = random.choices(strategies, weights=weights, k=1)[0]
     
-    child1, child2 = copy.deepcopy(afd1), copy.deepcopy(afd2)
+    # Solo se copian las tablas; el resto se comparte con los padres
+    child1, child2 = afd1.copy(), afd2.copy()
+    child1.lineage, child2.lineage = afd1.fingerprint(), afd2.fingerprint()
+    
+    # Vistas planas (estado × símbolo) de las tablas; con distinto número de estados
+    # solo se intercambia la parte común
+    flat1, flat2 = child1.transitions.reshape(-1), child2.transitions.reshape(-1)
+    common = min(flat1.size, flat2.size)
     
     if strategy == "one_point":
         # Cruce de un punto tradicional
-        keys = list(afd1["transitions"].keys())
-        if keys:
-            point = random.randint(0, len(keys))
-            for i, key in enumerate(keys):
-                if i >= point:
-                    child1["transitions"][key], child2["transitions"][key] = child2["transitions"][key], child1["transitions"][key]
+        if flat1.size:
+            point = random.randint(0, flat1.size)
+            if point < common:
+                tail1 = flat1[point:common].copy()
+                flat1[point:common] = flat2[point:common]
+                flat2[point:common] = tail1
     
     elif strategy == "uniform":
         # Cruce uniforme mejorado con probabilidad variable
         exchange_prob = random.uniform(0.4, 0.6)  # Probabilidad de intercambio variable
-        for key in afd1["transitions"]:
-            if random.random() < exchange_prob:
-                child1["transitions"][key], child2["transitions"][key] = child2["transitions"][key], child1["transitions"][key]
+        exchange = np.fromiter((random.random() < exchange_prob for _ in range(flat1.size)),
+                               dtype=bool, count=flat1.size)[:common]
+        swapped = flat1[:common][exchange].copy()
+        flat1[:common][exchange] = flat2[:common][exchange]
+        flat2[:common][exchange] = swapped
     
     else:  # state_swap
         # Intercambio de estados completos (más disruptivo)
         # Ahora intercambiamos varios estados en lugar de solo uno
-        num_states_to_swap = random.randint(1, min(3, len(afd1["states"]) // 3))
+        # Al menos uno: las élites minimizadas pueden tener menos de 3 estados
+        num_states_to_swap = random.randint(1, max(1, min(3, afd1.num_states // 3)))
         
         for _ in range(num_states_to_swap):
-            swap_state1 = random.choice(list(afd1["states"]))
-            swap_state2 = random.choice(list(afd2["states"]))
+            swap_state1 = random.randrange(afd1.num_states)
+            swap_state2 = random.randrange(afd2.num_states)
             
             # Intercambiar todas las transiciones que van a estos estados
-            for key in child1["transitions"]:
-                if child1["transitions"][key] == swap_state1:
-                    child1["transitions"][key] = swap_state2
-            
-            for key in child2["transitions"]:
-                if child2["transitions"][key] == swap_state2:
-                    child2["transitions"][key] = swap_state1
+            child1.transitions[child1.transitions == swap_state1] = swap_state2
+            child2.transitions[child2.transitions == swap_state2] = swap_state1
     
     # Intercambiar estados finales con probabilidad incrementada
-    if "final_states" in child1 and "final_states" in child2 and random.random() < 0.7:  # Incrementado de 50% a 70%
-        child1["final_states"], child2["final_states"] = child2["final_states"], child1["final_states"]
+    if random.random() < 0.7:  # Incrementado de 50% a 70%
+        if child1.num_states == child2.num_states:
+            # Las máscaras no se modifican in situ: basta con intercambiar referencias
+            child1.final_mask, child2.final_mask = child2.final_mask, child1.final_mask
+        else:
+            child1.final_mask, child2.final_mask = (
+                _resize_final_mask(child2.final_mask, child1.num_states),
+                _resize_final_mask(child1.final_mask, child2.num_states),
+            )
     
-    # Alternativa si usa accepting_states
-    if "accepting_states" in child1 and "accepting_states" in child2 and random.random() < 0.7:  # Incrementado de 50% a 70%
-        child1["accepting_states"], child2["accepting_states"] = child2["accepting_states"], child1["accepting_states"]
+    # Transiciones hacia estados que no existen en el hijo equivalen a no tener transición
+    if child1.num_states != child2.num_states:
+        _drop_missing_targets(child1)
+        _drop_missing_targets(child2)
     
     return child1, child2
 
+def _resize_final_mask(final_mask, num_states):
+    """Ajusta una máscara de estados finales a otro número de estados."""
+    resized = np.zeros(num_states, dtype=bool)
+    common = min(num_states, len(final_mask))
+    resized[:common] = final_mask[:common]
+    return resized
+
+def _drop_missing_targets(afd):
+    """Reemplaza por -1 (rechazo) las transiciones hacia estados fuera del AFD."""
+    afd.transitions[afd.transitions >= afd.num_states] = -1
+
 # Función principal de generación de población mejorada
-def generate_new_population(population, fitnesses, conjugations):
-    """Crea una nueva población con mecanismos mejorados para mantener diversidad."""
+def generate_new_population(population, fitnesses, conjugations, distances=None, population_size=None,
+                            elite_transform=None):
+    """
+    Crea una nueva población con mecanismos mejorados para mantener diversidad.
+    
+    elite_transform (opcional) se aplica a cada élite antes de copiarla, p. ej.
+    minimizacion.minimize_afd para que no arrastren estados sobrantes.
+    """
+    if population_size is None:
+        population_size = POPULATION_SIZE
+    
     # 1. Seleccionar padres
-    parents = select_parents(population, fitnesses, conjugations)
+    parents = select_parents(population, fitnesses, conjugations, distances, population_size)
     
     # 2. Crear nueva población
     new_population = []
     
     # Preservar la élite
-    elite_size = max(1, int(ELITE_RATIO * len(population)))
+    elite_size = elite_count(len(population))
     elite_indices = sorted(range(len(fitnesses)), key=lambda i: fitnesses[i], reverse=True)[:elite_size]
-    new_population.extend([population[i] for i in elite_indices])
+    if elite_transform is not None:
+        new_population.extend([elite_transform(population[i]) for i in elite_indices])
+    else:
+        new_population.extend([population[i] for i in elite_indices])
     
     # Crear nuevos individuos mediante cruce y mutación
-    while len(new_population) < POPULATION_SIZE:
+    while len(new_population) < population_size:
         # Seleccionar dos padres diferentes
         parent1, parent2 = random.sample(parents, 2)
         
         # Aplicar cruce con alta probabilidad
-        if random.random() < CXPB:
+        # (sin cruce los hijos comparten el objeto del padre: ningún operador
+        # modifica sus argumentos, así que no hace falta copiarlos)
+        crossed = random.random() < CXPB
+        if crossed:
             child1, child2 = improved_crossover(parent1, parent2)
         else:
-            child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
+            child1, child2 = parent1, parent2
         
-        # Aplicar mutación con probabilidad variable
+        # Aplicar mutación con probabilidad variable; los hijos del cruce ya son
+        # copias propias y se mutan sin volver a copiar la tabla
         if random.random() < MUTPB:
             # Mayor tasa de mutación si hay poca diversidad
             diversity = diversity_measure(child1, parent1)
             mutation_rate = max(0.15, 0.6 - diversity)  # Entre 15% y 60% (incrementado)
-            child1 = mutate(child1, mutation_rate)
-            
+            child1 = mutate(child1, mutation_rate, in_place=crossed)
+        
         if random.random() < MUTPB:
             diversity = diversity_measure(child2, parent2)
             mutation_rate = max(0.15, 0.6 - diversity)  # Entre 15% y 60% (incrementado)
-            child2 = mutate(child2, mutation_rate)
+            child2 = mutate(child2, mutation_rate, in_place=crossed)
         
         # Añadir hijos a la nueva población
         new_population.append(child1)
-        if len(new_population) < POPULATION_SIZE:
+        if len(new_population) < population_size:
             new_population.append(child2)
     
     # Asegurar diversidad en la población final
@@ -238,21 +346,18 @@ def generate_new_population(population, fitnesses, conjugations):
             if random.random() < 0.4:  # Incrementado de 30% a 40% para más intervenciones
                 new_population[i] = mutate(new_population[i], mutation_rate=0.7)  # Incrementado a 70%
     
-    return new_population[:POPULATION_SIZE]
+    return new_population[:population_size]
 
 # Función para calcular la diversidad de toda la población
-def calculate_population_diversity(population):
+def calculate_population_diversity(population, distances=None):
     """Calcula la diversidad promedio entre todos los pares de individuos."""
     if len(population) <= 1:
         return 0.0
     
-    total_diversity = 0.0
-    comparisons = 0
+    if distances is None:
+        distances = population_distance_matrix(population)
     
-    # Comparar cada par de individuos
-    for i in range(len(population)):
-        for j in range(i+1, len(population)):
-            total_diversity += diversity_measure(population[i], population[j])
-            comparisons += 1
+    # Cada par (i, j) con i < j, en el mismo orden en que se sumaban antes
+    pairs = distances[np.triu_indices(len(population), k=1)].tolist()
     
-    return total_diversity / max(1, comparisons)
\ No newline at end of file
+    return sum(pairs) / max(1, len(pairs))
\ No newline at end of file
@@ -0,0 +1,125 @@
+import argparse
+import os
+import sys
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from parser_rae import parse_conjugations, verb_from_filename
+from cache_conjugaciones import write_corpus_file
+
+HTML_EXTENSIONS = (".html", ".htm")
+# Tareas pendientes por trabajador: limita la memoria al leer archivos muy grandes
+TASKS_PER_WORKER = 4
+
+def iter_html_sources(source):
+    """
+    Recorre un directorio (recursivamente) o un archivo tar (.tar, .tar.gz, ...).
+    
+    Genera (nombre, contenido) donde contenido es la ruta del archivo (directorio)
+    o sus bytes (tar), sin cargar más de un archivo a la vez.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(HTML_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+        return
+    
+    # Modo "r|*": lectura secuencial, válido también para archivos comprimidos
+    with tarfile.open(source, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(HTML_EXTENSIONS):
+                yield member.name, archive.extractfile(member).read()
+
+def parse_page(name, content):
+    """
+    Tarea del trabajador: (nombre, verbo, conjugaciones, error).
+    
+    Aplica la misma normalización y filtrado que get_all_conjugations.
+    """
+    try:
+        if isinstance(content, str):
+            with open(content, "rb") as f:
+                content = f.read()
+        verb = verb_from_filename(name)
+        conjugations = parse_conjugations(content.decode("utf-8", errors="replace"), verb)
+        if not conjugations:
+            return name, verb, None, "sin tablas de conjugación"
+        return name, verb, conjugations, None
+    except Exception as e:
+        return name, None, None, f"{type(e).__name__}: {e}"
+
+def ingest(source, max_workers=None, on_progress=None, error_log=None):
+    """
+    Extrae las conjugaciones de todas las páginas guardadas en `source`.
+    
+    Las páginas se analizan en un pool de procesos con un número acotado de
+    tareas en vuelo. Si un verbo aparece en varias páginas se unen sus formas.
+    Los errores se registran por archivo (y en error_log, una línea por archivo)
+    sin detener el lote. on_progress(procesados, errores) informa del avance.
+    
+    Retorna (corpus, errores) con corpus = {verbo: conjugaciones ordenadas}.
+    """
+    max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    corpus = {}
+    errors = {}
+    processed = 0
+
+    def collect(result):
+        nonlocal processed
+        name, verb, conjugations, error = result
+        processed += 1
+        if error is not None:
+            errors[name] = error
+            if error_log is not None:
+                error_log.write(f"{name}\t{error}\n")
+        else:
+            corpus.setdefault(verb, set()).update(conjugations)
+        if on_progress is not None:
+            on_progress(processed, len(errors))
+    
+    if max_workers <= 1:
+        for name, content in iter_html_sources(source):
+            collect(parse_page(name, content))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for name, content in iter_html_sources(source):
+                pending.append(executor.submit(parse_page, name, content))
+                if len(pending) >= max_workers * TASKS_PER_WORKER:
+                    # Resultados en orden de lectura: el corpus no depende del reparto
+                    collect(pending.popleft().result())
+            for future in pending:
+                collect(future.result())
+    
+    return {verb: sorted(forms) for verb, forms in sorted(corpus.items())}, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye un corpus {verbo: conjugaciones} a partir de páginas de la RAE guardadas.")
+    parser.add_argument("source", help="Directorio o archivo tar con páginas HTML (nombre del archivo = verbo)")
+    parser.add_argument("-o", "--output", required=True, help="Archivo JSON de salida (.json o .json.gz)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para analizar las páginas")
+    parser.add_argument("--errors", help="Archivo donde registrar los errores por página (por defecto, <salida>.errores.tsv)")
+    args = parser.parse_args(argv)
+    
+    error_path = args.errors or f"{args.output}.errores.tsv"
+    start = time.time()
+
+    def report(processed, num_errors):
+        if processed % 100 == 0:
+            print(f"\r{processed} páginas ({num_errors} errores, {processed / max(time.time() - start, 1e-9):.0f}/s)",
+                  end="", file=sys.stderr, flush=True)
+    
+    with open(error_path, "w", encoding="utf-8") as error_log:
+        corpus, errors = ingest(args.source, args.workers, on_progress=report, error_log=error_log)
+    write_corpus_file(args.output, corpus)
+    
+    print(f"\r{len(corpus)} verbos escritos en {args.output}; {len(errors)} páginas con errores ({error_path})",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+from afd import create_random_afd
+from construccion import seed_population
+from minimizacion import minimize_afd
+from evaluacion import (compile_conjugations, evaluate_population, count_accepted, population_base_scores,
+                        incremental_base_scores, FitnessCache, PathRecords)
+from evaluacion_carreras import RacingEvaluator
+import genetico
+from genetico import (generate_new_population, calculate_population_diversity, population_distance_matrix,
+                      replace_duplicates, elite_count)
+
+# Configuración por defecto del modelo de islas
+NUM_ISLANDS = 4
+MIGRATION_INTERVAL = 10   # Generaciones entre migraciones
+NUM_MIGRANTS = 2          # Mejores AFDs que envía cada isla
+TOPOLOGY = "ring"         # "ring" o "random"
+
+# Estado de cada proceso trabajador: corpus compilado, caché de fitness y recorridos propios
+_WORKER_CONTEXT = None
+
+def new_context(corpus):
+    """
+    Recursos de evaluación de un proceso, compartidos por las islas que ejecuta.
+    
+    La caché y los recorridos (PathRecords) dependen solo de la huella de cada
+    AFD, así que pueden compartirse entre islas; el evaluador de carreras se
+    crea al primer uso y el umbral de cada isla viaja con su estado.
+    """
+    return {"corpus": corpus, "cache": FitnessCache(), "records": None, "racing": None}
+
+def _init_worker(corpus):
+    """Recibe el corpus compilado una única vez por trabajador."""
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = new_context(corpus)
+
+def new_island(island_id, num_states, alphabet, seed, seed_fraction=0.0, minimize_elites=False, dedupe=False,
+               population_size=None, incremental=False, racing=False, racing_audit=0, canonical_diversity=False):
+    """Estado inicial de una isla (la población se crea en el primer epoch, dentro del trabajador)."""
+    return {
+        "island_id": island_id,
+        "num_states": num_states,
+        "alphabet": list(alphabet),
+        "seed_fraction": seed_fraction,
+        "minimize_elites": minimize_elites,
+        "dedupe": dedupe,
+        "population_size": population_size if population_size is not None else genetico.POPULATION_SIZE,
+        "incremental": incremental,
+        "racing": racing,
+        "racing_audit": racing_audit,
+        "racing_state": None,      # Umbral y modelo de coste de las carreras de esta isla
+        # Con carreras, caché propia que viaja con la isla: los aciertos evitan carreras, así que
+        # una caché compartida haría que el resultado dependiera del reparto entre procesos
+        "cache": FitnessCache() if racing else None,
+        "canonical_diversity": canonical_diversity,
+        "rng_state": random.Random(seed).getstate(),
+        "population": None,
+        "generation": 0,
+        "best_afd": None,
+        "best_fitness": float("-inf"),
+        "best_generation": 0,
+        "best_fitness_history": [],
+        "avg_fitness_history": [],
+        "diversity_history": [],
+        "duplicate_history": [],
+        "migrants_received": 0,
+        "solved": False,
+    }
+
+def _scorers(island, context):
+    """(puntajes exactos, puntajes de la generación) de una isla según sus opciones de evaluación."""
+    corpus = context["corpus"]
+    if island["incremental"]:
+        if context["records"] is None:
+            context["records"] = PathRecords(corpus)
+        records = context["records"]
+
+        def exact(population, trie=None):
+            return incremental_base_scores(population, corpus, records)
+    else:
+        def exact(population, trie=None):
+            return population_base_scores(population, corpus)
+    
+    if not island["racing"]:
+        return exact, None
+    if context["racing"] is None:
+        context["racing"] = RacingEvaluator(corpus, exact, audit_every=island["racing_audit"])
+    racing = context["racing"]
+    racing.restore(island["racing_state"])
+    return exact, racing
+
+def run_island_epoch(island, generations, immigrants=(), context=None):
+    """
+    Avanza una isla `generations` generaciones con el bucle de generate_new_population.
+    
+    Los inmigrantes reemplazan a los peores individuos antes de evaluar. El estado
+    del generador aleatorio viaja con la isla, así el resultado no depende del
+    proceso que la ejecute. context (ver new_context) es el del trabajador si no
+    se pasa. Retorna el estado actualizado.
+    """
+    context = context if context is not None else _WORKER_CONTEXT
+    corpus = context["corpus"]
+    cache = island["cache"] if island["cache"] is not None else context["cache"]
+    exact, racing = _scorers(island, context)
+    population_size = island["population_size"]
+    random.setstate(island["rng_state"])
+    
+    population = island["population"]
+    if population is None:
+        # Población inicial como en la ejecución normal: sobremuestreo y selección
+        initial_population = [create_random_afd(num_states=island["num_states"], alphabet=island["alphabet"])
+                              for _ in range(int(population_size * 1.3))]
+        num_seeds = min(len(initial_population), int(round(population_size * island["seed_fraction"])))
+        if num_seeds > 0:
+            initial_population[-num_seeds:] = seed_population(corpus.words, island["alphabet"],
+                                                              island["num_states"], num_seeds)
+        initial_fitnesses = evaluate_population(initial_population, corpus, cache=cache, scorer=exact)
+        selected_indices = sorted(range(len(initial_fitnesses)),
+                                  key=lambda i: initial_fitnesses[i],
+                                  reverse=True)[:population_size]
+        population = [initial_population[i] for i in selected_indices]
+    
+    if immigrants:
+        # Los inmigrantes sustituyen a los peores según la última evaluación
+        fitnesses = evaluate_population(population, corpus, cache=cache, scorer=exact)
+        worst = sorted(range(len(population)), key=lambda i: fitnesses[i])[:len(immigrants)]
+        population = list(population)
+        for i, immigrant in zip(worst, immigrants):
+            population[i] = immigrant
+        island["migrants_received"] += len(immigrants)
+    
+    for _ in range(generations):
+        duplicates = 0
+        if island["dedupe"]:
+            population, duplicates = replace_duplicates(population, protected=elite_count(len(population)))
+        island["duplicate_history"].append(duplicates)
+        distances = population_distance_matrix(population, canonical=island["canonical_diversity"])
+        fitnesses = evaluate_population(population, corpus, population, cache=cache, distances=distances,
+                                        scorer=racing.base_scores if racing is not None else exact)
+        if racing is not None:
+            racing.observe(fitnesses)
+        
+        best_fitness = max(fitnesses)
+        best_idx = fitnesses.index(best_fitness)
+        island["generation"] += 1
+        island["best_fitness_history"].append(best_fitness)
+        island["avg_fitness_history"].append(sum(fitnesses) / len(fitnesses))
+        island["diversity_history"].append(calculate_population_diversity(population, distances))
+        
+        if best_fitness > island["best_fitness"]:
+            island["best_fitness"] = best_fitness
+            island["best_afd"] = population[best_idx]
+            island["best_generation"] = island["generation"]
+        
+        # Si la isla alcanza el 100% de aceptación, termina
+        if count_accepted(population[best_idx], corpus) == len(corpus):
+            island["best_fitness"] = best_fitness
+            island["best_afd"] = population[best_idx]
+            island["best_generation"] = island["generation"]
+            island["solved"] = True
+            break
+        
+        population = generate_new_population(population, fitnesses, corpus.words, distances, population_size,
+                                             elite_transform=minimize_afd if island["minimize_elites"] else None)
+    
+    island["population"] = population
+    island["rng_state"] = random.getstate()
+    if racing is not None:
+        island["racing_state"] = racing.state()
+    return island
+
+def top_individuals(island, count, corpus, cache=None):
+    """Los `count` mejores AFDs de la población actual de una isla."""
+    population = island["population"]
+    fitnesses = evaluate_population(population, corpus, cache=cache)
+    best = sorted(range(len(population)), key=lambda i: fitnesses[i], reverse=True)[:count]
+    return [population[i] for i in best]
+
+def migration_sources(num_islands, topology, rng):
+    """Para cada isla, de qué isla recibe migrantes (anillo o aleatorio)."""
+    if num_islands < 2:
+        return [None] * num_islands
+    if topology == "ring":
+        return [(i - 1) % num_islands for i in range(num_islands)]
+    return [rng.choice([j for j in range(num_islands) if j != i]) for i in range(num_islands)]
+
+class IslandModel:
+    """
+    Algoritmo genético con N subpoblaciones (islas) independientes.
+    
+    Cada isla ejecuta el bucle de generate_new_population en su propio proceso
+    durante `migration_interval` generaciones; después las islas intercambian sus
+    mejores AFDs según la topología (anillo o aleatoria) y continúan. Con
+    max_workers <= 1 las islas se ejecutan en el mismo proceso.
+    """
+
+    def __init__(self, conjugations, alphabet, num_islands=NUM_ISLANDS, migration_interval=MIGRATION_INTERVAL,
+                 num_migrants=NUM_MIGRANTS, topology=TOPOLOGY, generations=150, num_states=None,
+                 seed=None, max_workers=None, seed_fraction=0.0, minimize_elites=False, dedupe=False,
+                 population_size=None, incremental=False, racing=False, racing_audit=0, canonical_diversity=False):
+        if topology not in ("ring", "random"):
+            raise ValueError(f"Topología desconocida: {topology}")
+        self.corpus = compile_conjugations(conjugations, alphabet)
+        self.alphabet = list(alphabet)
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.topology = topology
+        self.generations = generations
+        self.num_states = num_states if num_states is not None else max(8, min(len(conjugations) // 2, 20))
+        self.max_workers = max_workers if max_workers is not None else num_islands
+        self._rng = random.Random(seed)
+        # Recursos para migrar y para ejecutar las islas en el mismo proceso
+        self._context = new_context(self.corpus)
+        self.islands = [new_island(i, self.num_states, self.alphabet, self._rng.getrandbits(64),
+                                   seed_fraction, minimize_elites, dedupe, population_size, incremental,
+                                   racing, racing_audit, canonical_diversity)
+                        for i in range(num_islands)]
+
+    def _run_epoch(self, executor, generations, immigrants):
+        if executor is None:
+            # En el mismo proceso: no alterar el generador aleatorio de quien llama
+            caller_state = random.getstate()
+            try:
+                return [run_island_epoch(island, generations, incoming, self._context)
+                        for island, incoming in zip(self.islands, immigrants)]
+            finally:
+                random.setstate(caller_state)
+        futures = [executor.submit(run_island_epoch, island, generations, incoming)
+                   for island, incoming in zip(self.islands, immigrants)]
+        return [future.result() for future in futures]
+
+    def run(self, on_epoch=None):
+        """
+        Ejecuta el modelo de islas hasta agotar las generaciones o encontrar un AFD perfecto.
+        
+        on_epoch(model) se llama después de cada migración (progreso, estado, etc.).
+        Retorna el resumen de best_result().
+        """
+        executor = None
+        if self.max_workers > 1 and self.num_islands > 1:
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, self.num_islands),
+                                           initializer=_init_worker, initargs=(self.corpus,))
+        try:
+            immigrants = [()] * self.num_islands
+            done = 0
+            while done < self.generations:
+                epoch = min(self.migration_interval, self.generations - done)
+                self.islands = self._run_epoch(executor, epoch, immigrants)
+                done += epoch
+                
+                if on_epoch is not None:
+                    on_epoch(self)
+                if any(island["solved"] for island in self.islands):
+                    break
+                
+                # Migración: cada isla recibe copias de los mejores de su isla origen
+                sources = migration_sources(self.num_islands, self.topology, self._rng)
+                emigrants = [top_individuals(island, self.num_migrants, self.corpus, self._context["cache"])
+                             for island in self.islands]
+                immigrants = [tuple(emigrants[source]) if source is not None else ()
+                              for source in sources]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        return self.best_result()
+
+    def island_stats(self):
+        """Estadísticas por isla."""
+        return [{
+            "island_id": island["island_id"],
+            "generations": island["generation"],
+            "best_fitness": island["best_fitness"],
+            "best_generation": island["best_generation"],
+            "migrants_received": island["migrants_received"],
+            "solved": island["solved"],
+            "best_fitness_history": island["best_fitness_history"],
+            "avg_fitness_history": island["avg_fitness_history"],
+            "diversity_history": island["diversity_history"],
+            "duplicate_history": island["duplicate_history"],
+        } for island in self.islands]
+
+    def best_result(self):
+        """Mejor AFD global entre todas las islas y su aceptación."""
+        best_island = max(self.islands, key=lambda island: island["best_fitness"])
+        best_afd = best_island["best_afd"]
+        return {
+            "best_afd": best_afd,
+            "best_fitness": best_island["best_fitness"],
+            "best_island": best_island["island_id"],
+            "accepted": count_accepted(best_afd, self.corpus) if best_afd is not None else 0,
+            "total": len(self.corpus),
+            # Historial global: mejor de todas las islas en cada generación
+            "best_fitness_history": [max(values) for values in
+                                     zip_longest(*(island["best_fitness_history"] for island in self.islands),
+                                                 fillvalue=float("-inf"))],
+            "islands": self.island_stats(),
+        }
\ No newline at end of file
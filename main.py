@@ -1,42 +1,24 @@
-import random
 import tkinter as tk
 from tkinter import ttk, messagebox, StringVar
 from threading import Thread
+import os
 import time
 
-from afd import create_random_afd, accepts_input
-from genetico import generate_new_population, calculate_population_diversity
-from evaluacion import evaluate_afd
+from motor import GeneticEngine, generate_alphabet_from_conjugations
+from puntos_control import load_checkpoint
 from visualizacion import visualize_afd
 from webScrapting import get_all_conjugations
+from conjugador import generate_conjugations
 
 
 # Configuración optimizada
 POPULATION_SIZE = 40
 GENERATIONS = 150
-
-# Función para generar el alfabeto a partir de las conjugaciones
-def generate_alphabet_from_conjugations(conjugations):
-    """
-    Genera un alfabeto basado en los caracteres presentes en las conjugaciones.
-    
-    Args:
-        conjugations (list): Lista de conjugaciones del verbo
-        
-    Returns:
-        list: Lista de caracteres únicos ordenados alfabéticamente
-    """
-    # Conjunto para almacenar caracteres únicos
-    unique_chars = set()
-    
-    # Extraer todos los caracteres de las conjugaciones
-    for word in conjugations:
-        for char in word:
-            unique_chars.add(char)
-    
-    # Convertir a lista y ordenar alfabéticamente
-    print(sorted(list(unique_chars)))  
-    return sorted(list(unique_chars))
+EVALUATION_WORKERS = 1  # Procesos para evaluar la población (1 = en el mismo proceso)
+NUM_ISLANDS = 1         # Subpoblaciones en paralelo (modelo de islas); 1 = población única con reinicios
+MINIMIZE_BEST = False   # Mostrar el mejor AFD minimizado (sin estados inalcanzables ni equivalentes)
+CONJUGATION_SOURCE = "rae"  # "rae" (página de la RAE) o "local" (reglas de verbos regulares, sin conexión)
+CHECKPOINT_DIR = None   # Carpeta de puntos de control por verbo; una ejecución interrumpida se reanuda (None = sin ellos)
 
 
 class AFDGeneratorApp:
@@ -140,12 +122,25 @@ class AFDGeneratorApp:
         thread.daemon = True
         thread.start()
     
+    def can_resume(self, checkpoint_path):
+        """Solo se reanuda una ejecución sin terminar y con las mismas conjugaciones."""
+        if not os.path.exists(checkpoint_path):
+            return False
+        try:
+            state = load_checkpoint(checkpoint_path)
+        except Exception:
+            return False  # Punto de control dañado o de otra versión
+        return not state["finished"] and state["conjugations"] == list(self.conjugations)
+    
     def run_afd_generation(self, verb):
         try:
             self.update_status(f"Obteniendo conjugaciones para '{verb}'...")
             
             # Obtener conjugaciones
-            self.conjugations = get_all_conjugations(verb)
+            if CONJUGATION_SOURCE == "local":
+                self.conjugations = generate_conjugations(verb)
+            else:
+                self.conjugations = get_all_conjugations(verb)
             
             if not self.conjugations:
                 self.update_status("No se pudieron obtener conjugaciones.")
@@ -161,164 +156,58 @@ class AFDGeneratorApp:
             self.update_status(f"Alfabeto generado: {', '.join(self.alphabet)}")
             time.sleep(0.5)  # Dar tiempo para leer el mensaje
             
-            # Configurar el número de estados
-            num_states = max(8, min(len(self.conjugations) // 2, 20))
-            self.update_status(f"Configurando AFD con {num_states} estados.")
-            
-            # Inicializar variables para el algoritmo
-            self.best_fitness_history = []
-            self.avg_fitness_history = []
-            self.error_history = []
-            self.diversity_history = []
-            
-            # Crear población inicial con el alfabeto dinámico
-            self.update_status("Creando población inicial...")
-            initial_population_size = int(POPULATION_SIZE * 1.3)
-            initial_population = [create_random_afd(num_states=num_states, alphabet=self.alphabet) 
-                                for _ in range(initial_population_size)]
-            
-            # Evaluar población inicial
-            self.update_status("Evaluando población inicial...")
-            initial_fitnesses = [evaluate_afd(afd, self.conjugations) for afd in initial_population]
-            
-            # Seleccionar mejores individuos
-            selected_indices = sorted(range(len(initial_fitnesses)), 
-                                    key=lambda i: initial_fitnesses[i], 
-                                    reverse=True)[:POPULATION_SIZE]
-            population = [initial_population[i] for i in selected_indices]
-            
-            # Variables de seguimiento
-            best_generation, global_best_fitness, self.best_afd = 0, float('-inf'), None
-            stagnation_counter = 0
-            plateau_threshold = 15
-            restart_threshold = 25
-            num_restarts = 0
-            max_restarts = 7
-            
-            # Ejecutar algoritmo genético
-            for generation in range(GENERATIONS):
-                # Actualizar barra de progreso
-                progress = (generation + 1) / GENERATIONS * 100
-                self.progress_var.set(progress)
-                
-                # Evaluar población
-                fitnesses = [evaluate_afd(afd, self.conjugations, population) for afd in population]
-                
-                # Calcular diversidad
-                population_diversity = calculate_population_diversity(population)
-                self.diversity_history.append(population_diversity)
-                
-                # Estadísticas
-                best_fitness = max(fitnesses)
-                best_idx = fitnesses.index(best_fitness)
-                avg_fitness = sum(fitnesses) / len(fitnesses)
-                error = 1 - best_fitness
-                
-                # Registrar historia
-                self.best_fitness_history.append(best_fitness)
-                self.avg_fitness_history.append(avg_fitness)
-                self.error_history.append(error)
-                
-                # Actualizar el mejor AFD global
-                if best_fitness > global_best_fitness:
-                    best_generation, global_best_fitness = generation + 1, best_fitness
-                    self.best_afd = population[best_idx]
-                    stagnation_counter = 0
-                else:
-                    stagnation_counter += 1
-                
-                # Contar palabras aceptadas
-                correct_words = sum(accepts_input(population[best_idx], w) for w in self.conjugations)
-                acceptance_rate = (correct_words / len(self.conjugations)) * 100
-                
-                # Actualizar estado
-                self.update_status(f"Generación {generation + 1}/{GENERATIONS}: "
-                                 f"Fitness={best_fitness:.4f}, "
-                                 f"Aceptación={acceptance_rate:.2f}%")
-                
-                # Si alcanzamos el 100%, terminar
-                if acceptance_rate == 100.0:
-                    self.update_status("¡Solución perfecta encontrada con 100% de acierto!")
-                    best_generation, global_best_fitness = generation + 1, best_fitness
-                    self.best_afd = population[best_idx]
-                    break
-                
-                # Verificar estancamiento
-                if stagnation_counter >= plateau_threshold:
-                    self.update_status(f"Estancamiento: {stagnation_counter} generaciones sin mejora")
-                    
-                    if stagnation_counter >= restart_threshold and num_restarts < max_restarts:
-                        self.update_status(f"Realizando reinicio parcial #{num_restarts+1}")
-                        
-                        # Preservar el mejor AFD
-                        preserved = [self.best_afd]
-                        
-                        # Estrategia agresiva: nuevo 70% de la población
-                        replacement_size = int(0.7 * POPULATION_SIZE)
-                        
-                        # Nuevos individuos con estados variables
-                        new_individuals = []
-                        for _ in range(replacement_size):
-                            state_variation = random.randint(-2, 4)
-                            new_num_states = max(5, min(num_states + state_variation, 25))
-                            new_individuals.append(
-                                create_random_afd(num_states=new_num_states, alphabet=self.alphabet)
-                            )
-                        
-                        # Mantener mejores 30%
-                        keep_size = POPULATION_SIZE - replacement_size - len(preserved)
-                        remaining_indices = sorted(range(len(fitnesses)), 
-                                                key=lambda i: fitnesses[i], 
-                                                reverse=True)[:keep_size]
-                        remaining = [population[i] for i in remaining_indices]
-                        
-                        # Nueva población
-                        population = preserved + remaining + new_individuals
-                        
-                        # Reiniciar contador
-                        stagnation_counter = 0
-                        num_restarts += 1
-                        continue
-                
-                # Generar nueva población
-                population = generate_new_population(population, fitnesses, self.conjugations)
-                
-                # Terminar si fitness excepcional
-                if best_fitness > 0.995:
-                    self.update_status("¡Solución óptima encontrada con fitness excepcional!")
-                    break
-                
-                # Terminar si agotamos reinicios y seguimos estancados
-                if num_restarts >= max_restarts and stagnation_counter >= restart_threshold:
-                    self.update_status("Intentando una última estrategia con más estados...")
-                    
-                    # Preservar mejor AFD
-                    best_so_far = self.best_afd
-                    
-                    # Nuevos AFDs con más estados
-                    increased_states = num_states + 5
-                    new_population = [create_random_afd(num_states=increased_states, alphabet=self.alphabet) 
-                                    for _ in range(POPULATION_SIZE-1)]
-                    
-                    # Añadir el mejor AFD
-                    new_population.insert(0, best_so_far)
-                    
-                    # Reemplazar población
-                    population = new_population
-                    stagnation_counter = 0
-                    num_restarts = max_restarts
-                    continue
+            # El motor hace todo el trabajo; la interfaz solo muestra el progreso
+            # Las islas no admiten puntos de control
+            checkpoint_path = (os.path.join(CHECKPOINT_DIR, f"{verb}.ckpt")
+                               if CHECKPOINT_DIR and NUM_ISLANDS <= 1 else None)
+            if checkpoint_path and self.can_resume(checkpoint_path):
+                self.update_status("Reanudando la ejecución anterior desde el punto de control...")
+                engine = GeneticEngine.resume(checkpoint_path, on_status=self.update_status,
+                                              on_generation=self.on_generation)
+            else:
+                engine = GeneticEngine(self.conjugations, self.alphabet,
+                                       config={
+                                           "population_size": POPULATION_SIZE,
+                                           "generations": GENERATIONS,
+                                           "evaluation_workers": EVALUATION_WORKERS,
+                                           "num_islands": NUM_ISLANDS,
+                                           "minimize_best": MINIMIZE_BEST,
+                                           "checkpoint_path": checkpoint_path,
+                                       },
+                                       on_status=self.update_status,
+                                       on_generation=self.on_generation)
+            self.update_status(f"Configurando AFD con {engine.num_states} estados.")
+            
+            result = engine.run()
+            if checkpoint_path and os.path.exists(checkpoint_path):
+                # Ejecución completa: la próxima vez se empieza de cero con las conjugaciones del momento
+                os.remove(checkpoint_path)
+            
+            self.best_afd = result["best_afd"]
+            self.best_fitness_history = result["best_fitness_history"]
+            self.avg_fitness_history = result["avg_fitness_history"]
+            self.error_history = result["error_history"]
+            self.diversity_history = result["diversity_history"]
             
             # Resultados finales
             self.progress_var.set(100)
-            correct_words = sum(accepts_input(self.best_afd, w) for w in self.conjugations)
+            correct_words = result["accepted"]
             acceptance_rate = (correct_words / len(self.conjugations)) * 100
             
-            final_message = (f"Mejor generación: {best_generation} con fitness {global_best_fitness:.4f}\n"
+            final_message = (f"Mejor generación: {result['best_generation']} con fitness {result['best_fitness']:.4f}\n"
                            f"Aceptación: {correct_words}/{len(self.conjugations)} conjugaciones ({acceptance_rate:.2f}%)")
             
             self.update_status(final_message)
             
+            cache_stats = result["cache"]
+            print(f"Caché de fitness: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos "
+                  f"({cache_stats['hit_rate']:.1%} de evaluaciones ahorradas)")
+            
+            for stats in result.get("islands", []):
+                print(f"Isla {stats['island_id']}: {stats['generations']} generaciones, "
+                      f"mejor fitness {stats['best_fitness']:.4f} (generación {stats['best_generation']}), "
+                      f"{stats['migrants_received']} inmigrantes")
+            
             # Mostrar tablas y gráficas
             self.root.after(500, lambda: self.show_visualizations())
             
@@ -329,6 +218,11 @@ class AFDGeneratorApp:
             self.is_running = False
             self.verb_entry.config(state="normal")
     
+    def on_generation(self, engine, stats):
+        """Actualiza la barra de progreso después de cada generación."""
+        progress = stats["generation"] / GENERATIONS * 100
+        self.progress_var.set(progress)
+    
     def update_status(self, message):
         """Actualiza el mensaje de estado desde cualquier hilo"""
         self.root.after(0, lambda: self.status_label.config(text=message))
@@ -339,7 +233,7 @@ class AFDGeneratorApp:
             messagebox.showerror("Error", "No se generó ningún AFD válido")
             return
             
-        visualize_afd(self.best_afd, 
+        visualize_afd(self.best_afd.to_dict(), 
                      self.best_fitness_history, 
                      self.avg_fitness_history, 
                      self.error_history, 
@@ -0,0 +1,134 @@
+from collections import defaultdict
+import numpy as np
+from afd import CompactAFD
+
+def reachable_states(afd):
+    """Máscara de los estados alcanzables desde el estado inicial."""
+    transitions = afd.transitions
+    reachable = np.zeros(afd.num_states, dtype=bool)
+    reachable[afd.initial_state] = True
+    frontier = np.array([afd.initial_state])
+    while frontier.size:
+        targets = transitions[frontier].reshape(-1)
+        targets = np.unique(targets[targets != -1])
+        frontier = targets[~reachable[targets]]
+        reachable[frontier] = True
+    return reachable
+
+def prune_unreachable(afd):
+    """AFD sin los estados inalcanzables (los demás conservan su orden relativo)."""
+    reachable = reachable_states(afd)
+    if reachable.all():
+        return afd
+    new_index = np.full(afd.num_states + 1, -1, dtype=np.int32)  # la última posición traduce -1 → -1
+    new_index[np.flatnonzero(reachable)] = np.arange(int(reachable.sum()), dtype=np.int32)
+    transitions = new_index[afd.transitions[reachable]]
+    return CompactAFD(transitions, afd.final_mask[reachable], int(new_index[afd.initial_state]), afd.alphabet)
+
+def hopcroft_partition(transitions, labels):
+    """
+    Clases de equivalencia de estados (algoritmo de Hopcroft).
+    
+    transitions es una tabla completa (estados × símbolos, sin -1) y labels da
+    la partición inicial: dos estados con etiquetas distintas nunca se fusionan
+    (para un AFD, la etiqueta es si el estado es final). Retorna un arreglo con
+    el bloque de cada estado.
+    """
+    num_states, num_symbols = transitions.shape
+    
+    # Predecesores por símbolo en formato CSR: order[a][starts[a][t]:starts[a][t+1]] son los p con δ(p, a) = t
+    inverse = []
+    for symbol_idx in range(num_symbols):
+        column = transitions[:, symbol_idx]
+        order = np.argsort(column, kind="stable")
+        starts = np.searchsorted(column[order], np.arange(num_states + 1))
+        inverse.append((order.tolist(), starts.tolist()))
+    
+    # Partición inicial por etiqueta
+    block_ids = {}
+    block_of = [block_ids.setdefault(label, len(block_ids)) for label in labels]
+    members = [set() for _ in block_ids]
+    for state, block in enumerate(block_of):
+        members[block].add(state)
+    
+    # Cola de divisores (bloque, símbolo); basta con omitir el bloque inicial más grande
+    largest = max(range(len(members)), key=lambda b: len(members[b]))
+    pending = [(block, symbol_idx) for block in range(len(members)) if block != largest
+               for symbol_idx in range(num_symbols)]
+    in_pending = set(pending)
+    
+    while pending:
+        splitter = pending.pop()
+        in_pending.discard(splitter)
+        block, symbol_idx = splitter
+        order, starts = inverse[symbol_idx]
+        
+        # Estados que llegan al bloque divisor con este símbolo, agrupados por su bloque
+        touched = defaultdict(list)
+        for target in members[block]:
+            for source in order[starts[target]:starts[target + 1]]:
+                touched[block_of[source]].append(source)
+        
+        for split_block, sources in touched.items():
+            if len(sources) == len(members[split_block]):
+                continue
+            # Dividir: los estados que llegan forman un bloque nuevo
+            new_block = len(members)
+            members.append(set(sources))
+            members[split_block].difference_update(sources)
+            for source in sources:
+                block_of[source] = new_block
+            smaller = new_block if len(members[new_block]) <= len(members[split_block]) else split_block
+            for c in range(num_symbols):
+                if (split_block, c) in in_pending:
+                    item = (new_block, c)
+                else:
+                    item = (smaller, c)
+                pending.append(item)
+                in_pending.add(item)
+    
+    return np.array(block_of, dtype=np.int64)
+
+def minimize_table(transitions, labels, initial_state, reject_label=None):
+    """
+    Minimiza una tabla parcial (-1 = rechazo) con etiquetas arbitrarias por estado.
+    
+    Se añade un estado sumidero con reject_label para completar la tabla; los
+    bloques equivalentes al sumidero desaparecen y sus transiciones pasan a -1.
+    Retorna (tabla, etiquetas, estado inicial) del AFD mínimo, con los estados
+    en el orden del primer estado original de cada bloque.
+    """
+    num_states, num_symbols = transitions.shape
+    sink = num_states
+    complete = np.vstack([np.where(transitions == -1, sink, transitions),
+                          np.full((1, num_symbols), sink, dtype=transitions.dtype)])
+    blocks = hopcroft_partition(complete, list(labels) + [reject_label])
+    
+    sink_block = blocks[sink]
+    # Un representante por bloque (el primer estado) en orden de aparición
+    _, representatives = np.unique(blocks[:num_states], return_index=True)
+    representatives = np.sort(representatives)
+    representatives = representatives[blocks[representatives] != sink_block]
+    
+    if blocks[initial_state] == sink_block:
+        # El lenguaje es vacío: un único estado de rechazo
+        return np.full((1, num_symbols), -1, dtype=np.int32), [reject_label], 0
+    
+    new_index = np.full(blocks.max() + 1, -1, dtype=np.int32)
+    new_index[blocks[representatives]] = np.arange(len(representatives), dtype=np.int32)
+    table = new_index[blocks[complete[representatives]]]
+    new_labels = [labels[state] for state in representatives.tolist()]
+    return table, new_labels, int(new_index[blocks[initial_state]])
+
+def minimize_afd(afd):
+    """
+    AFD mínimo equivalente: sin estados inalcanzables ni equivalentes.
+    
+    Los estados que no llevan a ningún final se eliminan (sus transiciones pasan
+    a -1, que ya significa rechazo). Acepta exactamente las mismas palabras.
+    """
+    pruned = prune_unreachable(afd)
+    table, labels, initial_state = minimize_table(pruned.transitions.astype(np.int32, copy=False),
+                                                  pruned.final_mask.tolist(), pruned.initial_state,
+                                                  reject_label=False)
+    return CompactAFD(table, np.array(labels, dtype=bool), initial_state, afd.alphabet)
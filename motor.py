@@ -0,0 +1,600 @@
+import argparse
+import json
+import random
+import sys
+from afd import create_random_afd
+from construccion import seed_population
+from minimizacion import minimize_afd
+from conjugador import generate_conjugations, load_overrides
+from evaluacion import compile_conjugations, count_accepted, FitnessCache, PathRecords
+from evaluacion_paralela import ParallelEvaluator
+from evaluacion_carreras import RacingEvaluator
+from genetico import (generate_new_population, calculate_population_diversity, population_distance_matrix,
+                      replace_duplicates, elite_count)
+from islas import IslandModel
+import genetico
+from perfilado import PhaseProfiler, NULL_PROFILER
+from puntos_control import save_checkpoint, load_checkpoint
+
+# Configuración por defecto del algoritmo (la misma que usaba la interfaz)
+DEFAULT_CONFIG = {
+    "population_size": 40,
+    "generations": 150,
+    "num_states": None,          # None = max(8, min(conjugaciones // 2, 20))
+    "plateau_threshold": 15,
+    "restart_threshold": 25,
+    "max_restarts": 7,
+    "evaluation_workers": 1,     # Procesos para evaluar la población (1 = en el mismo proceso)
+    "num_islands": 1,            # > 1 activa el modelo de islas
+    "seed_fraction": 0.1,        # Parte de la población inicial construida a partir de las conjugaciones
+    "minimize_elites": False,    # Minimizar (Hopcroft) las élites en cada generación
+    "minimize_best": False,      # Entregar el mejor AFD minimizado (mismo lenguaje, menos estados)
+    "dedupe": True,              # Sustituir AFDs isomorfos (misma forma canónica) antes de evaluar
+    "canonical_diversity": False,  # Medir la diversidad entre formas canónicas
+    "incremental_evaluation": False,  # Reevaluar a los hijos solo en las palabras afectadas por sus cambios
+                                      # (con las tasas de mutación habituales casi todas lo están y es más lento)
+    "racing": False,             # Descartar pronto, con una muestra de conjugaciones, a los hijos sin opciones
+    "racing_audit": 0,           # Cada cuántas evaluaciones comparar las carreras con la evaluación completa (0 = nunca)
+    "trace_path": None,          # Archivo JSONL con tiempos y llamadas por fase en cada generación
+    "trace_memory": False,       # Registrar también el pico de memoria por generación (tracemalloc)
+    "profile_generations": None,  # (primera, última): generaciones a perfilar con cProfile
+    "profile_path": "ag.prof",   # Dónde volcar las estadísticas de cProfile
+    "checkpoint_path": None,     # Archivo del punto de control (None = sin puntos de control)
+    "checkpoint_every": 5,       # Generaciones entre puntos de control
+    "seed": None,
+}
+
+# Opciones que el modelo de islas no puede respetar: cada isla ya ocupa un proceso y no
+# hay una única población que trazar por fases ni que guardar en un punto de control
+ISLAND_UNSUPPORTED = ("evaluation_workers", "trace_path", "trace_memory", "profile_generations", "checkpoint_path")
+
+# Funciones de genetico cuyo tiempo y número de llamadas se registran con la traza por fases
+PROFILED_FUNCTIONS = ("select_parents", "improved_crossover", "mutate", "diversity_measure",
+                      "calculate_population_diversity")
+
+def generate_alphabet_from_conjugations(conjugations):
+    """
+    Genera un alfabeto basado en los caracteres presentes en las conjugaciones.
+    
+    Args:
+        conjugations (list): Lista de conjugaciones del verbo
+    
+    Returns:
+        list: Lista de caracteres únicos ordenados alfabéticamente
+    """
+    # Conjunto para almacenar caracteres únicos
+    unique_chars = set()
+    
+    # Extraer todos los caracteres de las conjugaciones
+    for word in conjugations:
+        for char in word:
+            unique_chars.add(char)
+    
+    # Convertir a lista y ordenar alfabéticamente
+    return sorted(list(unique_chars))
+
+class GeneticEngine:
+    """
+    Motor del algoritmo genético sin interfaz gráfica.
+    
+    step() ejecuta una generación y run() repite hasta terminar. Los ganchos
+    on_status(mensaje) y on_generation(motor, estadísticas) permiten mostrar el
+    progreso (la interfaz Tkinter es solo uno de sus consumidores).
+    """
+
+    def __init__(self, conjugations, alphabet=None, config=None, on_status=None, on_generation=None):
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+        unknown = set(self.config) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Opciones desconocidas: {', '.join(sorted(unknown))}")
+        if not conjugations:
+            raise ValueError("Se necesita al menos una conjugación")
+        if self.config["num_islands"] > 1:
+            unsupported = [name for name in ISLAND_UNSUPPORTED if self.config[name] != DEFAULT_CONFIG[name]]
+            if unsupported:
+                raise ValueError(f"Opciones no admitidas con el modelo de islas: {', '.join(unsupported)}")
+        
+        self.conjugations = list(conjugations)
+        self.alphabet = list(alphabet) if alphabet is not None else generate_alphabet_from_conjugations(self.conjugations)
+        self.num_states = self.config["num_states"] or max(8, min(len(self.conjugations) // 2, 20))
+        self.on_status = on_status
+        self.on_generation = on_generation
+        
+        # Compilar las conjugaciones en un trie una sola vez para toda la ejecución
+        self.corpus = compile_conjugations(self.conjugations, self.alphabet)
+        # Caché de fitness: élites y copias sin mutar no se vuelven a evaluar
+        self.fitness_cache = FitnessCache()
+        # Recorridos ya evaluados: los hijos solo recorren las palabras que tocan sus transiciones cambiadas
+        self.path_records = PathRecords(self.corpus) if self.config["incremental_evaluation"] else None
+        self.evaluator = ParallelEvaluator(self.corpus, max_workers=self.config["evaluation_workers"],
+                                           path_records=self.path_records, on_status=self.status)
+        # Carreras: los hijos sin opciones de superar el umbral de selección no se evalúan completos
+        self.racing = (RacingEvaluator(self.corpus, self.evaluator.base_scores, audit_every=self.config["racing_audit"])
+                       if self.config["racing"] else None)
+        
+        # Estado de la evolución
+        self.population = None
+        self.fitnesses = None     # Fitness de la última población evaluada
+        self.generation = 0
+        self.finished = False
+        self.best_afd = None
+        self.global_best_fitness = float('-inf')
+        self.best_generation = 0
+        self.stagnation_counter = 0
+        self.num_restarts = 0
+        
+        # Historias
+        self.best_fitness_history = []
+        self.avg_fitness_history = []
+        self.error_history = []
+        self.diversity_history = []
+        self.duplicate_history = []
+        
+        # Instrumentación por fases (sin coste si está desactivada)
+        if self.config["trace_path"] or self.config["trace_memory"] or self.config["profile_generations"]:
+            self.profiler = PhaseProfiler(self.config["trace_path"], memory=self.config["trace_memory"],
+                                          profile_generations=self.config["profile_generations"],
+                                          profile_path=self.config["profile_path"],
+                                          instrument=[(genetico, name) for name in PROFILED_FUNCTIONS])
+        else:
+            self.profiler = NULL_PROFILER
+        
+        if self.config["seed"] is not None:
+            random.seed(self.config["seed"])
+
+    def close(self):
+        """Libera los procesos del evaluador paralelo (si se crearon) y cierra la traza."""
+        self.evaluator.close()
+        self.profiler.close()
+
+    def status(self, message):
+        if self.on_status is not None:
+            self.on_status(message)
+
+    def initialize(self):
+        """Crea y evalúa la población inicial, conservando los mejores individuos."""
+        population_size = self.config["population_size"]
+        
+        # Crear población inicial con el alfabeto dinámico
+        self.status("Creando población inicial...")
+        initial_population_size = int(population_size * 1.3)
+        initial_population = [create_random_afd(num_states=self.num_states, alphabet=self.alphabet)
+                              for _ in range(initial_population_size)]
+        
+        # Sembrar parte de la población con la aproximación del AFD mínimo (y variantes)
+        num_seeds = min(initial_population_size, int(round(population_size * self.config["seed_fraction"])))
+        if num_seeds > 0:
+            initial_population[-num_seeds:] = seed_population(self.conjugations, self.alphabet,
+                                                              self.num_states, num_seeds)
+        
+        # Evaluar población inicial
+        self.status("Evaluando población inicial...")
+        initial_fitnesses = self.evaluator.evaluate(initial_population, cache=self.fitness_cache)
+        
+        # Seleccionar mejores individuos
+        selected_indices = sorted(range(len(initial_fitnesses)),
+                                  key=lambda i: initial_fitnesses[i],
+                                  reverse=True)[:population_size]
+        self.population = [initial_population[i] for i in selected_indices]
+
+    def step(self):
+        """Ejecuta una generación. Retorna sus estadísticas (o None si ya terminó)."""
+        if self.finished:
+            return None
+        with self.profiler.generation(self.generation + 1):
+            stats = self._step()
+        
+        every = self.config["checkpoint_every"]
+        if self.config["checkpoint_path"] and (self.finished or (every > 0 and self.generation % every == 0)):
+            self.save_checkpoint()
+        return stats
+
+    def _step(self):
+        profiler = self.profiler
+        if self.population is None:
+            with profiler.phase("initialize"):
+                self.initialize()
+        
+        config = self.config
+        population_size = config["population_size"]
+        generations = config["generations"]
+        population = self.population
+        generation = self.generation
+        
+        # Sustituir duplicados (AFDs isomorfos) antes de gastar evaluaciones en ellos
+        duplicates = 0
+        if config["dedupe"]:
+            with profiler.phase("dedupe"):
+                population, duplicates = replace_duplicates(population, protected=elite_count(len(population)))
+            self.population = population
+        self.duplicate_history.append(duplicates)
+        
+        # Distancias entre todos los individuos, una sola vez por generación
+        with profiler.phase("distances"):
+            distances = population_distance_matrix(population, canonical=config["canonical_diversity"])
+        
+        # Evaluar población
+        with profiler.phase("evaluate"):
+            fitnesses = self.evaluator.evaluate(population, population, cache=self.fitness_cache, distances=distances,
+                                                scorer=self.racing.base_scores if self.racing is not None else None)
+        self.fitnesses = fitnesses
+        if self.racing is not None:
+            self.racing.observe(fitnesses)
+        
+        # Calcular diversidad
+        with profiler.phase("diversity"):
+            population_diversity = calculate_population_diversity(population, distances)
+        self.diversity_history.append(population_diversity)
+        
+        # Estadísticas
+        best_fitness = max(fitnesses)
+        best_idx = fitnesses.index(best_fitness)
+        avg_fitness = sum(fitnesses) / len(fitnesses)
+        error = 1 - best_fitness
+        
+        # Registrar historia
+        self.best_fitness_history.append(best_fitness)
+        self.avg_fitness_history.append(avg_fitness)
+        self.error_history.append(error)
+        
+        # Actualizar el mejor AFD global
+        if best_fitness > self.global_best_fitness:
+            self.best_generation, self.global_best_fitness = generation + 1, best_fitness
+            self.best_afd = population[best_idx]
+            self.stagnation_counter = 0
+        else:
+            self.stagnation_counter += 1
+        
+        # Contar palabras aceptadas
+        with profiler.phase("count_accepted"):
+            correct_words = count_accepted(population[best_idx], self.corpus)
+        acceptance_rate = (correct_words / len(self.conjugations)) * 100
+        
+        stats = {
+            "generation": generation + 1,
+            "best_fitness": best_fitness,
+            "avg_fitness": avg_fitness,
+            "diversity": population_diversity,
+            "acceptance_rate": acceptance_rate,
+            "duplicates": duplicates,
+        }
+        self.generation += 1
+        
+        # Actualizar estado
+        self.status(f"Generación {generation + 1}/{generations}: "
+                    f"Fitness={best_fitness:.4f}, "
+                    f"Aceptación={acceptance_rate:.2f}%")
+        if self.on_generation is not None:
+            self.on_generation(self, stats)
+        
+        if self.generation >= generations:
+            self.finished = True
+        
+        # Si alcanzamos el 100%, terminar
+        if acceptance_rate == 100.0:
+            self.status("¡Solución perfecta encontrada con 100% de acierto!")
+            self.best_generation, self.global_best_fitness = generation + 1, best_fitness
+            self.best_afd = population[best_idx]
+            self.finished = True
+            return stats
+        
+        # Verificar estancamiento
+        if self.stagnation_counter >= config["plateau_threshold"]:
+            self.status(f"Estancamiento: {self.stagnation_counter} generaciones sin mejora")
+            
+            if self.stagnation_counter >= config["restart_threshold"] and self.num_restarts < config["max_restarts"]:
+                self.status(f"Realizando reinicio parcial #{self.num_restarts+1}")
+                
+                with profiler.phase("restart"):
+                    # Preservar el mejor AFD
+                    preserved = [self.best_afd]
+                    
+                    # Estrategia agresiva: nuevo 70% de la población
+                    replacement_size = int(0.7 * population_size)
+                    
+                    # Nuevos individuos con estados variables
+                    new_individuals = []
+                    for _ in range(replacement_size):
+                        state_variation = random.randint(-2, 4)
+                        new_num_states = max(5, min(self.num_states + state_variation, 25))
+                        new_individuals.append(
+                            create_random_afd(num_states=new_num_states, alphabet=self.alphabet)
+                        )
+                    
+                    # Mantener mejores 30%
+                    keep_size = population_size - replacement_size - len(preserved)
+                    remaining_indices = sorted(range(len(fitnesses)),
+                                               key=lambda i: fitnesses[i],
+                                               reverse=True)[:keep_size]
+                    remaining = [population[i] for i in remaining_indices]
+                    
+                    # Nueva población
+                    self.population = preserved + remaining + new_individuals
+                
+                # Reiniciar contador
+                self.stagnation_counter = 0
+                self.num_restarts += 1
+                return stats
+        
+        # Generar nueva población
+        with profiler.phase("new_population"):
+            self.population = generate_new_population(population, fitnesses, self.conjugations, distances,
+                                                      population_size,
+                                                      elite_transform=minimize_afd if config["minimize_elites"] else None)
+        
+        # Terminar si fitness excepcional
+        if best_fitness > 0.995:
+            self.status("¡Solución óptima encontrada con fitness excepcional!")
+            self.finished = True
+            return stats
+        
+        # Terminar si agotamos reinicios y seguimos estancados
+        if self.num_restarts >= config["max_restarts"] and self.stagnation_counter >= config["restart_threshold"]:
+            self.status("Intentando una última estrategia con más estados...")
+            
+            with profiler.phase("restart"):
+                # Preservar mejor AFD
+                best_so_far = self.best_afd
+                
+                # Nuevos AFDs con más estados
+                increased_states = self.num_states + 5
+                new_population = [create_random_afd(num_states=increased_states, alphabet=self.alphabet)
+                                  for _ in range(population_size-1)]
+                
+                # Añadir el mejor AFD
+                new_population.insert(0, best_so_far)
+                
+                # Reemplazar población
+                self.population = new_population
+            self.stagnation_counter = 0
+            self.num_restarts = config["max_restarts"]
+        
+        return stats
+    
+    # Atributos que definen el estado de la evolución (lo que guarda un punto de control)
+    _CHECKPOINT_ATTRIBUTES = ("num_states", "population", "fitnesses", "generation", "finished", "best_afd",
+                              "global_best_fitness", "best_generation", "stagnation_counter", "num_restarts",
+                              "best_fitness_history", "avg_fitness_history", "error_history",
+                              "diversity_history", "duplicate_history")
+
+    def checkpoint_state(self):
+        """Estado completo de la evolución, incluido el del generador aleatorio."""
+        state = {name: getattr(self, name) for name in self._CHECKPOINT_ATTRIBUTES}
+        state.update({
+            "conjugations": self.conjugations,
+            "alphabet": self.alphabet,
+            "config": self.config,
+            "random_state": random.getstate(),
+            "racing_state": self.racing.state() if self.racing is not None else None,
+            # Con carreras el resultado depende de qué AFDs ya están en caché (no se vuelven a correr)
+            "fitness_cache": self.fitness_cache if self.racing is not None else None,
+        })
+        return state
+
+    def save_checkpoint(self, path=None):
+        """Escribe un punto de control (por defecto en config["checkpoint_path"])."""
+        save_checkpoint(path or self.config["checkpoint_path"], self.checkpoint_state())
+
+    @classmethod
+    def resume(cls, path, config=None, on_status=None, on_generation=None):
+        """
+        Motor restaurado desde un punto de control, listo para seguir con step() o run().
+        
+        La continuación es idéntica a la ejecución sin interrumpir (mismo estado
+        aleatorio y mismos contadores). config solo debería cambiar opciones que
+        no afectan a la evolución (trazas, trabajadores, puntos de control, o
+        generations para alargar la ejecución). La caché de recorridos no se
+        guarda: se reconstruye sin cambiar los resultados. La de fitness solo se
+        guarda con carreras, donde un acierto en caché evita una carrera.
+        """
+        state = load_checkpoint(path)
+        engine_config = dict(state["config"])
+        engine_config["seed"] = None  # El estado aleatorio se restaura abajo
+        engine_config.update(config or {})
+        engine = cls(state["conjugations"], state["alphabet"], config=engine_config,
+                     on_status=on_status, on_generation=on_generation)
+        for name in cls._CHECKPOINT_ATTRIBUTES:
+            setattr(engine, name, state[name])
+        if engine.racing is not None:
+            engine.racing.restore(state["racing_state"])
+            engine.fitness_cache = state["fitness_cache"]
+        random.setstate(state["random_state"])
+        return engine
+
+    def run(self):
+        """Ejecuta el algoritmo completo y retorna el resultado (ver result())."""
+        if self.config["num_islands"] > 1:
+            return self._run_islands()
+        
+        try:
+            while not self.finished:
+                self.step()
+        finally:
+            self.close()
+        return self.result()
+
+    def _run_islands(self):
+        """Modelo de islas: subpoblaciones en paralelo en lugar de reinicios en serie."""
+        config = self.config
+        self.status(f"Ejecutando modelo de islas con {config['num_islands']} subpoblaciones...")
+        model = IslandModel(self.conjugations, self.alphabet, num_islands=config["num_islands"],
+                            generations=config["generations"], num_states=self.num_states,
+                            seed=config["seed"], seed_fraction=config["seed_fraction"],
+                            minimize_elites=config["minimize_elites"], dedupe=config["dedupe"],
+                            population_size=config["population_size"],
+                            incremental=config["incremental_evaluation"], racing=config["racing"],
+                            racing_audit=config["racing_audit"],
+                            canonical_diversity=config["canonical_diversity"])
+
+        def on_epoch(model):
+            self.generation = max(island["generation"] for island in model.islands)
+            best = max(island["best_fitness"] for island in model.islands)
+            self.status(f"Generación {self.generation}/{config['generations']}: mejor fitness entre islas={best:.4f}")
+            if self.on_generation is not None:
+                self.on_generation(self, {"generation": self.generation, "best_fitness": best})
+        
+        island_result = model.run(on_epoch=on_epoch)
+        
+        # Historias combinadas: mejor global, y promedio/diversidad medios entre islas
+        self.best_afd = island_result["best_afd"]
+        self.global_best_fitness = island_result["best_fitness"]
+        self.best_generation = island_result["islands"][island_result["best_island"]]["best_generation"]
+        self.best_fitness_history = island_result["best_fitness_history"]
+        self.avg_fitness_history = [sum(values) / len(values) for values in
+                                    zip(*(stats["avg_fitness_history"] for stats in island_result["islands"]))]
+        self.diversity_history = [sum(values) / len(values) for values in
+                                  zip(*(stats["diversity_history"] for stats in island_result["islands"]))]
+        self.duplicate_history = [sum(values) for values in
+                                  zip(*(stats["duplicate_history"] for stats in island_result["islands"]))]
+        self.error_history = [1 - f for f in self.best_fitness_history]
+        self.finished = True
+        
+        result = self.result()
+        result["islands"] = island_result["islands"]
+        return result
+
+    def result(self):
+        """Mejor AFD, su aceptación y las historias de la ejecución."""
+        accepted = count_accepted(self.best_afd, self.corpus) if self.best_afd is not None else 0
+        best_afd = self.best_afd
+        if best_afd is not None and self.config["minimize_best"]:
+            best_afd = minimize_afd(best_afd)
+        return {
+            "best_afd": best_afd,
+            "evolved_states": self.best_afd.num_states if self.best_afd is not None else 0,
+            "best_fitness": self.global_best_fitness,
+            "best_generation": self.best_generation,
+            "generations": self.generation,
+            "accepted": accepted,
+            "total": len(self.conjugations),
+            "num_restarts": self.num_restarts,
+            "best_fitness_history": self.best_fitness_history,
+            "avg_fitness_history": self.avg_fitness_history,
+            "error_history": self.error_history,
+            "diversity_history": self.diversity_history,
+            "duplicate_history": self.duplicate_history,
+            "cache": self.fitness_cache.stats(),
+            "incremental": self.path_records.stats() if self.path_records is not None else None,
+            "racing": self.racing.stats() if self.racing is not None else None,
+            "phases": self.profiler.summary() if self.profiler is not NULL_PROFILER else None,
+        }
+
+def read_conjugations(path):
+    """Lee una conjugación por línea (UTF-8), ignorando líneas vacías."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+def result_to_json(result):
+    """Convierte el resultado del motor en un diccionario serializable."""
+    data = {key: value for key, value in result.items() if key != "best_afd"}
+    data["afd"] = result["best_afd"].to_json() if result["best_afd"] is not None else None
+    return data
+
+def _generation_range(text):
+    """"10:20" → (10, 20); "5" → (5, 5)."""
+    first, _, last = text.partition(":")
+    return int(first), int(last or first)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un AFD para un conjunto de conjugaciones (sin interfaz gráfica).")
+    parser.add_argument("conjugations", nargs="?", help="Archivo con una conjugación por línea")
+    parser.add_argument("--verb", help="Generar las conjugaciones de un verbo regular sin conexión (en lugar del archivo)")
+    parser.add_argument("--irregulars", help="Archivo JSON con conjugaciones de irregulares para --verb")
+    parser.add_argument("-o", "--output", help="Archivo JSON de salida (por defecto, salida estándar)")
+    parser.add_argument("--generations", type=int, default=DEFAULT_CONFIG["generations"])
+    parser.add_argument("--population-size", type=int, default=DEFAULT_CONFIG["population_size"])
+    parser.add_argument("--num-states", type=int, default=DEFAULT_CONFIG["num_states"])
+    parser.add_argument("--workers", type=int, default=DEFAULT_CONFIG["evaluation_workers"],
+                        help="Procesos para evaluar la población")
+    parser.add_argument("--islands", type=int, default=DEFAULT_CONFIG["num_islands"],
+                        help="Número de islas (> 1 activa el modelo de islas)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    parser.add_argument("--seed-fraction", type=float, default=DEFAULT_CONFIG["seed_fraction"],
+                        help="Parte de la población inicial construida a partir de las conjugaciones (0 = toda aleatoria)")
+    parser.add_argument("--no-dedupe", action="store_true", help="No sustituir AFDs isomorfos antes de evaluar")
+    parser.add_argument("--canonical-diversity", action="store_true", help="Medir la diversidad entre formas canónicas")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reevaluar a los hijos solo en las palabras afectadas por sus cambios")
+    parser.add_argument("--racing", action="store_true",
+                        help="Evaluar primero con una muestra y descartar a los hijos sin opciones")
+    parser.add_argument("--racing-audit", type=int, default=DEFAULT_CONFIG["racing_audit"],
+                        help="Comparar las carreras con la evaluación completa cada N evaluaciones (0 = nunca)")
+    parser.add_argument("--trace", help="Archivo JSONL con tiempos y llamadas por fase en cada generación")
+    parser.add_argument("--trace-memory", action="store_true", help="Incluir el pico de memoria por generación (lento)")
+    parser.add_argument("--profile", type=_generation_range,
+                        help="Perfilar con cProfile un rango de generaciones (p. ej. 10:20 o 5)")
+    parser.add_argument("--profile-output", default=DEFAULT_CONFIG["profile_path"],
+                        help="Archivo donde volcar las estadísticas de cProfile")
+    parser.add_argument("--checkpoint", help="Guardar puntos de control periódicos en este archivo")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CONFIG["checkpoint_every"],
+                        help="Generaciones entre puntos de control")
+    parser.add_argument("--resume", help="Continuar una ejecución desde un punto de control")
+    parser.add_argument("--minimize", action="store_true", help="Minimizar el mejor AFD antes de guardarlo")
+    parser.add_argument("--minimize-elites", action="store_true", help="Minimizar las élites durante la evolución")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar el progreso en stderr")
+    args = parser.parse_args(argv)
+    if args.resume is None and (args.conjugations is None) == (args.verb is None):
+        parser.error("indica un archivo de conjugaciones o --verb")
+    on_status = (lambda message: print(message, file=sys.stderr)) if args.verbose else None
+    
+    if args.resume is not None:
+        # Solo cambian las opciones que no afectan a la evolución
+        engine = GeneticEngine.resume(args.resume, config={
+            "evaluation_workers": args.workers,
+            "trace_path": args.trace,
+            "trace_memory": args.trace_memory,
+            "profile_generations": args.profile,
+            "profile_path": args.profile_output,
+            "checkpoint_path": args.checkpoint or args.resume,
+            "checkpoint_every": args.checkpoint_every,
+        }, on_status=on_status)
+    else:
+        try:
+            engine = GeneticEngine(_read_input(args), config=_config_from_args(args), on_status=on_status)
+        except ValueError as error:
+            parser.error(str(error))
+    result = engine.run()
+    
+    output = json.dumps(result_to_json(result), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+def _read_input(args):
+    if args.verb is not None:
+        overrides = load_overrides(args.irregulars) if args.irregulars else None
+        conjugations = generate_conjugations(args.verb, overrides)
+    else:
+        conjugations = read_conjugations(args.conjugations)
+    return conjugations
+
+def _config_from_args(args):
+    return {
+        "generations": args.generations,
+        "population_size": args.population_size,
+        "num_states": args.num_states,
+        "evaluation_workers": args.workers,
+        "num_islands": args.islands,
+        "seed": args.seed,
+        "seed_fraction": args.seed_fraction,
+        "minimize_best": args.minimize,
+        "minimize_elites": args.minimize_elites,
+        "dedupe": not args.no_dedupe,
+        "canonical_diversity": args.canonical_diversity,
+        "incremental_evaluation": args.incremental,
+        "racing": args.racing,
+        "racing_audit": args.racing_audit,
+        "trace_path": args.trace,
+        "trace_memory": args.trace_memory,
+        "profile_generations": args.profile,
+        "profile_path": args.profile_output,
+        "checkpoint_path": args.checkpoint,
+        "checkpoint_every": args.checkpoint_every,
+    }
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
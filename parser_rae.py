@@ -0,0 +1,125 @@
+import re
+from html.parser import HTMLParser
+
+class _ConjugationTableParser(HTMLParser):
+    """
+    Recorre el HTML una sola vez y recoge el texto de las celdas <td> de cada
+    elemento con clase "c-table", fila por fila.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []        # tablas → filas → textos de celda
+        self._table_tag = None  # etiqueta de la tabla abierta y su nivel de anidamiento
+        self._table_depth = 0
+        self._cell = None       # fragmentos de texto de la celda <td> abierta
+
+    def handle_starttag(self, tag, attrs):
+        if self._table_tag is None:
+            classes = (dict(attrs).get("class") or "").split()
+            if "c-table" in classes:
+                self._table_tag = tag
+                self._table_depth = 1
+                self.tables.append([])
+            return
+        
+        if tag == self._table_tag:
+            self._table_depth += 1
+        elif tag == "tr":
+            self._close_cell()
+            self.tables[-1].append([])
+        elif tag in ("td", "th"):
+            self._close_cell()
+            if tag == "td":
+                if not self.tables[-1]:
+                    self.tables[-1].append([])
+                self._cell = []
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(None)  # Salto de línea visible
+
+    def handle_endtag(self, tag):
+        if self._table_tag is None:
+            return
+        if tag in ("td", "th", "tr"):
+            self._close_cell()
+        elif tag == self._table_tag:
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self._close_cell()
+                self._table_tag = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _close_cell(self):
+        if self._cell is not None:
+            # Como el texto visible: espacios colapsados y <br> como salto de línea
+            lines, current = [], []
+            for chunk in self._cell + [None]:
+                if chunk is None:
+                    line = " ".join("".join(current).split())
+                    if line:
+                        lines.append(line)
+                    current = []
+                else:
+                    current.append(chunk)
+            self.tables[-1][-1].append("\n".join(lines))
+            self._cell = None
+
+def extract_table_cells(html):
+    """Textos de las celdas <td> de todas las tablas "c-table": [tabla][fila][celda]."""
+    parser = _ConjugationTableParser()
+    parser.feed(html)
+    parser.close()
+    parser._close_cell()
+    return parser.tables
+
+def split_forms(text):
+    """Separa el texto de una celda en formas individuales (mismas reglas que el scraper)."""
+    # Primero, eliminar paréntesis y su contenido
+    text = re.sub(r'\s*\(.*?\)', '', text.strip()).strip()
+    
+    forms = []
+    # 1. Separar por " / " y 2. por " o " (manteniendo los espacios dentro de las formas compuestas)
+    for form in re.split(r'\s*/\s*', text):
+        for conj in re.split(r'\s+o\s+', form.strip()):
+            conj = conj.strip().lower()
+            # Filtrar conjugaciones válidas
+            if conj and len(conj) > 1 and not conj.isdigit():
+                forms.append(conj)
+    return forms
+
+def parse_conjugations(html, verb):
+    """
+    Conjugaciones de una página de verbo de la RAE (HTML en memoria).
+    
+    La primera fila de cada tabla es la cabecera y se omite. Retorna la lista
+    ordenada sin el infinitivo, el participio ni el gerundio.
+    """
+    all_conjugations = set()
+    for table in extract_table_cells(html):
+        for row in table[1:]:
+            for cell in row:
+                all_conjugations.update(split_forms(cell))
+    
+    # Filtrar para eliminar infinitivos, participios y formas no conjugadas
+    excluded = {verb, f'{verb}do', f'{verb}ndo'}
+    return [conj for conj in sorted(all_conjugations) if conj not in excluded]
+
+def verb_from_filename(path):
+    """Verbo de una página guardada: el nombre del archivo sin extensión (p. ej. "cantar.html")."""
+    name = re.split(r'[\\/]', path)[-1]
+    return name.split(".", 1)[0].strip().lower()
+
+def parse_conjugations_file(path, verb=None, encoding="utf-8"):
+    """Conjugaciones de una página de la RAE guardada en disco."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        html = f.read()
+    return parse_conjugations(html, verb if verb is not None else verb_from_filename(path))
+
+if __name__ == "__main__":
+    import sys
+    # Uso: python parser_rae.py pagina.html [verbo]
+    for conj in parse_conjugations_file(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None):
+        print(conj)
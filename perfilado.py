@@ -0,0 +1,150 @@
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+class NullProfiler:
+    """Perfilador desactivado: mismos métodos, sin medir nada (coste despreciable)."""
+    
+    _NULL = nullcontext()
+
+    def phase(self, name):
+        return self._NULL
+
+    def generation(self, number):
+        return self._NULL
+
+    def close(self):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+class PhaseProfiler:
+    """
+    Tiempo y número de llamadas por fase en cada generación del AG.
+    
+    phase(nombre) mide un bloque del bucle principal; las funciones de
+    instrument (p. ej. genetico.mutate) se envuelven solo mientras dura una
+    generación, así que sin perfilador el código del AG no cambia. Al cerrar
+    cada generación se escribe una línea JSON en trace_path:
+    {"generation", "wall_time", "phases": {fase: {"time", "calls"}}, "peak_memory"}.
+    
+    Con memory=True se activa tracemalloc y se registra el pico de memoria de la
+    generación (tracemalloc ralentiza bastante la ejecución). profile_generations
+    = (primera, última) envuelve ese rango de generaciones en cProfile y vuelca
+    las estadísticas en profile_path (legibles con pstats).
+    """
+
+    def __init__(self, trace_path=None, memory=False, profile_generations=None, profile_path="ag.prof",
+                 instrument=()):
+        self.trace_path = trace_path
+        self.memory = memory
+        self.profile_generations = profile_generations
+        self.profile_path = profile_path
+        self.instrument = list(instrument)  # (módulo, nombre de la función)
+        self.records = []
+        self._phases = None
+        self._trace = open(trace_path, "a", encoding="utf-8") if trace_path else None
+        self._profile = None
+        self._started_tracing = memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def _add(self, name, elapsed):
+        entry = self._phases.get(name)
+        if entry is None:
+            self._phases[name] = {"time": elapsed, "calls": 1}
+        else:
+            entry["time"] += elapsed
+            entry["calls"] += 1
+
+    @contextmanager
+    def phase(self, name):
+        if self._phases is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - start)
+
+    def _wrap(self, function, name):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._add(name, time.perf_counter() - start)
+        return wrapper
+
+    @contextmanager
+    def generation(self, number):
+        """Mide una generación completa y escribe su registro al terminar."""
+        self._phases = {}
+        originals = [(module, name, getattr(module, name)) for module, name in self.instrument]
+        for module, name, function in originals:
+            setattr(module, name, self._wrap(function, name))
+        
+        first, last = self.profile_generations or (None, None)
+        # Por rango y no por igualdad: al reanudar después de `first` también se perfila
+        profiled = first is not None and first <= number <= last
+        if profiled:
+            if self._profile is None:
+                self._profile = cProfile.Profile()
+            self._profile.enable()
+        if self.memory:
+            tracemalloc.reset_peak()
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            if profiled:
+                self._profile.disable()
+                if number >= last:
+                    self._dump_profile()
+            for module, name, function in originals:
+                setattr(module, name, function)
+            
+            record = {"generation": number, "wall_time": wall_time, "phases": self._phases}
+            if self.memory:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            self._phases = None
+            self.records.append(record)
+            if self._trace is not None:
+                self._trace.write(json.dumps(record) + "\n")
+                self._trace.flush()
+
+    def _dump_profile(self):
+        self._profile.dump_stats(self.profile_path)
+        self._profile = None
+
+    def summary(self):
+        """Tiempo y llamadas totales por fase en todas las generaciones registradas."""
+        totals = {}
+        for record in self.records:
+            for name, entry in record["phases"].items():
+                total = totals.setdefault(name, {"time": 0.0, "calls": 0})
+                total["time"] += entry["time"]
+                total["calls"] += entry["calls"]
+        return {
+            "generations": len(self.records),
+            "wall_time": sum(record["wall_time"] for record in self.records),
+            "phases": totals,
+        }
+
+    def close(self):
+        """Vuelca un perfil aún abierto (ejecución más corta que el rango) y cierra la traza."""
+        if self._profile is not None:
+            self._dump_profile()
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
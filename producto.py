@@ -0,0 +1,222 @@
+import argparse
+import json
+import sys
+import numpy as np
+from afd import build_symbol_table
+from minimizacion import minimize_afd, minimize_table
+
+# Límite de estados del producto al construirlo entero (el número de estados puede crecer mucho)
+MAX_PRODUCT_STATES = 200_000
+
+class LabeledAFD:
+    """
+    AFD cuyos estados llevan una etiqueta: el conjunto de verbos que aceptan ahí.
+    
+    - transitions: matriz de enteros (estados × índice de símbolo), -1 = rechazo
+    - labels: frozenset de verbos por estado (vacío = no final)
+
+    classify(palabra) recorre la palabra una sola vez y retorna los verbos que
+    la aceptan; igual que accepts_input, un símbolo fuera del alfabeto o una
+    transición inexistente rechazan (conjunto vacío).
+    """
+    
+    __slots__ = ("transitions", "labels", "initial_state", "alphabet", "symbol_index", "_rows")
+    
+    _EMPTY = frozenset()
+
+    def __init__(self, transitions, labels, initial_state, alphabet):
+        self.transitions = transitions
+        self.labels = list(labels)
+        self.initial_state = initial_state
+        self.alphabet, self.symbol_index = build_symbol_table(tuple(alphabet))
+        self._rows = transitions.tolist()
+
+    @property
+    def num_states(self):
+        return self.transitions.shape[0]
+
+    @property
+    def verbs(self):
+        """Todos los verbos que aparecen en alguna etiqueta."""
+        return frozenset().union(*self.labels)
+
+    def classify(self, word):
+        """Verbos cuyos AFDs aceptan la palabra (frozenset, vacío si ninguno)."""
+        rows, index = self._rows, self.symbol_index
+        state = self.initial_state
+        for symbol in word:
+            symbol_idx = index.get(symbol)
+            if symbol_idx is None:
+                return self._EMPTY
+            state = rows[state][symbol_idx]
+            if state == -1:
+                return self._EMPTY
+        return self.labels[state]
+
+    def to_json(self):
+        """Representación serializable en JSON (etiquetas como listas ordenadas)."""
+        return {
+            "alphabet": list(self.alphabet),
+            "initial_state": int(self.initial_state),
+            "labels": [sorted(label) for label in self.labels],
+            "transitions": self.transitions.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Reconstruye el autómata a partir de to_json()."""
+        transitions = np.array(data["transitions"], dtype=np.int32).reshape(-1, len(data["alphabet"]))
+        return cls(transitions, [frozenset(label) for label in data["labels"]], data["initial_state"],
+                   data["alphabet"])
+
+def labeled_afd(verb, afd):
+    """LabeledAFD mínimo de un solo AFD: sus estados finales llevan la etiqueta {verbo}."""
+    afd = minimize_afd(afd)
+    accepted = frozenset([verb])
+    return LabeledAFD(afd.transitions, [accepted if final else frozenset() for final in afd.final_mask.tolist()],
+                      afd.initial_state, afd.alphabet)
+
+class LazyUnion:
+    """
+    Autómata producto de varios LabeledAFD, construido bajo demanda.
+    
+    Un estado del producto es la tupla de pares (componente, estado) de los
+    componentes que siguen vivos; los que llegan a una transición inexistente
+    salen de la tupla, y la tupla vacía es el rechazo (-1). La etiqueta es la
+    unión de las etiquetas de los componentes. Solo se crean los estados que se
+    visitan: al clasificar palabras (classify) o al recorrer todos los
+    alcanzables (expand). El alfabeto es la unión de los alfabetos.
+    """
+
+    def __init__(self, components):
+        self.alphabet, self.symbol_index = build_symbol_table(
+            tuple(sorted(set().union(*(component.alphabet for component in components))))
+        )
+        self._rows = [component.transitions.tolist() for component in components]
+        self._labels = [component.labels for component in components]
+        # Columna de cada símbolo de la unión en cada componente (-1 si no está en su alfabeto)
+        self._columns = [[component.symbol_index.get(symbol, -1) for symbol in self.alphabet]
+                         for component in components]
+        
+        self.states = []       # Tupla de cada estado del producto
+        self.labels = []       # frozenset de verbos de cada estado
+        self.transitions = []  # Fila de cada estado: destino, -1 (rechazo) o None (aún sin calcular)
+        self._index = {}
+        self.initial_state = self._state_id(tuple((c, component.initial_state)
+                                                  for c, component in enumerate(components)))
+
+    @classmethod
+    def from_automata(cls, automata):
+        """Producto de {verbo: CompactAFD}; cada AFD se minimiza antes (sale en cuanto ya no puede aceptar)."""
+        return cls([labeled_afd(verb, afd) for verb, afd in automata.items()])
+
+    @property
+    def num_states(self):
+        return len(self.states)
+
+    def _state_id(self, state):
+        state_id = self._index.get(state)
+        if state_id is None:
+            state_id = len(self.states)
+            self._index[state] = state_id
+            self.states.append(state)
+            self.labels.append(frozenset().union(*(self._labels[c][s] for c, s in state)))
+            self.transitions.append([None] * len(self.alphabet))
+        return state_id
+
+    def step(self, state_id, symbol_idx):
+        """Destino de un estado con un símbolo (índice de la unión); lo crea si no existe."""
+        target = self.transitions[state_id][symbol_idx]
+        if target is None:
+            rows, columns = self._rows, self._columns
+            successor = []
+            for c, s in self.states[state_id]:
+                column = columns[c][symbol_idx]
+                if column != -1:
+                    t = rows[c][s][column]
+                    if t != -1:
+                        successor.append((c, t))
+            target = self._state_id(tuple(successor)) if successor else -1
+            self.transitions[state_id][symbol_idx] = target
+        return target
+
+    def classify(self, word):
+        """Verbos que aceptan la palabra, creando los estados que falten por el camino."""
+        index = self.symbol_index
+        state = self.initial_state
+        for symbol in word:
+            symbol_idx = index.get(symbol)
+            if symbol_idx is None:
+                return LabeledAFD._EMPTY
+            state = self.step(state, symbol_idx)
+            if state == -1:
+                return LabeledAFD._EMPTY
+        return self.labels[state]
+
+    def expand(self, max_states=MAX_PRODUCT_STATES):
+        """
+        Crea todos los estados alcanzables (en anchura desde el inicial).
+        
+        Lanza ValueError si se superan max_states estados; los ya creados se
+        conservan y classify sigue funcionando bajo demanda.
+        """
+        num_symbols = len(self.alphabet)
+        state_id = 0
+        while state_id < len(self.states):
+            for symbol_idx in range(num_symbols):
+                self.step(state_id, symbol_idx)
+                if max_states is not None and len(self.states) > max_states:
+                    raise ValueError(f"El autómata producto supera {max_states} estados")
+            state_id += 1
+
+    def to_labeled(self):
+        """LabeledAFD mínimo equivalente (requiere expand: todas las transiciones calculadas)."""
+        table = np.array(self.transitions, dtype=np.int32).reshape(-1, len(self.alphabet))
+        table, labels, initial_state = minimize_table(table, self.labels, self.initial_state,
+                                                      reject_label=frozenset())
+        return LabeledAFD(table, labels, initial_state, self.alphabet)
+
+def union_automaton(automata, max_states=MAX_PRODUCT_STATES):
+    """
+    Un único AFD mínimo que reconoce a la vez los lenguajes de varios AFDs.
+    
+    automata es {verbo: CompactAFD}. Los AFDs se unen por parejas, como en un
+    torneo: cada producto (LazyUnion, solo estados alcanzables) se minimiza con
+    etiquetas antes de la ronda siguiente, así los productos intermedios no
+    superan mucho el tamaño del resultado. Dos estados solo se fusionan si
+    aceptan exactamente los mismos verbos tras cualquier sufijo, de modo que
+    classify(palabra) equivale a llamar a accepts_input con cada AFD. Lanza
+    ValueError si algún producto supera max_states estados.
+    """
+    if not automata:
+        raise ValueError("Se necesita al menos un AFD")
+    parts = [labeled_afd(verb, afd) for verb, afd in automata.items()]
+    while len(parts) > 1:
+        merged = []
+        for i in range(0, len(parts) - 1, 2):
+            union = LazyUnion(parts[i:i + 2])
+            union.expand(max_states)
+            merged.append(union.to_labeled())
+        if len(parts) % 2:
+            merged.append(parts[-1])
+        parts = merged
+    return parts[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Une varios AFDs (JSON de motor.py) en un único reconocedor etiquetado.")
+    parser.add_argument("afd", nargs="+", help="AFD guardado, como verbo=archivo.json o archivo.json")
+    parser.add_argument("-o", "--output", required=True, help="Archivo JSON del autómata unido")
+    parser.add_argument("--max-states", type=int, default=MAX_PRODUCT_STATES, help="Límite de estados del producto")
+    args = parser.parse_args(argv)
+    
+    from clasificador import load_automata
+    automata = load_automata(args.afd)
+    union = union_automaton(automata, args.max_states)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(union.to_json(), f, ensure_ascii=False)
+    print(f"{len(automata)} AFDs, {sum(a.num_states for a in automata.values())} estados → "
+          f"{union.num_states} estados", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
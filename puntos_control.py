@@ -0,0 +1,42 @@
+import os
+import pickle
+
+# Versión del formato: se comprueba al cargar para no reanudar con un estado incompatible
+CHECKPOINT_VERSION = 2
+
+def save_checkpoint(path, state):
+    """
+    Guarda el estado de una ejecución (un diccionario) en binario, de forma atómica.
+    
+    Se escribe en un archivo temporal junto al destino, se lleva al disco
+    (fsync) y se renombra con os.replace: un corte a mitad de escritura deja
+    intacto el punto de control anterior, y tras el renombrado nunca queda uno
+    vacío o a medias. Los AFDs comparten alfabeto e índice de símbolos, que
+    pickle guarda una sola vez; las tablas viajan como bytes de NumPy.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": CHECKPOINT_VERSION, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+def _fsync_directory(directory):
+    """Lleva al disco la entrada del renombrado (en Windows no se pueden abrir carpetas)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def load_checkpoint(path):
+    """Lee un punto de control escrito por save_checkpoint (solo de fuentes de confianza: usa pickle)."""
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    version = state.pop("version", None)
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Punto de control con versión {version} (se esperaba {CHECKPOINT_VERSION})")
+    return state
@@ -0,0 +1,259 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+from afd import create_random_afd, accepts_input
+from evaluacion import compile_conjugations, evaluate_afd, evaluate_population
+from genetico import diversity_measure, calculate_population_diversity, mutate, improved_crossover
+from motor import GeneticEngine
+
+# Alfabeto por defecto de los corpus sintéticos: letras frecuentes en las conjugaciones
+DEFAULT_ALPHABET = "abcdeghilmnorstuvyáéíó"
+DEFAULT_STATES = (10, 20, 40)
+DEFAULT_POPULATIONS = (40, 100)
+DEFAULT_REPEAT = 5
+# Un benchmark es una regresión si su mediana empeora más que este factor respecto a la línea base
+DEFAULT_THRESHOLD = 0.10
+
+def synthetic_corpus(num_words, alphabet=DEFAULT_ALPHABET, num_endings=40, compound_ratio=0.15, seed=0):
+    """
+    Corpus sintético con la forma de un conjunto de conjugaciones.
+    
+    Las palabras son raíz + terminación, con un repertorio pequeño de
+    terminaciones compartidas (como las desinencias verbales), y una parte son
+    compuestas ("auxiliar participio"). Para una misma semilla el corpus es
+    siempre el mismo. Retorna la lista ordenada y sin repetidos.
+    """
+    rng = random.Random(seed)
+    alphabet = list(alphabet)
+
+    def random_string(min_length, max_length):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length)))
+    
+    endings = sorted({random_string(1, 5) for _ in range(num_endings)})
+    auxiliaries = sorted({random_string(2, 6) for _ in range(max(1, num_endings // 5))})
+    participles = sorted({random_string(2, 4) for _ in range(3)})
+    
+    words = set()
+    # Límite de intentos: con alfabetos muy pequeños puede no haber num_words palabras distintas
+    for _ in range(num_words * 20):
+        if len(words) >= num_words:
+            break
+        stem = random_string(2, 5)
+        if rng.random() < compound_ratio:
+            words.add(f"{rng.choice(auxiliaries)} {stem}{rng.choice(participles)}")
+        else:
+            words.add(stem + rng.choice(endings))
+    return sorted(words)
+
+def _alphabet_of(corpus):
+    return sorted(set("".join(corpus)))
+
+def _population(num_states, population_size, alphabet, seed):
+    random.seed(seed)
+    return [create_random_afd(num_states, alphabet) for _ in range(population_size)]
+
+# Cada benchmark recibe el caso (corpus, trie, población, ...) y retorna la función a cronometrar.
+# La preparación no cuenta en el tiempo; cada repetición parte del mismo estado aleatorio.
+
+def bench_accepts_input(case):
+    afd, corpus = case["population"][0], case["corpus"]
+    return lambda: [accepts_input(afd, word) for word in corpus]
+
+def bench_evaluate_afd(case):
+    population, trie = case["population"], case["trie"]
+    return lambda: [evaluate_afd(afd, trie) for afd in population]
+
+def bench_evaluate_population(case):
+    population, trie = case["population"], case["trie"]
+    return lambda: evaluate_population(population, trie, population)
+
+def bench_diversity_measure(case):
+    population = case["population"]
+    pairs = list(zip(population, population[1:] + population[:1]))
+    return lambda: [diversity_measure(afd1, afd2) for afd1, afd2 in pairs]
+
+def bench_calculate_population_diversity(case):
+    population = case["population"]
+    return lambda: calculate_population_diversity(population)
+
+def bench_mutate(case):
+    population = case["population"]
+    return lambda: [mutate(afd) for afd in population]
+
+def bench_improved_crossover(case):
+    population = case["population"]
+    pairs = list(zip(population[::2], population[1::2]))
+    return lambda: [improved_crossover(afd1, afd2) for afd1, afd2 in pairs]
+
+def bench_generation(case):
+    # Una generación completa del motor, tras crear y evaluar la población inicial (fuera del tiempo)
+    engine = GeneticEngine(case["corpus"], alphabet=case["alphabet"],
+                           config={"population_size": case["population_size"], "num_states": case["num_states"],
+                                   "seed": case["seed"], "seed_fraction": 0.0, "generations": 10 ** 6})
+    engine.initialize()
+    return engine.step
+
+BENCHMARKS = {
+    "accepts_input": bench_accepts_input,
+    "evaluate_afd": bench_evaluate_afd,
+    "evaluate_population": bench_evaluate_population,
+    "diversity_measure": bench_diversity_measure,
+    "calculate_population_diversity": bench_calculate_population_diversity,
+    "mutate": bench_mutate,
+    "improved_crossover": bench_improved_crossover,
+    "generation": bench_generation,
+}
+
+def run_benchmarks(corpus, states=DEFAULT_STATES, populations=DEFAULT_POPULATIONS, names=None,
+                   repeat=DEFAULT_REPEAT, seed=0, on_result=None):
+    """
+    Ejecuta los benchmarks sobre la malla número de estados × tamaño de población.
+    
+    Cada repetición reinicia el generador aleatorio con la misma semilla antes
+    de preparar el caso, así todas cronometran exactamente el mismo trabajo.
+    Retorna una lista de resultados con los tiempos (en segundos) de cada repetición.
+    """
+    names = list(names) if names is not None else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Benchmarks desconocidos: {', '.join(sorted(unknown))}")
+    
+    alphabet = _alphabet_of(corpus)
+    trie = compile_conjugations(corpus, alphabet)
+    results = []
+    for num_states in states:
+        for population_size in populations:
+            for name in names:
+                times = []
+                for _ in range(repeat):
+                    case = {
+                        "corpus": corpus,
+                        "alphabet": alphabet,
+                        "trie": trie,
+                        "num_states": num_states,
+                        "population_size": population_size,
+                        "seed": seed,
+                        "population": _population(num_states, population_size, alphabet, seed),
+                    }
+                    work = BENCHMARKS[name](case)
+                    random.seed(seed)
+                    start = time.perf_counter()
+                    work()
+                    times.append(time.perf_counter() - start)
+                result = {
+                    "benchmark": name,
+                    "num_states": num_states,
+                    "population_size": population_size,
+                    "times": times,
+                    "min": min(times),
+                    "median": statistics.median(times),
+                }
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+    return results
+
+def _result_key(result):
+    return result["benchmark"], result["num_states"], result["population_size"]
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara con una línea base (resultados de una ejecución anterior).
+    
+    Retorna una fila por benchmark común con el cociente actual / base de las
+    medianas; regression es True si el cociente supera 1 + threshold.
+    """
+    baseline_by_key = {_result_key(result): result for result in baseline}
+    rows = []
+    for result in results:
+        base = baseline_by_key.get(_result_key(result))
+        if base is None or base["median"] <= 0:
+            continue
+        ratio = result["median"] / base["median"]
+        rows.append({
+            "benchmark": result["benchmark"],
+            "num_states": result["num_states"],
+            "population_size": result["population_size"],
+            "baseline": base["median"],
+            "current": result["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+def environment():
+    """Datos de la máquina que acompañan a los resultados (para comparar solo lo comparable)."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+def _int_list(text):
+    return [int(value) for value in text.split(",") if value]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las partes críticas del AG con corpus sintéticos.")
+    parser.add_argument("-o", "--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--baseline", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento relativo de la mediana que cuenta como regresión")
+    parser.add_argument("--words", type=int, default=2000, help="Tamaño del corpus sintético")
+    parser.add_argument("--alphabet", default=DEFAULT_ALPHABET, help="Símbolos del corpus sintético")
+    parser.add_argument("--corpus", help="Usar un archivo con una conjugación por línea en vez del corpus sintético")
+    parser.add_argument("--states", type=_int_list, default=list(DEFAULT_STATES), help="Números de estados (p. ej. 10,20)")
+    parser.add_argument("--population", type=_int_list, default=list(DEFAULT_POPULATIONS),
+                        help="Tamaños de población (p. ej. 40,100)")
+    parser.add_argument("--only", help="Benchmarks a ejecutar, separados por comas: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    
+    if args.corpus:
+        from motor import read_conjugations
+        corpus = read_conjugations(args.corpus)
+    else:
+        corpus = synthetic_corpus(args.words, args.alphabet, seed=args.seed)
+    names = args.only.split(",") if args.only else None
+
+    def report(result):
+        print(f"{result['benchmark']:<32} estados={result['num_states']:<4} población={result['population_size']:<5} "
+              f"mediana={result['median'] * 1000:.2f} ms", file=sys.stderr)
+    
+    results = run_benchmarks(corpus, args.states, args.population, names, args.repeat, args.seed, on_result=report)
+    output = {
+        "environment": environment(),
+        "corpus": {"words": len(corpus), "alphabet": "".join(_alphabet_of(corpus)),
+                   "source": args.corpus or "synthetic"},
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison = compare(results, baseline["results"], args.threshold)
+        output["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "rows": comparison}
+        regressions = [row for row in comparison if row["regression"]]
+        for row in regressions:
+            print(f"REGRESIÓN {row['benchmark']} (estados={row['num_states']}, población={row['population_size']}): "
+                  f"{row['ratio']:.2f}× la línea base", file=sys.stderr)
+    
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,80 +4,40 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from parser_rae import parse_conjugations
+from cache_conjugaciones import ConjugationCache, DEFAULT_CACHE_PATH
 
-def get_all_conjugations(verb):
-    url = f"https://dle.rae.es/{verb}"
+RAE_BASE_URL = "https://dle.rae.es"
+
+def get_all_conjugations(verb, use_cache=True, ttl=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Conjugaciones del verbo según la RAE.
     
-    options = webdriver.ChromeOptions()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    Consulta primero la caché local (SQLite) y solo abre el navegador si el verbo
+    no está guardado o su entrada es más antigua que ttl segundos. Las descargas
+    correctas se guardan en la caché.
+    """
+    cache = ConjugationCache(cache_path, ttl=ttl) if use_cache else None
+    if cache is not None:
+        cached = cache.get(verb)
+        if cached is not None:
+            print(f"Conjugaciones de '{verb}' leídas de la caché ({len(cached)})")
+            return cached
     
-    try:
-        driver.get(url)
-
-        input("Resuelve el desafío de Cloudflare y presiona Enter para continuar...")
-
-        wait = WebDriverWait(driver, 20)
-        section = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "c-collapse__content")))
-
-        # Buscar todas las tablas
-        tables = driver.find_elements(By.CLASS_NAME, "c-table")
-        
-        all_conjugations = set()
-
-        # Extraer conjugaciones de cada tabla
-        for table in tables:
-            # Encontrar todas las filas de la tabla
-            rows = table.find_elements(By.TAG_NAME, "tr")
-            
-            # Iterar por las filas de datos
-            for row in rows[1:]:
-                # Obtener todas las celdas de datos (td)
-                data_cells = row.find_elements(By.TAG_NAME, "td")
-                
-                # Si hay celdas de datos
-                if data_cells:
-                    # Iterar por cada celda de datos
-                    for cell in data_cells:
-                        # Obtener el texto de la celda
-                        conjugations = cell.text.strip()
-                        
-                        # Primero, eliminar paréntesis y su contenido
-                        conjugations = re.sub(r'\s*\(.*?\)', '', conjugations).strip()
-                        
-                        # Procesar diferentes patrones de separación
-                        
-                        # 1. Separar por " / " (slash con espacios)
-                        forms = []
-                        for form in re.split(r'\s*/\s*', conjugations):
-                            forms.append(form.strip())
-                        
-                        # 2. Separar por " o " (separador "o" con espacios)
-                        new_forms = []
-                        for form in forms:
-                            # Dividir por " o " pero mantener los espacios dentro de las palabras
-                            split_forms = re.split(r'\s+o\s+', form)
-                            new_forms.extend([f.strip() for f in split_forms])
-                        
-                        # Procesar cada forma individual
-                        for conj in new_forms:
-                            # Limpiar y procesar
-                            conj = conj.strip().lower()
-                            
-                            # Filtrar conjugaciones válidas
-                            if conj and len(conj) > 1 and not conj.isdigit():
-                                all_conjugations.add(conj)
+    conjugations_list = scrape_conjugations(verb)
+    if cache is not None and conjugations_list:
+        cache.put(verb, conjugations_list)
+    return conjugations_list
 
-        # Convertir a lista, ordenar y filtrar
-        conjugations_list = sorted(list(all_conjugations))
-        
-        # Filtrar para eliminar infinitivos, participios y formas no conjugadas
-        conjugations_list = [
-            conj for conj in conjugations_list 
-            if not (conj == verb or conj in [f'{verb}do', f'{verb}ndo'])
-        ]
+def scrape_conjugations(verb):
+    """Descarga las conjugaciones de la página del verbo en dle.rae.es con Selenium."""
+    try:
+        with ScrapingSession() as session:
+            conjugations_list = session.fetch(verb)
         
         print(f"Número total de conjugaciones encontradas: {len(conjugations_list)}")
         
@@ -86,10 +46,140 @@ def get_all_conjugations(verb):
             print(conj)
         
         return conjugations_list
-
+    
     except Exception as e:
         print("Error:", e)
         return []
 
-    finally:
-        driver.quit()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def _chromedriver_path():
+    # ChromeDriverManager descarga/verifica el driver: una sola vez por proceso
+    return ChromeDriverManager().install()
+
+class ScrapingSession:
+    """
+    Sesión de navegador reutilizable para descargar muchos verbos.
+    
+    Arranca hasta num_browsers instancias de Chrome al primer uso. El desafío de
+    Cloudflare se resuelve una sola vez en el primer navegador y sus cookies se
+    copian a los demás. fetch_many reparte los verbos entre los navegadores (como
+    mucho uno por navegador a la vez). Con base_url apuntando a un servidor local
+    y wait_for_challenge=False se puede probar con páginas guardadas.
+    """
+
+    def __init__(self, num_browsers=1, base_url=RAE_BASE_URL, wait_for_challenge=True,
+                 headless=False, timeout=20, cache=None):
+        self.num_browsers = max(1, num_browsers)
+        self.base_url = base_url.rstrip("/")
+        self.wait_for_challenge = wait_for_challenge
+        self.headless = headless
+        self.timeout = timeout
+        self.cache = cache
+        self.errors = {}
+        self._drivers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Cierra todos los navegadores abiertos."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.Queue()
+
+    def url_for(self, verb):
+        return f"{self.base_url}/{verb}"
+
+    def _new_driver(self):
+        options = webdriver.ChromeOptions()
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if self.headless:
+            options.add_argument("--headless=new")
+        return webdriver.Chrome(service=Service(_chromedriver_path()), options=options)
+
+    def start(self, num_browsers=None):
+        """Abre los navegadores que falten (por defecto num_browsers) y resuelve el desafío."""
+        target = min(self.num_browsers, num_browsers or self.num_browsers)
+        with self._lock:
+            while len(self._drivers) < target:
+                driver = self._new_driver()
+                try:
+                    driver.get(self.base_url)
+                    if not self._drivers:
+                        if self.wait_for_challenge:
+                            input("Resuelve el desafío de Cloudflare y presiona Enter para continuar...")
+                    else:
+                        # Reutilizar la autorización del primer navegador
+                        for cookie in self._drivers[0].get_cookies():
+                            driver.add_cookie(cookie)
+                except Exception:
+                    driver.quit()
+                    raise
+                self._drivers.append(driver)
+                self._idle.put(driver)
+
+    def _fetch_with(self, driver, verb):
+        driver.get(self.url_for(verb))
+        wait = WebDriverWait(driver, self.timeout)
+        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "c-collapse__content")))
+        # Una sola lectura del DOM: el HTML se analiza localmente sin más llamadas al navegador
+        return parse_conjugations(driver.page_source, verb)
+
+    def fetch(self, verb):
+        """Conjugaciones de un verbo usando el primer navegador libre."""
+        self.start(1)
+        driver = self._idle.get()
+        try:
+            return self._fetch_with(driver, verb)
+        finally:
+            self._idle.put(driver)
+
+    def fetch_many(self, verbs, on_progress=None):
+        """
+        Conjugaciones de varios verbos: {verbo: conjugaciones}.
+        
+        Los verbos ya guardados en la caché (si hay) no se descargan y las descargas
+        correctas se guardan en ella. Un verbo que falla se registra en self.errors
+        y queda con lista vacía. on_progress(hechos, total, verbo) informa del avance.
+        """
+        verbs = list(dict.fromkeys(verbs))
+        results = {}
+        pending = []
+        for verb in verbs:
+            cached = self.cache.get(verb) if self.cache is not None else None
+            if cached is not None:
+                results[verb] = cached
+            else:
+                pending.append(verb)
+        
+        done = len(results)
+        if pending:
+            self.start(min(self.num_browsers, len(pending)))
+            with ThreadPoolExecutor(max_workers=len(self._drivers)) as executor:
+                futures = {executor.submit(self.fetch, verb): verb for verb in pending}
+                for future in as_completed(futures):
+                    verb = futures[future]
+                    try:
+                        results[verb] = future.result()
+                        self.errors.pop(verb, None)
+                        if self.cache is not None and results[verb]:
+                            self.cache.put(verb, results[verb])
+                    except Exception as e:
+                        self.errors[verb] = str(e)
+                        results[verb] = []
+                    done += 1
+                    if on_progress is not None:
+                        on_progress(done, len(verbs), verb)
+        
+        return {verb: results[verb] for verb in verbs}